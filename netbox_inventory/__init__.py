@@ -31,9 +31,14 @@ class NetBoxInventoryConfig(PluginConfig):
         'asset_disable_deletion_for_tags': [],
         'asset_custom_fields_search_filters': {},
         'asset_warranty_expire_warning_days': 90,
+        'asset_counts_cache_timeout': 0,
         'prefill_asset_name_create_inventoryitem': False,
         'prefill_asset_tag_create_inventoryitem': False,
+        'instrumentation': False,
+        'background_job_threshold': 0,
+        'background_job_chunk_size': 500,
     }
+    middleware = ['netbox_inventory.instrumentation.InstrumentationMiddleware']
 
     def ready(self):
         super().ready()
@@ -1,123 +1,98 @@
-from copy import copy
-
-from django.db.models import Count, F
+from django.db.models import Count
 
 from .choices import AssetStatusChoices
-from .models import Asset
+from .models import Asset, InventoryItemType
 
 
-def asset_counts_type_status(inventoryitem_group, assets=None):  # noqa: C901
+def asset_counts_type_status(inventoryitem_group, assets=None):
     """
     Return counts of assets based on combinations of inventoryitem type
     and status values for assets that belong to an inventoryitem group.
     Can optionally accept pre-filtered queryset with assets.
-    Return value is a list of dicts, each having keys:
-        - inventoryitem_type__manufacturer__name
-        - inventoryitem_type__model
-        - inventoryitem_type (ID)
-        - status
-        - label (display label of status)
-        - color (color of status)
+
+    Counts are returned as a matrix of inventoryitem types (rows) and statuses
+    (columns), including zero counts. Types of inventoryitem_group itself are
+    included even if they have no assets. Return value is a dict with keys:
+        - statuses: list of dicts (one per column) with keys value, label,
+          color and count (total for status)
+        - rows: list of dicts (one per inventoryitem type) with keys:
+            - inventoryitem_type (ID)
+            - inventoryitem_type__manufacturer__name
+            - inventoryitem_type__model
+            - status_list: list of (status dict, count) tuples, one per column
+        - total: count of all assets
     """
     if assets is None:
         assets = Asset.objects.all()
-    assets = assets.filter(
-        inventoryitem_type__inventoryitem_group__in=inventoryitem_group.get_descendants(
-            include_self=True
-        )
-    )
+    groups = inventoryitem_group.get_descendants(include_self=True)
     # generate counts of assets grouped by type and status
     asset_counts = (
-        assets.values(
-            'inventoryitem_type__manufacturer__name',
-            'inventoryitem_type__model',
-            'inventoryitem_type',
-            'status',
-        )
+        assets.filter(inventoryitem_type__inventoryitem_group__in=groups)
+        .values_list('inventoryitem_type', 'status')
         .annotate(count=Count('pk'))
-        .order_by('inventoryitem_type', 'status')
+        .order_by()
     )
 
-    def _update_status_meta(entry):
-        """adds color and label keys based on status value"""
-        entry['color'] = AssetStatusChoices.colors.get(entry['status'], 'gray')
-        entry['label'] = dict(AssetStatusChoices).get(entry['status'], entry['status'])
-
-    def _generate_entry(entry_from, status, count=0):
-        t = copy(entry_from)
-        t['status'] = status
-        t['count'] = count
-        _update_status_meta(t)
-        return t
+    statuses = [
+        {
+            'value': value,
+            'label': label,
+            'color': AssetStatusChoices.colors.get(value, 'gray'),
+            'count': 0,
+        }
+        for value, label in AssetStatusChoices
+    ]
+    status_idx = {status['value']: idx for idx, status in enumerate(statuses)}
 
-    # for each inventoryitem_type keep track of seen statues and add any that are
-    # missing with count:0
-    zero_counts = []
-    all_statuses = set(AssetStatusChoices.values())
-    last_iid_pk = None
-    seen_statues = set()
-    seen_iit_pks = set()
-    for idx, iit_status_count in enumerate(asset_counts):
-        _update_status_meta(iit_status_count)
-        seen_iit_pks.add(iit_status_count['inventoryitem_type'])
-        if last_iid_pk is None:
-            last_iid_pk = iit_status_count['inventoryitem_type']
-        if last_iid_pk != iit_status_count['inventoryitem_type']:
-            # next iit_pk, add unseen statuses of previous pk
-            for missing_status in all_statuses - seen_statues:
-                zero_counts.append(
-                    _generate_entry(asset_counts[idx - 1], missing_status)
-                )
-            # reset
-            seen_statues = set()
-        last_iid_pk = iit_status_count['inventoryitem_type']
-        seen_statues.add(iit_status_count['status'])
-    # complete missing statues for the last inventoryitem_type in asset_counts
-    if last_iid_pk:
-        for missing_status in all_statuses - seen_statues:
-            zero_counts.append(_generate_entry(iit_status_count, missing_status))
+    # {inventoryitem_type: [count for each status]}
+    counts = {}
+    for iit_pk, status, count in asset_counts:
+        if status not in status_idx:
+            # status not (or no longer) defined in choices
+            status_idx[status] = len(statuses)
+            statuses.append(
+                {'value': status, 'label': status, 'color': 'gray', 'count': 0}
+            )
+            for type_counts in counts.values():
+                type_counts.append(0)
+        type_counts = counts.setdefault(iit_pk, [0] * len(statuses))
+        type_counts.extend([0] * (len(statuses) - len(type_counts)))
+        type_counts[status_idx[status]] = count
+        statuses[status_idx[status]]['count'] += count
 
-    # now add entries for inventory item types that have no assets at all
-    for iit in (
-        inventoryitem_group.inventoryitem_types.exclude(pk__in=seen_iit_pks)
-        .annotate(
-            inventoryitem_type__manufacturer__name=F('manufacturer__name'),
-            inventoryitem_type__model=F('model'),
-            inventoryitem_type=F('pk'),
-        )
-        .values(
-            'inventoryitem_type__manufacturer__name',
-            'inventoryitem_type__model',
-            'inventoryitem_type',
-        )
+    # inventoryitem types with assets and types of this group without assets
+    rows = []
+    zero_counts = [0] * len(statuses)
+    for iit_pk, iig_pk, manufacturer_name, model in (
+        InventoryItemType.objects.filter(inventoryitem_group__in=groups)
+        .order_by('manufacturer__name', 'model')
+        .values_list('pk', 'inventoryitem_group', 'manufacturer__name', 'model')
     ):
-        for status in all_statuses:
-            zero_counts.append(_generate_entry(iit, status))
+        type_counts = counts.get(iit_pk)
+        if type_counts is None:
+            if iig_pk != inventoryitem_group.pk:
+                continue
+            type_counts = zero_counts
+        rows.append(
+            {
+                'inventoryitem_type': iit_pk,
+                'inventoryitem_type__manufacturer__name': manufacturer_name,
+                'inventoryitem_type__model': model,
+                'status_list': list(zip(statuses, type_counts)),
+            }
+        )
 
-    # combine non-zero and zero counts and sort
-    asset_counts = sorted(
-        list(asset_counts) + zero_counts,
-        key=lambda k: (
-            k['inventoryitem_type__manufacturer__name'],
-            k['inventoryitem_type__model'],
-            AssetStatusChoices.values().index(k['status']),
-        ),
-    )
-    return asset_counts
+    return {
+        'statuses': statuses,
+        'rows': rows,
+        'total': sum(status['count'] for status in statuses),
+    }
 
 
 def asset_counts_status(asset_counts):
     """
-    Aggregates asset counts broken down by inventory item type and status
-    (as returned by asset_counts_type_status) to counts on just status valuies.
+    Return counts on just status values from asset counts broken down by
+    inventory item type and status (as returned by asset_counts_type_status).
+    Totals are already calculated there, so this is just a lookup by status.
     """
-    status_counts = {
-        key: {
-            'value': key,
-            'label': label,
-            'color': AssetStatusChoices.colors[key],
-            'count': sum(e['count'] for e in asset_counts if e['status'] == key),
-        }
-        for key, label in list(AssetStatusChoices)
-    }
-    return status_counts
+    return {status['value']: status for status in asset_counts['statuses']}
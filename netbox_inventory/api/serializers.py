@@ -1,3 +1,4 @@
 from .serializers_.assets import *
+from .serializers_.audits import *
 from .serializers_.contracts import *
 from .serializers_.deliveries import *
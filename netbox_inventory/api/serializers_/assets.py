@@ -27,6 +27,7 @@ class InventoryItemGroupSerializer(NestedGroupModelSerializer):
         required=False, allow_null=True, default=None
     )
     asset_count = serializers.IntegerField(read_only=True)
+    inventoryitem_type_count = serializers.IntegerField(read_only=True)
 
     class Meta:
         model = InventoryItemGroup
@@ -43,6 +44,7 @@ class InventoryItemGroupSerializer(NestedGroupModelSerializer):
             'created',
             'last_updated',
             'asset_count',
+            'inventoryitem_type_count',
             '_depth',
         )
         brief_fields = ('id', 'url', 'display', 'name', 'description', '_depth')
@@ -176,6 +178,9 @@ class AssetSerializer(NetBoxModelSerializer):
         allow_null=True,
         default=None,
     )
+    warranty_remaining_days = serializers.IntegerField(read_only=True)
+    warranty_progress = serializers.IntegerField(read_only=True)
+    warranty_status = serializers.CharField(read_only=True)
 
     def to_internal_value(self, data):
         ret = super().to_internal_value(data)
@@ -216,6 +221,9 @@ class AssetSerializer(NetBoxModelSerializer):
             'purchase',
             'warranty_start',
             'warranty_end',
+            'warranty_remaining_days',
+            'warranty_progress',
+            'warranty_status',
             'comments',
             'tags',
             'custom_fields',
@@ -236,3 +244,35 @@ class AssetSerializer(NetBoxModelSerializer):
         # logic to handle validation
         # see  https://www.django-rest-framework.org/api-guide/validators/#optional-fields
         validators = []
+
+
+class AssetLookupSerializer(serializers.Serializer):
+    """
+    Serials and asset tags to look up, e.g. scanned by barcode scanners.
+    """
+
+    max_identifiers = 10000
+
+    serials = serializers.ListField(
+        child=serializers.CharField(max_length=60, trim_whitespace=False),
+        required=False,
+        default=list,
+    )
+    asset_tags = serializers.ListField(
+        child=serializers.CharField(max_length=50, trim_whitespace=False),
+        required=False,
+        default=list,
+    )
+
+    def validate(self, data):
+        count = len(data['serials']) + len(data['asset_tags'])
+        if not count:
+            raise serializers.ValidationError(
+                'At least one serial or asset tag is required.'
+            )
+        if count > self.max_identifiers:
+            raise serializers.ValidationError(
+                f'At most {self.max_identifiers} serials and asset tags can be '
+                'looked up at once.'
+            )
+        return data
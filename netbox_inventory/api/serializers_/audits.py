@@ -0,0 +1,58 @@
+from rest_framework import serializers
+
+from dcim.api.serializers import LocationSerializer, SiteSerializer
+from netbox.api.serializers import NetBoxModelSerializer
+
+from netbox_inventory.models import AuditSession
+
+
+class AuditSessionSerializer(NetBoxModelSerializer):
+    url = serializers.HyperlinkedIdentityField(
+        view_name='plugins-api:netbox_inventory-api:auditsession-detail'
+    )
+    site = SiteSerializer(nested=True)
+    storage_location = LocationSerializer(
+        nested=True, required=False, allow_null=True, default=None
+    )
+    scan_count = serializers.IntegerField(read_only=True)
+
+    class Meta:
+        model = AuditSession
+        fields = (
+            'id',
+            'url',
+            'display',
+            'name',
+            'status',
+            'site',
+            'storage_location',
+            'description',
+            'comments',
+            'tags',
+            'custom_fields',
+            'created',
+            'last_updated',
+            'scan_count',
+        )
+        brief_fields = (
+            'id',
+            'url',
+            'display',
+            'name',
+            'status',
+            'description',
+        )
+
+
+class AuditScansSerializer(serializers.Serializer):
+    """
+    Batch of serials scanned in audit session.
+    """
+
+    max_serials = 10000
+
+    serials = serializers.ListField(
+        child=serializers.CharField(max_length=60),
+        allow_empty=False,
+        max_length=max_serials,
+    )
@@ -16,6 +16,11 @@ class ContractSerializer(NetBoxModelSerializer):
         nested=True, required=False, allow_null=True, default=None
     )
     asset_count = serializers.IntegerField(read_only=True)
+    days_until_expiry = serializers.IntegerField(read_only=True)
+    is_active = serializers.BooleanField(read_only=True)
+    is_expired = serializers.BooleanField(read_only=True)
+    needs_renewal = serializers.BooleanField(read_only=True)
+    progress_percentage = serializers.FloatField(read_only=True)
 
     class Meta:
         model = Contract
@@ -41,6 +46,11 @@ class ContractSerializer(NetBoxModelSerializer):
             'created',
             'last_updated',
             'asset_count',
+            'days_until_expiry',
+            'is_active',
+            'is_expired',
+            'needs_renewal',
+            'progress_percentage',
         )
         brief_fields = (
             'id',
@@ -1,3 +1,5 @@
+from django.urls import path
+
 from netbox.api.routers import NetBoxRouter
 
 from . import views
@@ -22,4 +24,21 @@ router.register('suppliers', views.SupplierViewSet)
 router.register('purchases', views.PurchaseViewSet)
 router.register('deliveries', views.DeliveryViewSet)
 
-urlpatterns = router.urls
+# Audits
+router.register('audit-sessions', views.AuditSessionViewSet)
+
+urlpatterns = [
+    # before router urls, where it would match asset detail
+    path('assets/lookup/', views.AssetLookupView.as_view(), name='asset-lookup'),
+    path(
+        'audit-sessions/<int:pk>/scans/',
+        views.AuditSessionScansView.as_view(),
+        name='auditsession-scans',
+    ),
+    path(
+        'audit-sessions/<int:pk>/reconciliation/',
+        views.AuditSessionReconciliationView.as_view(),
+        name='auditsession-reconciliation',
+    ),
+    *router.urls,
+]
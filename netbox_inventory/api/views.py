@@ -1,10 +1,22 @@
+from django.shortcuts import get_object_or_404
+from rest_framework.exceptions import ValidationError
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
 from dcim.api.views import DeviceViewSet, InventoryItemViewSet, ModuleViewSet
+from netbox.api.authentication import IsAuthenticatedOrLoginNotRequired
+from netbox.api.pagination import OptionalLimitOffsetPagination
 from netbox.api.viewsets import NetBoxModelViewSet
 from utilities.query import count_related
 
 from .. import filtersets, models
+from ..choices import AuditResultChoices
+from ..models.assets import normalize_identifier
 from .serializers import (
+    AssetLookupSerializer,
     AssetSerializer,
+    AuditScansSerializer,
+    AuditSessionSerializer,
     ContractSerializer,
     DeliverySerializer,
     InventoryItemGroupSerializer,
@@ -19,13 +31,7 @@ from .serializers import (
 
 
 class InventoryItemGroupViewSet(NetBoxModelViewSet):
-    queryset = models.InventoryItemGroup.objects.add_related_count(
-        models.InventoryItemGroup.objects.all(),
-        models.Asset,
-        'inventoryitem_type__inventoryitem_group',
-        'asset_count',
-        cumulative=True,
-    ).prefetch_related('tags')
+    queryset = models.InventoryItemGroup.objects.prefetch_related('tags')
     serializer_class = InventoryItemGroupSerializer
     filterset_class = filtersets.InventoryItemGroupFilterSet
 
@@ -39,20 +45,135 @@ class InventoryItemTypeViewSet(NetBoxModelViewSet):
 
 
 class AssetViewSet(NetBoxModelViewSet):
-    queryset = models.Asset.objects.prefetch_related(
+    queryset = models.Asset.objects.with_warranty()
+    serializer_class = AssetSerializer
+    filterset_class = filtersets.AssetFilterSet
+
+    # related objects serialized by each field (including their display), in
+    # addition to those NetBox prefetches for nested serializers
+    related_fields = {
+        'display': ('device_type', 'module_type', 'inventoryitem_type', 'rack_type'),
+        'device_type': ('device_type__manufacturer',),
+        'device': ('device',),
+        'module_type': ('module_type__manufacturer',),
+        'module': ('module__device', 'module__module_bay', 'module__module_type'),
+        'inventoryitem_type': ('inventoryitem_type__manufacturer',),
+        'inventoryitem': ('inventoryitem__device',),
+        'rack_type': ('rack_type__manufacturer',),
+        'rack': ('rack',),
+        'tenant': ('tenant',),
+        'contact': ('contact',),
+        'storage_location': ('storage_location',),
+        'owner': ('owner',),
+        'delivery': ('delivery__purchase__supplier',),
+        'purchase': ('purchase__supplier',),
+    }
+
+    def get_queryset(self):
+        """
+        Select related objects only for fields that will be serialized, as
+        limited by ?brief, ?fields and ?omit
+        """
+        queryset = super().get_queryset()
+        fields = self.requested_fields or self.get_serializer_class().Meta.fields
+        omit = set(self.request.query_params.get('omit', '').split(','))
+        return queryset.select_related(
+            *{
+                related_field
+                for field in fields
+                if field not in omit
+                for related_field in self.related_fields.get(field, ())
+            }
+        )
+
+
+def compact_object(obj):
+    if obj is None:
+        return None
+    return {'id': obj.pk, 'display': str(obj)}
+
+
+class AssetLookupView(APIView):
+    """
+    Look up assets by many serials and asset tags at once (e.g. batches from
+    barcode scanners), ignoring case and surrounding whitespace. All of them
+    are resolved with one query using indexes of normalized serial and asset
+    tag. Results are in order of request, one for each serial and asset tag,
+    with compact details of matching assets. A serial may match more than
+    one asset (of different hardware types), identifiers without matching
+    assets have found set to false.
+
+    This is a POST only because request may be too large for query string,
+    assets are only read, with view permission.
+    """
+
+    permission_classes = (IsAuthenticatedOrLoginNotRequired,)
+    # installed_site and storage_location__site for current_site
+    related_fields = (
         'device_type',
-        'device',
         'module_type',
-        'module',
+        'inventoryitem_type',
         'rack_type',
+        'device__device_type__manufacturer',
+        'module__module_bay',
+        'module__module_type',
+        'inventoryitem',
         'rack',
-        'storage_location',
-        'delivery',
-        'purchase__supplier',
-        'tags',
+        'installed_site',
+        'installed_location',
+        'storage_location__site',
     )
-    serializer_class = AssetSerializer
-    filterset_class = filtersets.AssetFilterSet
+
+    def get_view_name(self):
+        return 'Asset Lookup'
+
+    def post(self, request):
+        serializer = AssetLookupSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        serials = serializer.validated_data['serials']
+        asset_tags = serializer.validated_data['asset_tags']
+
+        assets = (
+            models.Asset.objects.restrict(request.user, 'view')
+            .lookup_identifiers(serials=serials, asset_tags=asset_tags)
+            .select_related(*self.related_fields)
+            .order_by('pk')
+        )
+        matches = {'serial': {}, 'asset_tag': {}}
+        for asset in assets:
+            compact = self.compact_asset(asset)
+            for field, field_matches in matches.items():
+                key = getattr(asset, f'normalized_{field}')
+                if key is not None:
+                    field_matches.setdefault(key, []).append(compact)
+
+        results = []
+        for field, identifiers in (('serial', serials), ('asset_tag', asset_tags)):
+            for identifier in identifiers:
+                found = matches[field].get(normalize_identifier(identifier), [])
+                results.append(
+                    {
+                        'identifier': identifier,
+                        'field': field,
+                        'found': bool(found),
+                        'assets': found,
+                    }
+                )
+        return Response({'count': len(results), 'results': results})
+
+    def compact_asset(self, asset):
+        hardware = asset.hardware
+        return {
+            'id': asset.pk,
+            'serial': asset.serial,
+            'asset_tag': asset.asset_tag,
+            'status': asset.status,
+            'kind': asset.kind,
+            'hardware_type': compact_object(asset.hardware_type),
+            'hardware': compact_object(hardware),
+            'site': compact_object(asset.current_site),
+            'location': compact_object(asset.current_location),
+        }
 
 
 class DeviceAssetViewSet(DeviceViewSet):
@@ -85,8 +206,10 @@ class InventoryItemAssetViewSet(InventoryItemViewSet):
 
 
 class ContractViewSet(NetBoxModelViewSet):
-    queryset = models.Contract.objects.prefetch_related('tags').annotate(
-        asset_count=count_related(models.Asset, 'contract')
+    queryset = (
+        models.Contract.objects.prefetch_related('tags')
+        .annotate(asset_count=count_related(models.Asset, 'contract'))
+        .with_expiry()
     )
     serializer_class = ContractSerializer
     filterset_class = filtersets.ContractFilterSet
@@ -122,3 +245,96 @@ class DeliveryViewSet(NetBoxModelViewSet):
     )
     serializer_class = DeliverySerializer
     filterset_class = filtersets.DeliveryFilterSet
+
+
+#
+# Audits
+#
+
+
+class AuditSessionViewSet(NetBoxModelViewSet):
+    queryset = models.AuditSession.objects.prefetch_related('tags').annotate(
+        scan_count=count_related(models.AuditScan, 'session')
+    )
+    serializer_class = AuditSessionSerializer
+    filterset_class = filtersets.AuditSessionFilterSet
+
+
+class AuditSessionScansView(APIView):
+    """
+    Add a batch of scanned serials to an open audit session. Serials already
+    scanned in the session are ignored, so a batch can be safely sent again.
+    Requires change permission on the session.
+    """
+
+    permission_classes = (IsAuthenticatedOrLoginNotRequired,)
+
+    def get_view_name(self):
+        return 'Audit Session Scans'
+
+    def post(self, request, pk):
+        session = get_object_or_404(
+            models.AuditSession.objects.restrict(request.user, 'change'), pk=pk
+        )
+        if not session.is_open:
+            raise ValidationError('Scans can only be added to open sessions.')
+        serializer = AuditScansSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        serials = serializer.validated_data['serials']
+        added = session.add_scans(serials)
+        return Response(
+            {
+                'received': len(serials),
+                'added': added,
+                'scan_count': session.scans.count(),
+            }
+        )
+
+
+class AuditSessionReconciliationView(APIView):
+    """
+    Reconciliation of audit session scans against assets expected to be
+    stored at its location. Without parameters, returns number of assets
+    (or scans) of each result. With ?result=<result>, returns paginated
+    assets (or scans, for unexpected) of that result.
+    """
+
+    permission_classes = (IsAuthenticatedOrLoginNotRequired,)
+    asset_fields = (
+        'id',
+        'serial',
+        'asset_tag',
+        'status',
+        'storage_location',
+        'installed_site',
+        'installed_location',
+    )
+    scan_fields = ('serial', 'created')
+
+    def get_view_name(self):
+        return 'Audit Session Reconciliation'
+
+    def get(self, request, pk):
+        session = get_object_or_404(
+            models.AuditSession.objects.restrict(request.user, 'view'), pk=pk
+        )
+        result = request.query_params.get('result')
+        if result is None:
+            return Response(
+                {
+                    'scan_count': session.scans.count(),
+                    'results': session.get_result_counts(),
+                }
+            )
+        if result not in dict(AuditResultChoices):
+            raise ValidationError(
+                {'result': f'Must be one of: {", ".join(dict(AuditResultChoices))}'}
+            )
+        queryset = session.get_result(result)
+        if result == 'unexpected':
+            rows = queryset.values(*self.scan_fields)
+        else:
+            rows = queryset.restrict(request.user, 'view').values(*self.asset_fields)
+        paginator = OptionalLimitOffsetPagination()
+        page = paginator.paginate_queryset(rows.order_by('pk'), request, view=self)
+        return paginator.get_paginated_response(page)
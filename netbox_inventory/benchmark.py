@@ -0,0 +1,247 @@
+import json
+import time
+from io import StringIO
+
+from django.conf import settings
+from django.core.management import call_command
+from django.db import connection, transaction
+from django.db.models import Count
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from dcim.models import DeviceType, Location, Site
+
+from .analyzers import asset_counts_type_status
+from .filtersets import AssetFilterSet
+from .models import Asset, InventoryItemGroup
+from .tables import AssetTable
+from .utils import query_located
+
+__all__ = ('Benchmark',)
+
+PAGE_SIZE = 50
+
+API_LIST_VIEWS = (
+    'asset',
+    'contract',
+    'supplier',
+    'purchase',
+    'delivery',
+    'inventoryitemtype',
+    'inventoryitemgroup',
+)
+
+GRAPHQL_LIST_FIELDS = (
+    'asset_list',
+    'contract_list',
+    'supplier_list',
+    'purchase_list',
+    'delivery_list',
+    'inventory_item_type_list',
+    'inventory_item_group_list',
+)
+
+
+class Benchmark:
+    """
+    Times plugin hot paths on data already in the database. Each case is run
+    ``repeat`` times, every run inside a transaction that is rolled back, so
+    cases that change data (import, bulk edit, contract updater) always start
+    from the same state. Reports fastest wall time in milliseconds and number
+    of SQL queries of each case.
+
+    Views are requested with a test client logged in as ``user``, so they go
+    through the same middleware as real requests.
+    """
+
+    def __init__(self, user, repeat=3, import_rows=100, edit_rows=100):
+        self.user = user
+        self.repeat = repeat
+        self.import_rows = import_rows
+        self.edit_rows = edit_rows
+        hosts = [host for host in settings.ALLOWED_HOSTS if host != '*']
+        self.client = Client(HTTP_HOST=hosts[0] if hosts else 'localhost')
+        self.client.force_login(user)
+
+    def run(self, only=None):
+        """
+        Run all cases, or those whose names start with any of ``only``.
+        Returns dict of case names and their results.
+        """
+        results = {}
+        for name, func in self.get_cases():
+            if only and not name.startswith(tuple(only)):
+                continue
+            results[name] = self.measure(func)
+        return results
+
+    def measure(self, func):
+        timings = []
+        for _ in range(self.repeat):
+            with transaction.atomic():
+                with CaptureQueriesContext(connection) as queries:
+                    start = time.perf_counter()
+                    result = func()
+                    timings.append(time.perf_counter() - start)
+                transaction.set_rollback(True)
+        measurement = {
+            'ms': round(min(timings) * 1000, 2),
+            'queries': len(queries),
+        }
+        if result is not None:
+            measurement['status'] = result
+        return measurement
+
+    def get_cases(self):
+        """
+        Yield (name, function) of benchmark cases. Functions that make a
+        request return response status code.
+        """
+        yield from self.get_view_cases()
+        yield from self.get_query_cases()
+        yield from self.get_change_cases()
+        yield from self.get_api_cases()
+
+    def get_view_cases(self):
+        yield 'asset_list', self.get('plugins:netbox_inventory:asset_list')
+        for column in AssetTable(Asset.objects.none()).columns:
+            if column.orderable and column.name not in ('pk', 'actions'):
+                yield (
+                    f'asset_list:{column.name}',
+                    self.get(
+                        'plugins:netbox_inventory:asset_list',
+                        {'sort': column.name},
+                    ),
+                )
+
+        group = InventoryItemGroup.objects.filter(parent__isnull=True).first()
+        if group:
+            yield (
+                'inventoryitemgroup_view',
+                self.get('plugins:netbox_inventory:inventoryitemgroup', pk=group.pk),
+            )
+
+    def get_query_cases(self):
+        asset = Asset.objects.exclude(serial__isnull=True).exclude(serial='').first()
+        if asset:
+            yield 'asset_search', self.page(self.search, asset.serial[-4:])
+
+        site = Site.objects.filter(pk__in=Asset.objects.values('installed_site'))
+        location = Location.objects.filter(
+            pk__in=Asset.objects.values('storage_location')
+        )
+        for field_name, obj in (('site', site.first()), ('location', location.first())):
+            if obj is None:
+                continue
+            for assets_shown in ('all', 'installed', 'stored'):
+                yield (
+                    f'query_located:{field_name}:{assets_shown}',
+                    self.page(
+                        query_located,
+                        Asset.objects.all(),
+                        field_name,
+                        [obj.pk],
+                        assets_shown,
+                    ),
+                )
+
+        # group with most inventory item types, e.g. generated with --types 5000
+        group = (
+            InventoryItemGroup.objects.annotate(type_count=Count('inventoryitem_types'))
+            .filter(type_count__gt=0)
+            .order_by('-type_count')
+            .first()
+        )
+        if group:
+            yield (
+                f'asset_counts_type_status:{group.type_count}_types',
+                lambda: asset_counts_type_status(group),
+            )
+
+    def get_change_cases(self):
+        device_type = DeviceType.objects.first()
+        if device_type:
+            yield 'asset_import', self.asset_import(device_type)
+
+        pks = list(Asset.objects.values_list('pk', flat=True)[: self.edit_rows])
+        if pks:
+            yield 'asset_bulk_edit', self.asset_bulk_edit(pks)
+
+        yield 'update_contract_statuses', self.update_contract_statuses
+
+    def get_api_cases(self):
+        for view_name in API_LIST_VIEWS:
+            yield (
+                f'api:{view_name}',
+                self.get(
+                    f'plugins-api:netbox_inventory-api:{view_name}-list',
+                    {'limit': PAGE_SIZE},
+                ),
+            )
+
+        for field_name in GRAPHQL_LIST_FIELDS:
+            yield f'graphql:{field_name}', self.graphql(field_name)
+
+    def get(self, view_name, params=None, **kwargs):
+        url = reverse(view_name, kwargs=kwargs)
+
+        def func():
+            return self.client.get(url, params).status_code
+
+        return func
+
+    def page(self, get_queryset, *args):
+        """
+        Count queryset and fetch its first page, as list views do.
+        """
+
+        def func():
+            queryset = get_queryset(*args)
+            queryset.count()
+            list(queryset[:PAGE_SIZE])
+
+        return func
+
+    def search(self, value):
+        return AssetFilterSet({'q': value}, Asset.objects.all()).qs
+
+    def asset_import(self, device_type):
+        rows = [
+            'serial,status,hardware_kind,manufacturer,model_name',
+            *(
+                f'BENCHMARK-IMPORT-{i},stored,device,'
+                f'{device_type.manufacturer.name},{device_type.model}'
+                for i in range(self.import_rows)
+            ),
+        ]
+        url = reverse('plugins:netbox_inventory:asset_bulk_import')
+        data = {'data': '\n'.join(rows), 'format': 'csv', 'csv_delimiter': ','}
+
+        def func():
+            return self.client.post(url, data).status_code
+
+        return func
+
+    def asset_bulk_edit(self, pks):
+        url = reverse('plugins:netbox_inventory:asset_bulk_edit')
+        data = {'pk': pks, '_apply': '', 'description': 'benchmark'}
+
+        def func():
+            return self.client.post(url, data).status_code
+
+        return func
+
+    def update_contract_statuses(self):
+        call_command('update_contract_statuses', stdout=StringIO())
+
+    def graphql(self, field_name):
+        url = reverse('graphql')
+        query = f'{{ {field_name}(pagination: {{limit: {PAGE_SIZE}}}) {{ id }} }}'
+
+        def func():
+            return self.client.post(
+                url, json.dumps({'query': query}), content_type='application/json'
+            ).status_code
+
+        return func
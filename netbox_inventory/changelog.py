@@ -0,0 +1,46 @@
+from core.choices import ObjectChangeActionChoices
+from core.events import OBJECT_CREATED, OBJECT_UPDATED
+from core.models import ObjectChange
+from extras.events import enqueue_event
+from netbox.context import current_request, events_queue
+
+__all__ = (
+    'is_change_logging_active',
+    'log_bulk_changes',
+)
+
+EVENT_TYPES = {
+    ObjectChangeActionChoices.ACTION_CREATE: OBJECT_CREATED,
+    ObjectChangeActionChoices.ACTION_UPDATE: OBJECT_UPDATED,
+}
+
+
+def is_change_logging_active():
+    """
+    Return True if changes would be logged by log_bulk_changes(), so callers
+    can skip fetching and snapshotting objects when they wouldn't be.
+    """
+    return current_request.get() is not None
+
+
+def log_bulk_changes(instances, action, batch_size=500):
+    """
+    Create change log entries and enqueue events for objects that were saved
+    with bulk_create() or bulk_update(), which don't send signals netbox uses
+    for this. Instances should have a snapshot when updated.
+    Same as netbox, changes are only logged within a request.
+    """
+    request = current_request.get()
+    if request is None:
+        return
+    object_changes = []
+    queue = events_queue.get()
+    for instance in instances:
+        object_change = instance.to_objectchange(action)
+        object_change.user = request.user
+        object_change.user_name = request.user.username
+        object_change.request_id = request.id
+        object_changes.append(object_change)
+        enqueue_event(queue, instance, request, EVENT_TYPES[action])
+    ObjectChange.objects.bulk_create(object_changes, batch_size=batch_size)
+    events_queue.set(queue)
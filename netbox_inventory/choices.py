@@ -15,6 +15,15 @@ class AssetStatusChoices(ChoiceSet):
     ]
 
 
+class WarrantyStatusChoices(ChoiceSet):
+    CHOICES = [
+        ('pending', 'Not started', 'cyan'),
+        ('active', 'Active', 'green'),
+        ('expiring', 'Expiring', 'orange'),
+        ('expired', 'Expired', 'red'),
+    ]
+
+
 class HardwareKindChoices(ChoiceSet):
     CHOICES = [
         ('device', 'Device'),
@@ -67,3 +76,26 @@ class ContractTypeChoices(ChoiceSet):
         ('lease', 'Lease', 'cyan'),
         ('other', 'Other', 'gray'),
     ]
+
+
+#
+# Audits
+#
+
+
+class AuditSessionStatusChoices(ChoiceSet):
+    key = 'AuditSession.status'
+
+    CHOICES = [
+        ('open', 'Open', 'cyan'),
+        ('closed', 'Closed', 'green'),
+    ]
+
+
+class AuditResultChoices(ChoiceSet):
+    CHOICES = [
+        ('found', 'Found', 'green'),
+        ('missing', 'Missing', 'red'),
+        ('wrong_location', 'Wrong location', 'orange'),
+        ('unexpected', 'Unexpected', 'purple'),
+    ]
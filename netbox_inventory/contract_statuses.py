@@ -0,0 +1,72 @@
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from core.choices import ObjectChangeActionChoices
+
+from .changelog import is_change_logging_active, log_bulk_changes
+
+__all__ = (
+    'AUTO_UPDATED_STATUSES',
+    'apply_status_updates',
+    'get_status_updates',
+)
+
+AUTO_UPDATED_STATUSES = ['draft', 'active', 'expired']
+
+
+def get_status_updates(today):
+    """
+    Return list of (new status, filter) for contracts whose status should
+    change, same rules as Contract.update_status_based_on_dates(). Filters
+    don't overlap, so updates can be applied in any order.
+    """
+    return [
+        # contract has expired
+        (
+            'expired',
+            Q(status__in=['draft', 'active'], end_date__lt=today),
+        ),
+        # contract is currently active
+        (
+            'active',
+            Q(
+                status__in=['draft', 'expired'],
+                start_date__lte=today,
+                end_date__gte=today,
+            ),
+        ),
+        # contract hasn't started yet
+        (
+            'draft',
+            Q(
+                status__in=['active', 'expired'],
+                start_date__gt=today,
+                end_date__gte=today,
+            ),
+        ),
+    ]
+
+
+def apply_status_updates(contracts, status_updates):
+    """
+    Update status with one UPDATE per new status. Contracts are not saved
+    one by one, so change log entries are written in bulk. Returns number
+    of updated contracts.
+    """
+    updated_count = 0
+    now = timezone.now()
+    with transaction.atomic():
+        for status, q in status_updates:
+            changed = []
+            if is_change_logging_active():
+                changed = list(
+                    contracts.filter(q).select_for_update().prefetch_related('tags')
+                )
+                for contract in changed:
+                    contract.snapshot()
+                    contract.status = status
+                    contract.last_updated = now
+            updated_count += contracts.filter(q).update(status=status, last_updated=now)
+            log_bulk_changes(changed, ObjectChangeActionChoices.ACTION_UPDATE)
+    return updated_count
@@ -0,0 +1,151 @@
+from collections import Counter
+
+from django.db.models import Case, Count, F, When
+
+from .models import Asset, InventoryItemGroup, InventoryItemType
+
+__all__ = (
+    'COUNT_FIELDS',
+    'get_inventoryitem_group_id',
+    'get_saved_inventoryitem_group_id',
+    'rebuild_inventoryitem_group_counts',
+    'update_inventoryitem_group_counts',
+    'update_inventoryitem_group_counts_for_assets',
+)
+
+# cumulative count field: direct count field
+COUNT_FIELDS = {
+    'asset_count': 'direct_asset_count',
+    'inventoryitem_type_count': 'direct_inventoryitem_type_count',
+}
+
+# field of Asset, InventoryItemType and InventoryItemGroup whose change moves
+# counted object to a different group (or group under a different parent)
+GROUP_FIELDS = {
+    Asset: 'inventoryitem_type',
+    InventoryItemType: 'inventoryitem_group',
+    InventoryItemGroup: 'parent',
+}
+
+# lookup of group from Asset, InventoryItemType and InventoryItemGroup
+GROUP_LOOKUPS = {
+    Asset: 'inventoryitem_type__inventoryitem_group',
+    InventoryItemType: 'inventoryitem_group',
+    InventoryItemGroup: 'parent',
+}
+
+
+def update_inventoryitem_group_counts(group_id, assets=0, types=0, direct=True):
+    """
+    Add assets and types to counts of group and its ancestors with a single
+    UPDATE. Negative numbers remove them. If direct is False, direct counts
+    of group are left as they are (e.g. when a child group moves).
+    """
+    if group_id is None or not (assets or types):
+        return
+    group = InventoryItemGroup.objects.get(pk=group_id)
+    deltas = {'asset_count': assets, 'inventoryitem_type_count': types}
+    values = {field: F(field) + deltas[field] for field in COUNT_FIELDS}
+    if direct:
+        for field, direct_field in COUNT_FIELDS.items():
+            values[direct_field] = Case(
+                When(pk=group_id, then=F(direct_field) + deltas[field]),
+                default=F(direct_field),
+            )
+    group.get_ancestors(include_self=True).update(**values)
+
+
+def update_inventoryitem_group_counts_for_assets(assets, sign=1):
+    """
+    Update group counts for assets created (sign=1) or deleted (sign=-1) in
+    bulk, without signals. One UPDATE per affected group.
+    """
+    types = Counter(
+        asset.inventoryitem_type_id for asset in assets if asset.inventoryitem_type_id
+    )
+    if not types:
+        return
+    groups = Counter()
+    for type_id, group_id in InventoryItemType.objects.filter(
+        pk__in=types, inventoryitem_group__isnull=False
+    ).values_list('pk', 'inventoryitem_group'):
+        groups[group_id] += types[type_id]
+    for group_id, count in groups.items():
+        update_inventoryitem_group_counts(group_id, assets=sign * count)
+
+
+def get_inventoryitem_group_id(instance):
+    """
+    Return id of group Asset or InventoryItemType belongs to, or of parent of
+    InventoryItemGroup.
+    """
+    if isinstance(instance, Asset):
+        if not instance.inventoryitem_type_id:
+            return None
+        return instance.inventoryitem_type.inventoryitem_group_id
+    return getattr(instance, f'{GROUP_FIELDS[type(instance)]}_id')
+
+
+def get_saved_inventoryitem_group_id(instance):
+    """
+    Return id of group (or parent group) instance belongs to in database,
+    before instance is saved. Prechange snapshot is used to avoid a query if
+    group field didn't change.
+    """
+    field_name = GROUP_FIELDS[type(instance)]
+    snapshot = getattr(instance, '_prechange_snapshot', None)
+    if snapshot is not None and snapshot.get(field_name) == getattr(
+        instance, f'{field_name}_id'
+    ):
+        return get_inventoryitem_group_id(instance)
+    return (
+        type(instance)
+        .objects.filter(pk=instance.pk)
+        .values_list(GROUP_LOOKUPS[type(instance)], flat=True)
+        .first()
+    )
+
+
+def rebuild_inventoryitem_group_counts():
+    """
+    Recalculate stored counts of all groups from assets and types. Returns
+    number of groups whose counts were wrong.
+    """
+    direct_counts = {
+        'direct_asset_count': dict(
+            Asset.objects.filter(inventoryitem_type__inventoryitem_group__isnull=False)
+            .order_by()
+            .values_list('inventoryitem_type__inventoryitem_group')
+            .annotate(count=Count('pk'))
+        ),
+        'direct_inventoryitem_type_count': dict(
+            InventoryItemType.objects.filter(inventoryitem_group__isnull=False)
+            .order_by()
+            .values_list('inventoryitem_group')
+            .annotate(count=Count('pk'))
+        ),
+    }
+    groups = {group.pk: group for group in InventoryItemGroup.objects.all()}
+    counts = {
+        pk: dict.fromkeys([*COUNT_FIELDS, *COUNT_FIELDS.values()], 0) for pk in groups
+    }
+    for pk in groups:
+        for field, direct_field in COUNT_FIELDS.items():
+            count = direct_counts[direct_field].get(pk, 0)
+            counts[pk][direct_field] = count
+            # add to group itself and all its ancestors
+            ancestor_id = pk
+            while ancestor_id is not None:
+                counts[ancestor_id][field] += count
+                ancestor_id = groups[ancestor_id].parent_id
+
+    changed = []
+    for pk, group in groups.items():
+        if any(getattr(group, field) != value for field, value in counts[pk].items()):
+            for field, value in counts[pk].items():
+                setattr(group, field, value)
+            changed.append(group)
+    InventoryItemGroup.objects.bulk_update(
+        changed, [*COUNT_FIELDS, *COUNT_FIELDS.values()], batch_size=1000
+    )
+    return len(changed)
@@ -0,0 +1,336 @@
+import random
+from datetime import date, timedelta
+
+from dcim.models import (
+    Device,
+    DeviceRole,
+    DeviceType,
+    Location,
+    Manufacturer,
+    Rack,
+    RackType,
+    Site,
+)
+from tenancy.models import Tenant
+
+from .choices import AssetStatusChoices, ContractTypeChoices
+from .counters import rebuild_inventoryitem_group_counts
+from .models import (
+    Asset,
+    Contract,
+    Delivery,
+    InventoryItemGroup,
+    InventoryItemType,
+    Purchase,
+    Supplier,
+)
+from .utils import asset_update_search_text, get_status_for
+
+__all__ = ('DataGenerator',)
+
+ASSET_KINDS = ('device', 'inventoryitem', 'rack')
+ASSET_KIND_WEIGHTS = (6, 3, 1)
+
+
+class DataGenerator:
+    """
+    Generates a synthetic inventory: suppliers, purchases, deliveries,
+    contracts, nested inventory item groups and types, sites with locations
+    and racks, and assets of all kinds, some of them assigned to devices or
+    racks and some stored in locations.
+
+    Objects are created with bulk_create() where possible, so no change log
+    entries or events are created. Names, slugs and serials start with
+    ``prefix``, so the same database can hold more than one dataset.
+    Created objects are kept as attributes (e.g. ``sites``, ``assets``) for
+    use by benchmarks.
+    """
+
+    def __init__(self, prefix='gen', seed=0, batch_size=5000, log=None):
+        self.prefix = prefix
+        self.rng = random.Random(seed)
+        self.batch_size = batch_size
+        self.log = log or (lambda message: None)
+        self.today = date.today()
+
+    def generate(
+        self,
+        suppliers=10,
+        purchases=100,
+        deliveries=200,
+        contracts=100,
+        groups=20,
+        types=100,
+        device_types=20,
+        sites=10,
+        racks=10,
+        assets=10000,
+        assigned=0.3,
+    ):
+        """
+        Create dataset. ``racks`` is number of racks per site, ``assigned``
+        is fraction of device and rack assets assigned to hardware.
+        Returns dict of numbers of created objects.
+        """
+        self.create_dcim(device_types, sites, racks)
+        self.create_tenants()
+        self.create_deliveries(suppliers, purchases, deliveries)
+        self.create_contracts(contracts)
+        self.create_inventoryitem_types(groups, types)
+        self.create_assets(assets, assigned)
+        # types and assets were created in bulk, without signals
+        rebuild_inventoryitem_group_counts()
+        return {
+            'suppliers': len(self.suppliers),
+            'purchases': len(self.purchases),
+            'deliveries': len(self.deliveries),
+            'contracts': len(self.contracts),
+            'inventoryitem_groups': len(self.groups),
+            'inventoryitem_types': len(self.inventoryitem_types),
+            'device_types': len(self.device_types),
+            'sites': len(self.sites),
+            'racks': len(self.racks),
+            'assets': self.asset_count,
+            'devices': self.device_count,
+        }
+
+    def name(self, name, i):
+        return f'{self.prefix}-{name}-{i}'
+
+    def create_dcim(self, device_types, sites, racks):
+        self.manufacturers = [
+            Manufacturer.objects.create(
+                name=self.name('manufacturer', i), slug=self.name('manufacturer', i)
+            )
+            for i in range(5)
+        ]
+        self.device_types = [
+            DeviceType.objects.create(
+                manufacturer=self.rng.choice(self.manufacturers),
+                model=self.name('device-type', i),
+                slug=self.name('device-type', i),
+            )
+            for i in range(device_types)
+        ]
+        self.rack_type = RackType.objects.create(
+            manufacturer=self.manufacturers[0],
+            model=self.name('rack-type', 0),
+            slug=self.name('rack-type', 0),
+            form_factor='4-post-cabinet',
+        )
+        self.role = DeviceRole.objects.create(
+            name=self.name('role', 0), slug=self.name('role', 0)
+        )
+        self.sites = []
+        self.locations = []
+        for i in range(sites):
+            site = Site.objects.create(
+                name=self.name('site', i), slug=self.name('site', i), status='active'
+            )
+            self.sites.append(site)
+            # locations are a tree, so they are created one by one
+            self.locations.extend(
+                Location.objects.create(
+                    site=site,
+                    name=self.name(f'location-{i}', j),
+                    slug=self.name(f'location-{i}', j),
+                    status='active',
+                )
+                for j in range(3)
+            )
+        self.racks = Rack.objects.bulk_create(
+            Rack(
+                site_id=location.site_id,
+                location=location,
+                name=self.name('rack', i),
+                rack_type=self.rack_type,
+                status='active',
+            )
+            for i in range(sites * racks)
+            for location in [self.rng.choice(self.locations)]
+        )
+        self.log(f'Created {len(self.sites)} sites and {len(self.racks)} racks')
+
+    def create_tenants(self):
+        self.tenants = [
+            Tenant.objects.create(
+                name=self.name('tenant', i), slug=self.name('tenant', i)
+            )
+            for i in range(10)
+        ]
+
+    def create_deliveries(self, suppliers, purchases, deliveries):
+        self.suppliers = Supplier.objects.bulk_create(
+            Supplier(name=self.name('supplier', i), slug=self.name('supplier', i))
+            for i in range(suppliers)
+        )
+        self.purchases = Purchase.objects.bulk_create(
+            Purchase(
+                name=self.name('purchase', i),
+                supplier=self.rng.choice(self.suppliers),
+                status='closed',
+                date=self.today - timedelta(days=self.rng.randint(0, 2000)),
+            )
+            for i in range(purchases)
+        )
+        self.deliveries = Delivery.objects.bulk_create(
+            Delivery(
+                name=self.name('delivery', i),
+                purchase=purchase,
+                date=purchase.date + timedelta(days=self.rng.randint(0, 60)),
+            )
+            for i in range(deliveries)
+            for purchase in [self.rng.choice(self.purchases)]
+        )
+        self.log(
+            f'Created {len(self.suppliers)} suppliers, {len(self.purchases)} '
+            f'purchases and {len(self.deliveries)} deliveries'
+        )
+
+    def create_contracts(self, contracts):
+        self.contracts = []
+        for i in range(contracts):
+            start_date = self.today - timedelta(days=self.rng.randint(-365, 1500))
+            contract = Contract(
+                name=self.name('contract', i),
+                supplier=self.rng.choice(self.suppliers),
+                contract_type=self.rng.choice(ContractTypeChoices.values()),
+                status='draft',
+                start_date=start_date,
+                end_date=start_date + timedelta(days=self.rng.randint(365, 1825)),
+            )
+            # bulk_create skips pre_save receiver that sets status
+            contract.update_status_based_on_dates()
+            self.contracts.append(contract)
+        self.contracts = Contract.objects.bulk_create(self.contracts)
+        self.log(f'Created {len(self.contracts)} contracts')
+
+    def create_inventoryitem_types(self, groups, types):
+        # groups are a tree, so they are created one by one; each group is a
+        # child of a random earlier group, a quarter of them are roots
+        self.groups = []
+        for i in range(groups):
+            parent = None
+            if self.groups and self.rng.random() > 0.25:
+                parent = self.rng.choice(self.groups)
+            self.groups.append(
+                InventoryItemGroup.objects.create(
+                    name=self.name('group', i), parent=parent
+                )
+            )
+        self.inventoryitem_types = InventoryItemType.objects.bulk_create(
+            InventoryItemType(
+                manufacturer=self.rng.choice(self.manufacturers),
+                model=self.name('inventoryitem-type', i),
+                slug=self.name('inventoryitem-type', i),
+                inventoryitem_group=self.rng.choice(self.groups or [None]),
+            )
+            for i in range(types)
+        )
+        self.log(
+            f'Created {len(self.groups)} inventory item groups and '
+            f'{len(self.inventoryitem_types)} types'
+        )
+
+    def create_assets(self, count, assigned):
+        """
+        60% of assets are devices, 30% inventory items and 10% racks (at most
+        one per rack, rest are devices). Assigned devices are placed in
+        random racks. Half of unassigned assets are stored in a location.
+        """
+        self.stored_status = get_status_for('stored') or 'stored'
+        self.used_status = get_status_for('used') or 'used'
+        self.statuses = [
+            status
+            for status in AssetStatusChoices.values()
+            if status not in (self.stored_status, self.used_status)
+        ] or [self.stored_status]
+        self.free_racks = list(self.racks)
+        self.asset_count = 0
+        self.device_count = 0
+        for offset in range(0, count, self.batch_size):
+            assets = [
+                self.build_asset(i, assigned)
+                for i in range(offset, min(offset + self.batch_size, count))
+            ]
+            devices = Device.objects.bulk_create(
+                asset.device for asset in assets if asset.device
+            )
+            for asset in assets:
+                if asset.device:
+                    # set ids of now saved devices
+                    asset.device = asset.device
+                    asset.installed_device = asset.device
+                    asset.installed_site_id = asset.device.site_id
+                    asset.installed_location_id = asset.device.location_id
+                    asset.installed_rack_id = asset.device.rack_id
+            assets = Asset.objects.bulk_create(assets)
+            self.assign_contracts(assets)
+            asset_update_search_text(
+                Asset.objects.filter(pk__in=[asset.pk for asset in assets])
+            )
+            self.asset_count += len(assets)
+            self.device_count += len(devices)
+            self.log(f'Created {self.asset_count} assets')
+
+    def build_asset(self, i, assigned):
+        """
+        Return unsaved asset. Device it is assigned to is not saved either.
+        """
+        delivery = self.rng.choice(self.deliveries) if self.deliveries else None
+        warranty_start = self.today - timedelta(days=self.rng.randint(0, 2000))
+        asset = Asset(
+            serial=f'{self.prefix.upper()}{i:08d}',
+            asset_tag=f'{self.prefix.upper()}-TAG-{i:08d}',
+            owner=self.rng.choice([None, *self.tenants]),
+            tenant=self.rng.choice([None, *self.tenants]),
+            delivery=delivery,
+            purchase_id=delivery.purchase_id if delivery else None,
+            warranty_start=warranty_start,
+            warranty_end=warranty_start + timedelta(days=self.rng.randint(365, 1825)),
+        )
+        kind = self.rng.choices(ASSET_KINDS, ASSET_KIND_WEIGHTS)[0]
+        if kind == 'rack' and self.free_racks:
+            asset.rack_type = self.rack_type
+            if self.rng.random() < assigned:
+                asset.rack = self.free_racks.pop()
+                asset.installed_rack = asset.rack
+                asset.installed_site_id = asset.rack.site_id
+                asset.installed_location_id = asset.rack.location_id
+        elif kind == 'inventoryitem' and self.inventoryitem_types:
+            asset.inventoryitem_type = self.rng.choice(self.inventoryitem_types)
+        else:
+            asset.device_type = self.rng.choice(self.device_types)
+            if self.racks and self.rng.random() < assigned:
+                rack = self.rng.choice(self.racks)
+                asset.device = Device(
+                    name=self.name('device', i),
+                    device_type=asset.device_type,
+                    role=self.role,
+                    site_id=rack.site_id,
+                    location_id=rack.location_id,
+                    rack=rack,
+                    status='active',
+                    serial=asset.serial,
+                )
+
+        if asset.device or asset.rack:
+            asset.status = self.used_status
+        elif self.rng.random() < 0.5:
+            asset.status = self.stored_status
+            asset.storage_location = self.rng.choice(self.locations)
+        else:
+            asset.status = self.rng.choice(self.statuses)
+        return asset
+
+    def assign_contracts(self, assets):
+        if not self.contracts:
+            return
+        AssetContract = Asset.contract.through
+        AssetContract.objects.bulk_create(
+            AssetContract(asset_id=asset.pk, contract_id=contract.pk)
+            for asset in assets
+            for contract in self.rng.sample(
+                self.contracts, min(len(self.contracts), self.rng.randint(0, 2))
+            )
+        )
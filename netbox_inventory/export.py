@@ -0,0 +1,193 @@
+import csv
+import json
+
+from django.contrib.contenttypes.models import ContentType
+from django.contrib.postgres.expressions import ArraySubquery
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Case, CharField, F, OuterRef, Value, When
+from django.db.models.functions import Coalesce, Concat
+
+from extras.models import TaggedItem
+
+from .choices import AssetStatusChoices, HardwareKindChoices
+from .models import Contract
+
+__all__ = (
+    'EXPORT_COLUMNS',
+    'get_export_queryset',
+    'stream_csv',
+    'stream_json',
+    'stream_scans_csv',
+)
+
+# (column name, header, lookup in export queryset) of exported columns
+EXPORT_COLUMNS = (
+    ('id', 'ID', 'id'),
+    ('name', 'Name', 'name'),
+    ('asset_tag', 'Asset Tag', 'asset_tag'),
+    ('serial', 'Serial Number', 'serial'),
+    ('status', 'Status', 'status'),
+    ('kind', 'Kind', 'export_kind'),
+    ('manufacturer', 'Manufacturer', 'export_manufacturer'),
+    ('hardware_type', 'Hardware Type', 'export_hardware_type'),
+    (
+        'inventoryitem_group',
+        'Inventory Item Group',
+        'inventoryitem_type__inventoryitem_group__name',
+    ),
+    ('hardware', 'Hardware', 'export_hardware'),
+    ('installed_site', 'Installed Site', 'installed_site__name'),
+    ('installed_location', 'Installed Location', 'installed_location__name'),
+    ('installed_rack', 'Installed Rack', 'installed_rack__name'),
+    ('installed_device', 'Installed Device', 'installed_device__name'),
+    ('current_site', 'Current Site', 'export_current_site'),
+    ('current_location', 'Current Location', 'export_current_location'),
+    ('storage_location', 'Storage Location', 'storage_location__name'),
+    ('tenant', 'Tenant', 'tenant__name'),
+    ('contact', 'Contact', 'contact__name'),
+    ('owner', 'Owner', 'owner__name'),
+    ('supplier', 'Supplier', 'purchase__supplier__name'),
+    ('purchase', 'Purchase', 'purchase__name'),
+    ('purchase_date', 'Purchase Date', 'purchase__date'),
+    ('delivery', 'Delivery', 'delivery__name'),
+    ('delivery_date', 'Delivery Date', 'delivery__date'),
+    ('contracts', 'Contracts', 'export_contracts'),
+    ('warranty_start', 'Warranty Start', 'warranty_start'),
+    ('warranty_end', 'Warranty End', 'warranty_end'),
+    ('warranty_remaining', 'Warranty Remaining (days)', 'warranty_remaining_days'),
+    ('warranty_progress', 'Warranty Progress (%)', 'warranty_progress'),
+    ('tags', 'Tags', 'export_tags'),
+)
+
+
+def get_export_queryset(queryset):
+    """
+    Return values queryset with one dict per asset, with lookups from
+    EXPORT_COLUMNS as keys. Related objects, located and warranty columns are
+    computed in SQL, so no related objects are loaded while exporting.
+    """
+    asset_content_type = ContentType.objects.get_for_model(queryset.model)
+    return (
+        queryset.prefetch_related(None)
+        .with_warranty()
+        .annotate(
+            export_kind=Case(
+                When(device_type__isnull=False, then=Value('device')),
+                When(module_type__isnull=False, then=Value('module')),
+                When(inventoryitem_type__isnull=False, then=Value('inventoryitem')),
+                When(rack_type__isnull=False, then=Value('rack')),
+                output_field=CharField(),
+            ),
+            export_manufacturer=Coalesce(
+                'device_type__manufacturer__name',
+                'module_type__manufacturer__name',
+                'inventoryitem_type__manufacturer__name',
+                'rack_type__manufacturer__name',
+            ),
+            export_hardware_type=Coalesce(
+                'device_type__model',
+                'module_type__model',
+                'inventoryitem_type__model',
+                'rack_type__model',
+            ),
+            export_hardware=Coalesce(
+                'device__name',
+                Case(
+                    When(
+                        module__isnull=False,
+                        then=Concat(
+                            'module__module_bay__name',
+                            Value(': '),
+                            'module__module_type__model',
+                            output_field=CharField(),
+                        ),
+                    ),
+                ),
+                'inventoryitem__name',
+                'rack__name',
+            ),
+            export_current_site=Coalesce(
+                'installed_site__name', 'storage_location__site__name'
+            ),
+            export_current_location=Case(
+                # installed site without location returns no location
+                When(installed_site__isnull=False, then=F('installed_location__name')),
+                default=F('storage_location__name'),
+            ),
+            export_contracts=ArraySubquery(
+                Contract.objects.filter(assets=OuterRef('pk'))
+                .order_by('name')
+                .values('name')
+            ),
+            export_tags=ArraySubquery(
+                TaggedItem.objects.filter(
+                    content_type=asset_content_type, object_id=OuterRef('pk')
+                )
+                .order_by('tag__name')
+                .values('tag__name')
+            ),
+        )
+        # order by primary key, so rows can be streamed without sorting
+        .order_by('pk')
+        .values(*(lookup for _, _, lookup in EXPORT_COLUMNS))
+    )
+
+
+def _iter_rows(queryset, chunk_size):
+    """
+    Iterate over export rows (dicts keyed by column name) using a
+    server-side cursor, replacing status and kind values with their labels.
+    """
+    status_labels = dict(AssetStatusChoices)
+    kind_labels = dict(HardwareKindChoices)
+    for values in get_export_queryset(queryset).iterator(chunk_size=chunk_size):
+        row = {name: values[lookup] for name, _, lookup in EXPORT_COLUMNS}
+        row['status'] = status_labels.get(row['status'], row['status'])
+        row['kind'] = kind_labels.get(row['kind'], row['kind'])
+        yield row
+
+
+class _Echo:
+    """
+    File-like object that returns written value, used to stream csv.writer.
+    """
+
+    def write(self, value):
+        return value
+
+
+def stream_csv(queryset, chunk_size=2000):
+    """
+    Generate CSV export of assets line by line.
+    """
+    writer = csv.writer(_Echo())
+    yield writer.writerow([header for _, header, _ in EXPORT_COLUMNS])
+    for row in _iter_rows(queryset, chunk_size):
+        row['contracts'] = ', '.join(row['contracts'])
+        row['tags'] = ', '.join(row['tags'])
+        yield writer.writerow(
+            ['' if value is None else value for value in row.values()]
+        )
+
+
+def stream_json(queryset, chunk_size=2000):
+    """
+    Generate JSON export of assets (list of objects) one object at a time.
+    """
+    separator = '[\n'
+    for row in _iter_rows(queryset, chunk_size):
+        yield separator + json.dumps(row, cls=DjangoJSONEncoder)
+        separator = ',\n'
+    yield '[]\n' if separator == '[\n' else '\n]\n'
+
+
+def stream_scans_csv(queryset, chunk_size=2000):
+    """
+    Generate CSV export of audit scans line by line.
+    """
+    writer = csv.writer(_Echo())
+    yield writer.writerow(['Serial Number', 'Scanned'])
+    for serial, created in (
+        queryset.order_by('pk').values_list('serial', 'created').iterator(chunk_size)
+    ):
+        yield writer.writerow([serial, created.isoformat()])
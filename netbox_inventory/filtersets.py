@@ -23,9 +23,10 @@ from netbox.filtersets import NetBoxModelFilterSet
 from tenancy.models import Contact, ContactGroup, Tenant
 from utilities import filters
 
-from .choices import AssetStatusChoices, ContractStatusChoices, ContractTypeChoices, HardwareKindChoices, PurchaseStatusChoices
+from .choices import AssetStatusChoices, AuditSessionStatusChoices, ContractStatusChoices, ContractTypeChoices, HardwareKindChoices, PurchaseStatusChoices, WarrantyStatusChoices
 from .models import (
     Asset,
+    AuditSession,
     Contract,
     Delivery,
     InventoryItemGroup,
@@ -33,7 +34,7 @@ from .models import (
     Purchase,
     Supplier,
 )
-from .utils import get_asset_custom_fields_search_filters, query_located
+from .utils import query_located
 
 #
 # Assets
@@ -340,6 +341,18 @@ class AssetFilterSet(NetBoxModelFilterSet):
     )
     warranty_start = django_filters.DateFromToRangeFilter()
     warranty_end = django_filters.DateFromToRangeFilter()
+    warranty_status = django_filters.MultipleChoiceFilter(
+        choices=WarrantyStatusChoices,
+        method='filter_warranty',
+    )
+    warranty_progress__gte = django_filters.NumberFilter(
+        method='filter_warranty',
+        label='Warranty elapsed (%) at least',
+    )
+    warranty_progress__lte = django_filters.NumberFilter(
+        method='filter_warranty',
+        label='Warranty elapsed (%) at most',
+    )
     delivery_date = django_filters.DateFromToRangeFilter(
         field_name='delivery__date',
     )
@@ -410,30 +423,18 @@ class AssetFilterSet(NetBoxModelFilterSet):
         model = Asset
         fields = ('id', 'name', 'serial', 'asset_tag', 'description')
 
-    def search(self, queryset, name, value):
-        query = (
-            Q(id__contains=value)
-            | Q(serial__icontains=value)
-            | Q(name__icontains=value)
-            | Q(description__icontains=value)
-            | Q(asset_tag__icontains=value)
-            | Q(device_type__model__icontains=value)
-            | Q(module_type__model__icontains=value)
-            | Q(inventoryitem_type__model__icontains=value)
-            | Q(rack_type__model__icontains=value)
-            | Q(device__name__icontains=value)
-            | Q(inventoryitem__name__icontains=value)
-            | Q(rack__name__icontains=value)
-            | Q(delivery__name__icontains=value)
-            | Q(purchase__name__icontains=value)
-            | Q(purchase__supplier__name__icontains=value)
-            | Q(tenant__name__icontains=value)
-            | Q(owner__name__icontains=value)
-        )
-        custom_field_filters = get_asset_custom_fields_search_filters()
-        for custom_field_filter in custom_field_filters:
-            query |= Q(**{custom_field_filter: value})
+    def filter_warranty(self, queryset, name, value):
+        if name == 'warranty_status':
+            name = 'warranty_status__in'
+        return queryset.with_warranty().filter(**{name: value})
 
+    def search(self, queryset, name, value):
+        # search_text holds lowercased values of all searched fields and is
+        # trigram indexed. Plain LIKE on the column can use that index, while
+        # icontains (UPPER(search_text) LIKE ...) could not.
+        query = Q(search_text__contains=value.lower())
+        if value.isdigit():
+            query |= Q(pk=value)
         return queryset.filter(query)
 
     def filter_kind(self, queryset, name, value):
@@ -473,6 +474,7 @@ class AssetFilterSet(NetBoxModelFilterSet):
                 Q(device__isnull=False)
                 | Q(module__isnull=False)
                 | Q(inventoryitem__isnull=False)
+                | Q(rack__isnull=False)
             )
         else:
             # is not assigned to hardware kind
@@ -480,6 +482,7 @@ class AssetFilterSet(NetBoxModelFilterSet):
                 Q(device__isnull=True)
                 & Q(module__isnull=True)
                 & Q(inventoryitem__isnull=True)
+                & Q(rack__isnull=True)
             )
 
     def filter_installed(self, queryset, name, value):
@@ -489,7 +492,9 @@ class AssetFilterSet(NetBoxModelFilterSet):
         return query_located(queryset, 'site__slug', value, assets_shown='installed')
 
     def filter_installed_device(self, queryset, name, value):
-        return query_located(queryset, name, value, assets_shown='installed')
+        return query_located(
+            queryset, f'device__{name}', value, assets_shown='installed'
+        )
 
     def filter_located(self, queryset, name, value):
         return query_located(queryset, name, value)
@@ -688,31 +693,52 @@ class ContractFilterSet(NetBoxModelFilterSet):
         return queryset.filter(query)
 
     def filter_is_active(self, queryset, name, value):
-        from datetime import date
-        today = date.today()
-        if value:
-            return queryset.filter(start_date__lte=today, end_date__gte=today)
-        else:
-            return queryset.exclude(start_date__lte=today, end_date__gte=today)
+        return queryset.with_expiry().filter(is_active=value)
 
     def filter_is_expired(self, queryset, name, value):
-        from datetime import date
-        today = date.today()
-        if value:
-            return queryset.filter(end_date__lt=today)
-        else:
-            return queryset.exclude(end_date__lt=today)
+        return queryset.with_expiry().filter(is_expired=value)
 
     def filter_needs_renewal(self, queryset, name, value):
-        from datetime import date
-        today = date.today()
-        if value:
-            return queryset.filter(renewal_date__lte=today).exclude(renewal_date__isnull=True)
-        else:
-            return queryset.exclude(renewal_date__lte=today).filter(renewal_date__isnull=False)
+        return queryset.with_expiry().filter(needs_renewal=value)
+
+
+#
+# Audits
+#
+
+
+class AuditSessionFilterSet(NetBoxModelFilterSet):
+    status = django_filters.MultipleChoiceFilter(
+        choices=AuditSessionStatusChoices,
+    )
+    site_id = django_filters.ModelMultipleChoiceFilter(
+        field_name='site',
+        queryset=Site.objects.all(),
+        label='Site (ID)',
+    )
+    storage_location_id = django_filters.ModelMultipleChoiceFilter(
+        field_name='storage_location',
+        queryset=Location.objects.all(),
+        label='Storage location (ID)',
+    )
+
+    class Meta:
+        model = AuditSession
+        fields = ('id', 'name', 'status', 'description')
+
+    def search(self, queryset, name, value):
+        query = Q(
+            Q(name__icontains=value)
+            | Q(description__icontains=value)
+            | Q(site__name__icontains=value)
+            | Q(storage_location__name__icontains=value)
+        )
+        return queryset.filter(query)
+
 
 __all__ = (
     'AssetFilterSet',
+    'AuditSessionFilterSet',
     'ContractFilterSet',
     'DeliveryFilterSet',
     'InventoryItemGroupFilterSet',
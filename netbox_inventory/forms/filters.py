@@ -20,9 +20,10 @@ from utilities.forms.fields import DynamicModelMultipleChoiceField, TagFilterFie
 from utilities.forms.rendering import FieldSet
 from utilities.forms.widgets import DatePicker
 
-from ..choices import AssetStatusChoices, ContractStatusChoices, ContractTypeChoices, HardwareKindChoices, PurchaseStatusChoices
+from ..choices import AssetStatusChoices, AuditSessionStatusChoices, ContractStatusChoices, ContractTypeChoices, HardwareKindChoices, PurchaseStatusChoices, WarrantyStatusChoices
 from ..models import (
     Asset,
+    AuditSession,
     Contract,
     Delivery,
     InventoryItemGroup,
@@ -39,6 +40,7 @@ __all__ = (
     'InventoryItemTypeFilterForm',
     'InventoryItemGroupFilterForm',
     'ContractFilterForm',
+    'AuditSessionFilterForm',
 )
 
 
@@ -75,6 +77,7 @@ class AssetFilterForm(NetBoxModelFilterSetForm):
             'warranty_start_before',
             'warranty_end_after',
             'warranty_end_before',
+            'warranty_status',
             name='Purchase',
         ),
         FieldSet(
@@ -250,6 +253,11 @@ class AssetFilterForm(NetBoxModelFilterSetForm):
         label='Warranty ends on or before',
         widget=DatePicker,
     )
+    warranty_status = forms.MultipleChoiceField(
+        choices=WarrantyStatusChoices,
+        required=False,
+        label='Warranty status',
+    )
     storage_site_id = DynamicModelMultipleChoiceField(
         queryset=Site.objects.all(),
         required=False,
@@ -519,3 +527,28 @@ class ContractFilterForm(NetBoxModelFilterSetForm):
         widget=forms.Select(choices=BOOLEAN_WITH_BLANK_CHOICES),
     )
     tag = TagFilterField(model)
+
+
+class AuditSessionFilterForm(NetBoxModelFilterSetForm):
+    model = AuditSession
+    fieldsets = (
+        FieldSet('q', 'filter_id', 'tag'),
+        FieldSet('status', 'site_id', 'storage_location_id', name='Audit Session'),
+    )
+
+    status = forms.MultipleChoiceField(
+        choices=AuditSessionStatusChoices,
+        required=False,
+    )
+    site_id = DynamicModelMultipleChoiceField(
+        queryset=Site.objects.all(),
+        required=False,
+        label='Site',
+    )
+    storage_location_id = DynamicModelMultipleChoiceField(
+        queryset=Location.objects.all(),
+        required=False,
+        query_params={'site_id': '$site_id'},
+        label='Storage location',
+    )
+    tag = TagFilterField(model)
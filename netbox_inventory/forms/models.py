@@ -7,6 +7,7 @@ from utilities.forms.widgets import DatePicker
 
 from ..models import (
     Asset,
+    AuditSession,
     Contract,
     Delivery,
     InventoryItemGroup,
@@ -14,11 +15,12 @@ from ..models import (
     Purchase,
     Supplier,
 )
-from ..utils import get_tags_and_edit_protected_asset_fields
+from ..utils import get_edit_protected_fields_by_tag
 from netbox_inventory.choices import HardwareKindChoices
 
 __all__ = (
     'AssetForm',
+    'AuditSessionForm',
     'ContractForm',
     'SupplierForm',
     'PurchaseForm',
@@ -221,17 +223,14 @@ class AssetForm(NetBoxModelForm):
             return
 
         # Disable fields that should not be edited
-        tags = self.instance.tags.all().values_list('slug', flat=True)
-        tags_and_disabled_fields = get_tags_and_edit_protected_asset_fields()
-        
-        # Safety check: if no configuration is set, tags_and_disabled_fields might be None
+        tags_and_disabled_fields = get_edit_protected_fields_by_tag()
         if not tags_and_disabled_fields:
             return
+        tags = self.instance.tags.filter(
+            slug__in=tags_and_disabled_fields.keys()
+        ).values_list('slug', flat=True)
 
         for tag in tags:
-            if tag not in tags_and_disabled_fields:
-                continue
-
             for field in tags_and_disabled_fields[tag]:
                 if field in self.fields:
                     self.fields[field].disabled = True
@@ -511,3 +510,42 @@ class ContractForm(NetBoxModelForm):
                 asset.contract.add(contract)
         
         return contract
+
+
+class AuditSessionForm(NetBoxModelForm):
+    site = DynamicModelChoiceField(
+        queryset=Site.objects.all(),
+        help_text=AuditSession._meta.get_field('site').help_text,
+    )
+    storage_location = DynamicModelChoiceField(
+        queryset=Location.objects.all(),
+        help_text=AuditSession._meta.get_field('storage_location').help_text,
+        required=False,
+        query_params={'site_id': '$site'},
+        label='Storage location',
+    )
+    comments = CommentField()
+
+    fieldsets = (
+        FieldSet(
+            'name',
+            'status',
+            'site',
+            'storage_location',
+            'description',
+            'tags',
+            name='Audit Session',
+        ),
+    )
+
+    class Meta:
+        model = AuditSession
+        fields = (
+            'name',
+            'status',
+            'site',
+            'storage_location',
+            'description',
+            'comments',
+            'tags',
+        )
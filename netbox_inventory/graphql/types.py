@@ -12,6 +12,7 @@ from dcim.graphql.types import (
     ModuleTypeType,
     RackType,
     RackTypeType,
+    SiteType,
 )
 from extras.graphql.mixins import ImageAttachmentsMixin
 from netbox.graphql.types import NetBoxObjectType, OrganizationalObjectType
@@ -73,6 +74,14 @@ class AssetType(ImageAttachmentsMixin, NetBoxObjectType):
     storage_location: (
         Annotated['LocationType', strawberry.lazy('dcim.graphql.types')] | None
     )
+    installed_site: Annotated['SiteType', strawberry.lazy('dcim.graphql.types')] | None
+    installed_location: (
+        Annotated['LocationType', strawberry.lazy('dcim.graphql.types')] | None
+    )
+    installed_rack: Annotated['RackType', strawberry.lazy('dcim.graphql.types')] | None
+    installed_device: (
+        Annotated['DeviceType', strawberry.lazy('dcim.graphql.types')] | None
+    )
     owner: Annotated['TenantType', strawberry.lazy('tenancy.graphql.types')] | None
     delivery: (
         Annotated['DeliveryType', strawberry.lazy('netbox_inventory.graphql.types')]
@@ -82,8 +91,19 @@ class AssetType(ImageAttachmentsMixin, NetBoxObjectType):
         Annotated['PurchaseType', strawberry.lazy('netbox_inventory.graphql.types')]
         | None
     )
+    contract: list[
+        Annotated['ContractType', strawberry.lazy('netbox_inventory.graphql.types')]
+    ]
 
-    @strawberry.field
+    # fields kind is computed from, so that optimizer doesn't defer them
+    @strawberry_django.field(
+        only=[
+            'device_type_id',
+            'module_type_id',
+            'inventoryitem_type_id',
+            'rack_type_id',
+        ]
+    )
     def kind(self) -> str:
         """Asset kind (device, module, inventoryitem, or rack)"""
         return self.kind
@@ -91,7 +111,34 @@ class AssetType(ImageAttachmentsMixin, NetBoxObjectType):
 
 @strawberry_django.type(Contract, fields='__all__', filters=ContractFilter)
 class ContractType(NetBoxObjectType):
-    pass
+    @classmethod
+    def get_queryset(cls, queryset, info, **kwargs):
+        return super().get_queryset(queryset, info, **kwargs).with_expiry()
+
+    @strawberry.field
+    def days_until_expiry(self) -> int:
+        """Days until contract expires, 0 if expired"""
+        return self.days_until_expiry
+
+    @strawberry.field
+    def is_active(self) -> bool:
+        """Contract is currently active based on dates"""
+        return self.is_active
+
+    @strawberry.field
+    def is_expired(self) -> bool:
+        """Contract has expired"""
+        return self.is_expired
+
+    @strawberry.field
+    def needs_renewal(self) -> bool:
+        """Renewal date of contract has passed"""
+        return self.needs_renewal
+
+    @strawberry.field
+    def progress_percentage(self) -> float:
+        """Contract progress as a percentage (0-100)"""
+        return self.progress_percentage
 
 
 @strawberry_django.type(Delivery, fields='__all__', filters=DeliveryFilter)
@@ -0,0 +1,674 @@
+from collections import defaultdict
+
+from django import forms
+from django.contrib.contenttypes.models import ContentType
+from django.core.exceptions import (
+    NON_FIELD_ERRORS,
+    FieldDoesNotExist,
+    ValidationError,
+)
+from django.db.models.functions import Lower
+from django.utils.text import capfirst, slugify
+
+from core.choices import ObjectChangeActionChoices
+from dcim.models import DeviceType, ModuleType, RackType
+from extras.models import TaggedItem
+from netbox.search.backends import search_backend
+from utilities.forms import restrict_form_fields
+
+from .changelog import log_bulk_changes
+from .counters import update_inventoryitem_group_counts_for_assets
+from .models import Asset, Delivery, InventoryItemType, Purchase
+from .utils import (
+    asset_update_search_text,
+    clear_cached_asset_counts,
+    get_plugin_setting,
+)
+
+__all__ = (
+    'AssetImporter',
+    'bulk_create_assets',
+)
+
+HARDWARE_TYPE_MODELS = {
+    'device': DeviceType,
+    'module': ModuleType,
+    'inventoryitem': InventoryItemType,
+    'rack': RackType,
+}
+
+# fields used to create new hardware types, (field on type, form field)
+HARDWARE_TYPE_DEFAULTS = {
+    'device': (
+        ('part_number', 'part_number'),
+        ('description', 'model_description'),
+        ('comments', 'model_comments'),
+    ),
+    'module': (
+        ('part_number', 'part_number'),
+        ('description', 'model_description'),
+        ('comments', 'model_comments'),
+    ),
+    'inventoryitem': (
+        ('part_number', 'part_number'),
+        ('description', 'model_description'),
+        ('comments', 'model_comments'),
+    ),
+    'rack': (
+        ('description', 'model_description'),
+        ('comments', 'model_comments'),
+    ),
+}
+
+# foreign keys of assets, set to objects fetched by AssetImporter
+RELATED_FIELDS = [
+    field.name for field in Asset._meta.concrete_fields if field.is_relation
+]
+
+
+class AssetImporter:
+    """
+    Creates new assets from bulk import records with a fixed number of
+    queries, instead of validating and saving each record with its own form.
+
+    Import runs in these steps:
+        - clean values of all records with fields of model_form
+        - create missing related objects (suppliers, purchases, hardware types...)
+          once per distinct value, based on asset_import_create_* settings
+        - fetch related objects of each model with one query
+        - build assets and validate them against fetched objects, then with
+          full_clean() (which also runs CUSTOM_VALIDATORS)
+        - check uniqueness of serials and asset tags with one query each
+        - bulk_create assets, tags and change log entries
+
+    All errors are collected in errors as (record number, field name, message)
+    tuples. Field name is None for errors not related to a specific field.
+    Should be used inside a transaction, because related objects are created
+    before records are validated.
+
+    If user is given, related objects are restricted to those the user can
+    view, same as netbox does for each import form.
+    """
+
+    batch_size = 500
+
+    def __init__(self, model_form, records, headers=None, user=None):
+        # form is only used for its fields, it is never bound to data
+        self.form = model_form(headers=headers or {})
+        if user is not None:
+            restrict_form_fields(self.form, user)
+        self.user = user
+        self.records = records
+        self.errors = []
+        self.failed = set()
+
+    def run(self):
+        """
+        Import all records. Returns list of created assets or None if there
+        were any errors.
+        """
+        rows = [
+            (idx, record, self._clean_record(idx, record))
+            for idx, record in enumerate(self.records, start=1)
+        ]
+        self._create_related_objects(rows)
+        related = self._fetch_related_objects(rows)
+        assets = []
+        for idx, record, cleaned in rows:
+            asset = self._build_asset(idx, record, cleaned, related)
+            if asset is not None:
+                assets.append(asset)
+        self._validate_unique(assets)
+        if self.errors:
+            return None
+        return bulk_create_assets(assets, self.batch_size)
+
+    def add_error(self, idx, field_name, error):
+        if not isinstance(error, ValidationError):
+            error = ValidationError(error)
+        self.failed.add(idx)
+        if hasattr(error, 'error_dict'):
+            for name, messages in error.message_dict.items():
+                name = None if name == NON_FIELD_ERRORS else name
+                self.errors.extend((idx, name, message) for message in messages)
+        else:
+            self.errors.extend((idx, field_name, message) for message in error.messages)
+
+    def _restrict(self, queryset):
+        """
+        Restrict queryset of related objects that are not selected with form
+        fields (hardware types, purchases, deliveries).
+        """
+        if self.user is None:
+            return queryset
+        return queryset.restrict(self.user, 'view')
+
+    #
+    # Cleaning
+    #
+
+    def _clean_record(self, idx, record):
+        """
+        Return dict with cleaned values of record. Values of model choice
+        fields are only normalized here, related objects are fetched in bulk
+        later on.
+        """
+        cleaned = {}
+        custom_fields = getattr(self.form, 'custom_fields', {})
+        for field_name, field in self.form.fields.items():
+            if field_name == 'id':
+                continue
+            if field_name in custom_fields:
+                # same as netbox, use default value of custom fields not in record
+                value = record.get(field_name, custom_fields[field_name].default)
+            else:
+                value = record.get(field_name)
+            if (
+                isinstance(field, forms.ModelChoiceField)
+                and field_name not in custom_fields
+            ):
+                cleaned[field_name] = self._normalize_choice(field, value)
+                continue
+            try:
+                cleaned[field_name] = field.clean(value)
+            except ValidationError as e:
+                self.add_error(idx, field_name, e)
+        return cleaned
+
+    @staticmethod
+    def _normalize_choice(field, value):
+        if isinstance(field, forms.ModelMultipleChoiceField):
+            if value in field.empty_values:
+                return []
+            if isinstance(value, str):
+                value = value.split(',')
+            return [str(v).strip() for v in value if str(v).strip()]
+        if value in field.empty_values:
+            return None
+        return str(value)
+
+    #
+    # Creating related objects
+    #
+
+    def _create_related_objects(self, rows):
+        """
+        Bulk equivalent of AssetImportForm._create_related_objects(). Objects
+        are created one by one with save(), so they are change logged, but
+        only once per distinct value across all records.
+        """
+        if get_plugin_setting('asset_import_create_tenant'):
+            for field_name in ('tenant', 'owner'):
+                self._get_or_create_related(
+                    field_name, {cleaned[field_name] for _, _, cleaned in rows}
+                )
+        if get_plugin_setting('asset_import_create_purchase'):
+            self._create_purchases(rows)
+        for kind, model in HARDWARE_TYPE_MODELS.items():
+            if get_plugin_setting(f'asset_import_create_{kind}_type'):
+                self._create_hardware_types(
+                    kind,
+                    model,
+                    [row for row in rows if row[2].get('hardware_kind') == kind],
+                )
+
+    def _get_or_create_related(self, field_name, values):
+        """
+        Return {lowercase value: object} for related objects of field_name,
+        matched case insensitively and created if they don't exist.
+        Supports specifiying related object by name or slug.
+        """
+        values = {value for value in values if value}
+        if not values:
+            return {}
+        field = self.form.fields[field_name]
+        model = field.queryset.model
+        # user could have specified alternative field (tenant name or tenant slug)
+        to_field_name = field.to_field_name
+        objects = {}
+        for obj in model.objects.annotate(_import_key=Lower(to_field_name)).filter(
+            _import_key__in={value.lower() for value in values}
+        ):
+            objects.setdefault(obj._import_key, obj)
+        for value in sorted(values):
+            if value.lower() in objects:
+                continue
+            # create sensible default data, whatever field was in import data is used as is
+            obj = model(name=value, slug=slugify(value))
+            setattr(obj, to_field_name, value)
+            obj.save()
+            objects[value.lower()] = obj
+        return objects
+
+    def _create_purchases(self, rows):
+        rows = [row for row in rows if row[2].get('purchase') and row[2]['supplier']]
+        suppliers = self._get_or_create_related(
+            'supplier', {cleaned['supplier'] for _, _, cleaned in rows}
+        )
+        purchases = {
+            (purchase.supplier_id, purchase.name): purchase
+            for purchase in Purchase.objects.filter(
+                supplier__in=suppliers.values(),
+                name__in={cleaned['purchase'] for _, _, cleaned in rows},
+            )
+        }
+        deliveries = {
+            (delivery.purchase_id, delivery.name)
+            for delivery in Delivery.objects.filter(
+                purchase__in=purchases.values(),
+                name__in={cleaned['delivery'] for _, _, cleaned in rows},
+            )
+        }
+        receiving_contacts = self._fetch(
+            'receiving_contact',
+            {cleaned['receiving_contact'] for _, _, cleaned in rows},
+        )
+        for idx, _, cleaned in rows:
+            if idx in self.failed:
+                # dates or status of purchase and delivery are invalid
+                continue
+            supplier = suppliers[cleaned['supplier'].lower()]
+            purchase = purchases.get((supplier.pk, cleaned['purchase']))
+            if purchase is None:
+                purchase = Purchase(
+                    name=cleaned['purchase'],
+                    supplier=supplier,
+                    date=cleaned['purchase_date'],
+                    status=cleaned['purchase_status'],
+                )
+                purchase.save()
+                purchases[(supplier.pk, purchase.name)] = purchase
+            if (
+                not cleaned['delivery']
+                or (purchase.pk, cleaned['delivery']) in deliveries
+            ):
+                continue
+            receiving_contact = None
+            if cleaned['receiving_contact']:
+                receiving_contact = self._get_single(
+                    idx,
+                    'receiving_contact',
+                    receiving_contacts,
+                    cleaned['receiving_contact'],
+                )
+                if receiving_contact is None:
+                    continue
+            Delivery(
+                name=cleaned['delivery'],
+                purchase=purchase,
+                date=cleaned['delivery_date'],
+                receiving_contact=receiving_contact,
+            ).save()
+            deliveries.add((purchase.pk, cleaned['delivery']))
+
+    def _create_hardware_types(self, kind, model, rows):
+        rows = [row for row in rows if row[2].get('model_name')]
+        manufacturers = self._get_or_create_related(
+            'manufacturer', {cleaned['manufacturer'] for _, _, cleaned in rows}
+        )
+        hardware_types = {}
+        for hardware_type in model.objects.filter(
+            manufacturer__in=manufacturers.values()
+        ).annotate(_import_key=Lower('model')):
+            hardware_types.setdefault(
+                (hardware_type.manufacturer_id, hardware_type._import_key),
+                hardware_type,
+            )
+        for idx, _, cleaned in rows:
+            if not cleaned['manufacturer']:
+                continue
+            manufacturer = manufacturers[cleaned['manufacturer'].lower()]
+            key = (manufacturer.pk, cleaned['model_name'].lower())
+            if key in hardware_types:
+                continue
+            if idx in self.failed:
+                continue
+            hardware_type = model(
+                manufacturer=manufacturer,
+                model=cleaned['model_name'],
+                **{
+                    type_field: cleaned[form_field]
+                    for type_field, form_field in HARDWARE_TYPE_DEFAULTS[kind]
+                },
+            )
+            if kind != 'module':
+                hardware_type.slug = slugify(cleaned['model_name'])
+            hardware_type.save()
+            hardware_types[key] = hardware_type
+
+    #
+    # Fetching related objects
+    #
+
+    def _fetch(self, field_name, values, queryset=None):
+        """
+        Return {value: [objects]} for objects of model choice field that match
+        any of values on field's to_field_name.
+        """
+        values = {value for value in values if value}
+        if not values:
+            return {}
+        field = self.form.fields[field_name]
+        to_field_name = field.to_field_name or 'pk'
+        if queryset is None:
+            queryset = field.queryset
+        objects = defaultdict(list)
+        for obj in queryset.filter(**{f'{to_field_name}__in': values}):
+            objects[str(getattr(obj, to_field_name))].append(obj)
+        return objects
+
+    def _fetch_multiple(self, field_name, rows):
+        values = set()
+        for _, _, cleaned in rows:
+            values.update(cleaned[field_name])
+        return self._fetch(field_name, values)
+
+    def _fetch_related_objects(self, rows):
+        """
+        Return {field name: {value: [objects]}} for all related fields with one
+        query per field, and hardware types, purchases and deliveries with one
+        query per model.
+        """
+
+        def values(field_name):
+            return {cleaned.get(field_name) for _, _, cleaned in rows}
+
+        related = {
+            field_name: self._fetch(field_name, values(field_name))
+            for field_name in (
+                'manufacturer',
+                'storage_site',
+                'owner',
+                'receiving_contact',
+                'supplier',
+                'tenant',
+                'contact',
+            )
+        }
+        related['storage_location'] = self._fetch(
+            'storage_location',
+            values('storage_location'),
+            self.form.fields['storage_location'].queryset.select_related('site'),
+        )
+        related['tags'] = self._fetch_multiple('tags', rows)
+
+        manufacturers = [
+            obj for objs in related['manufacturer'].values() for obj in objs
+        ]
+        for kind, model in HARDWARE_TYPE_MODELS.items():
+            related[f'{kind}_type'] = {
+                (hardware_type.manufacturer_id, hardware_type.model): hardware_type
+                for hardware_type in self._restrict(model.objects.all()).filter(
+                    manufacturer__in=manufacturers,
+                    model__in={
+                        cleaned.get('model_name')
+                        for _, _, cleaned in rows
+                        if cleaned.get('hardware_kind') == kind
+                    },
+                )
+            }
+
+        suppliers = [obj for objs in related['supplier'].values() for obj in objs]
+        related['purchase'] = {
+            (purchase.supplier_id, purchase.name): purchase
+            for purchase in self._restrict(Purchase.objects.all()).filter(
+                supplier__in=suppliers, name__in=values('purchase')
+            )
+        }
+        related['delivery'] = {
+            (delivery.purchase_id, delivery.name): delivery
+            for delivery in self._restrict(
+                Delivery.objects.select_related('purchase')
+            ).filter(
+                purchase__in=related['purchase'].values(),
+                name__in=values('delivery'),
+            )
+        }
+        return related
+
+    def _get_single(self, idx, field_name, objects, value):
+        """
+        Return single object for value of field or None and add error same as
+        CSVModelChoiceField would.
+        """
+        if value is None:
+            return None
+        found = objects.get(value, [])
+        if len(found) == 1:
+            return found[0]
+        if found:
+            self.add_error(
+                idx,
+                field_name,
+                f'"{value}" is not a unique value for this field; multiple objects were found',
+            )
+        else:
+            self.add_error(idx, field_name, f'Object not found: {value}')
+        return None
+
+    #
+    # Building assets
+    #
+
+    def _build_asset(self, idx, record, cleaned, related):  # noqa: C901
+        """
+        Return unsaved Asset for record or None if record is invalid.
+        Tags are stored in asset._tags.
+        """
+        if idx in self.failed:
+            # don't report errors caused by invalid values again
+            return None
+        values = {}
+        for field_name in (
+            'manufacturer',
+            'storage_site',
+            'owner',
+            'receiving_contact',
+            'supplier',
+            'tenant',
+            'contact',
+        ):
+            values[field_name] = self._get_single(
+                idx, field_name, related[field_name], cleaned[field_name]
+            )
+
+        # storage_location must be in storage_site
+        storage_location = None
+        if cleaned['storage_location'] is not None:
+            site_field_name = self.form.fields['storage_site'].to_field_name
+            storage_location = self._get_single(
+                idx,
+                'storage_location',
+                {
+                    cleaned['storage_location']: [
+                        location
+                        for location in related['storage_location'].get(
+                            cleaned['storage_location'], []
+                        )
+                        if cleaned['storage_site'] is not None
+                        and str(getattr(location.site, site_field_name))
+                        == cleaned['storage_site']
+                    ]
+                },
+                cleaned['storage_location'],
+            )
+        values['storage_location'] = storage_location
+
+        tags = []
+        for tag in cleaned['tags']:
+            tag = self._get_single(idx, 'tags', related['tags'], tag)
+            if tag is not None:
+                tags.append(tag)
+
+        kind = cleaned['hardware_kind']
+        manufacturer = values['manufacturer']
+        hardware_type = None
+        if manufacturer is not None:
+            hardware_type = related[f'{kind}_type'].get(
+                (manufacturer.pk, cleaned['model_name'])
+            )
+            if hardware_type is None:
+                self.add_error(
+                    idx,
+                    'model_name',
+                    f'Hardware type not found: "{kind}", "{manufacturer}", "{cleaned["model_name"]}"',
+                )
+
+        purchase = None
+        if cleaned['purchase']:
+            supplier = values['supplier']
+            purchase = related['purchase'].get(
+                (supplier.pk if supplier else None, cleaned['purchase'])
+            )
+            if purchase is None:
+                self.add_error(
+                    idx,
+                    'purchase',
+                    f'Unable to find purchase {supplier} {cleaned["purchase"]}',
+                )
+        values['purchase'] = purchase
+
+        delivery = None
+        if cleaned['delivery']:
+            delivery = related['delivery'].get(
+                (purchase.pk if purchase else None, cleaned['delivery'])
+            )
+            if delivery is None:
+                self.add_error(
+                    idx,
+                    'delivery',
+                    f'Unable to find delivery {purchase} {cleaned["delivery"]}',
+                )
+        values['delivery'] = delivery
+
+        if idx in self.failed:
+            return None
+
+        asset = Asset(**{f'{kind}_type': hardware_type})
+        for field_name in self.form.fields:
+            try:
+                model_field = Asset._meta.get_field(field_name)
+            except FieldDoesNotExist:
+                continue
+            if not model_field.concrete or model_field.many_to_many:
+                continue
+            if field_name not in record and model_field.has_default():
+                # same as model forms, keep model default for omitted fields
+                continue
+            setattr(asset, field_name, values.get(field_name, cleaned.get(field_name)))
+
+        for cf_name, custom_field in getattr(self.form, 'custom_fields', {}).items():
+            value = custom_field.serialize(cleaned[cf_name])
+            asset.custom_field_data[custom_field.name] = value
+            try:
+                custom_field.validate(value)
+            except ValidationError as e:
+                self.add_error(idx, cf_name, e)
+        if idx in self.failed:
+            # don't report invalid custom fields again from full_clean()
+            return None
+
+        try:
+            # related objects were fetched above, so they are not checked again
+            # and uniqueness is checked for all assets at once
+            asset.full_clean(
+                exclude=RELATED_FIELDS,
+                validate_unique=False,
+                validate_constraints=False,
+            )
+        except ValidationError as e:
+            self.add_error(idx, None, e)
+            return None
+        asset._import_idx = idx
+        asset._tags = tags
+        return asset
+
+    def _validate_unique(self, assets):
+        """
+        Check unique constraints on serial and asset tag against existing
+        assets and other imported assets.
+        """
+        type_fields = [f'{kind}_type_id' for kind in HARDWARE_TYPE_MODELS]
+        serials = {asset.serial for asset in assets if asset.serial}
+        existing_serials = set()
+        for *type_ids, serial in Asset.objects.filter(serial__in=serials).values_list(
+            *type_fields, 'serial'
+        ):
+            existing_serials.add((tuple(type_ids), serial))
+        asset_tags = {asset.asset_tag for asset in assets if asset.asset_tag}
+        existing_asset_tags = set(
+            Asset.objects.filter(asset_tag__in=asset_tags).values_list(
+                'owner_id', 'asset_tag'
+            )
+        )
+
+        for asset in assets:
+            if asset.serial:
+                key = (
+                    tuple(getattr(asset, type_field) for type_field in type_fields),
+                    asset.serial,
+                )
+                if key in existing_serials:
+                    type_field = Asset._meta.get_field(f'{asset.kind}_type')
+                    self.add_error(
+                        asset._import_idx,
+                        None,
+                        f'Asset with this {capfirst(type_field.verbose_name)} and Serial Number already exists.',
+                    )
+                existing_serials.add(key)
+            if asset.asset_tag:
+                key = (asset.owner_id, asset.asset_tag)
+                if key in existing_asset_tags:
+                    if asset.owner_id:
+                        message = 'Asset with this Owner and Asset Tag already exists.'
+                    else:
+                        message = (
+                            'Asset with this Asset Tag and no Owner already exists.'
+                        )
+                    self.add_error(asset._import_idx, None, message)
+                existing_asset_tags.add(key)
+
+
+def bulk_create_assets(assets, batch_size=500):
+    """
+    Save new assets with bulk_create() and do in bulk what would otherwise be
+    done for each asset by save() and signals: set tags (asset._tags) and
+    contracts (asset._contracts), build search text, update inventory item
+    group counts, cache values for search and log changes.
+    Assets must not be assigned to hardware, since hardware is not updated.
+    Returns list of created assets.
+    """
+    assets = Asset.objects.bulk_create(assets, batch_size=batch_size)
+    content_type = ContentType.objects.get_for_model(Asset)
+    TaggedItem.objects.bulk_create(
+        [
+            TaggedItem(content_type=content_type, object_id=asset.pk, tag=tag)
+            for asset in assets
+            for tag in asset._tags
+        ],
+        batch_size=batch_size,
+    )
+    AssetContract = Asset.contract.through
+    AssetContract.objects.bulk_create(
+        [
+            AssetContract(asset_id=asset.pk, contract_id=contract.pk)
+            for asset in assets
+            for contract in getattr(asset, '_contracts', [])
+        ],
+        batch_size=batch_size,
+    )
+    for asset in assets:
+        # tags and contracts are known, so serializing assets for change log
+        # and events doesn't need any queries
+        asset._prefetched_objects_cache = {
+            'tags': list(asset._tags),
+            'contract': list(getattr(asset, '_contracts', [])),
+        }
+    asset_update_search_text(
+        Asset.objects.filter(pk__in=[asset.pk for asset in assets])
+    )
+    update_inventoryitem_group_counts_for_assets(assets)
+    search_backend.cache(assets, remove_existing=False)
+    log_bulk_changes(assets, ObjectChangeActionChoices.ACTION_CREATE, batch_size)
+    clear_cached_asset_counts()
+    return assets
@@ -0,0 +1,162 @@
+import time
+from functools import wraps
+
+from django.db import connection
+from prometheus_client import Histogram
+
+from netbox.plugins import PluginTemplateExtension
+
+from .utils import get_plugin_setting
+
+__all__ = (
+    'InstrumentationMiddleware',
+    'Measurement',
+    'instrument_template_extensions',
+    'is_instrumentation_enabled',
+)
+
+LABELS = ('kind', 'name')
+
+DURATION = Histogram(
+    'netbox_inventory_duration_seconds',
+    'Wall time of netbox_inventory views, API actions and template extensions',
+    LABELS,
+)
+DB_DURATION = Histogram(
+    'netbox_inventory_db_duration_seconds',
+    'Time spent in SQL queries by netbox_inventory views, API actions and '
+    'template extensions',
+    LABELS,
+)
+QUERIES = Histogram(
+    'netbox_inventory_queries',
+    'Number of SQL queries made by netbox_inventory views, API actions and '
+    'template extensions',
+    LABELS,
+    buckets=(0, 1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, float('inf')),
+)
+
+PLUGIN_NAMESPACES = {
+    'netbox_inventory': 'view',
+    'netbox_inventory-api': 'api',
+}
+
+TEMPLATE_EXTENSION_METHODS = ('left_page', 'right_page')
+
+
+def is_instrumentation_enabled():
+    return bool(get_plugin_setting('instrumentation'))
+
+
+class Measurement:
+    """
+    Context manager measuring wall time, number of SQL queries and time spent
+    in them on the default database connection.
+    """
+
+    def __init__(self):
+        self.queries = 0
+        self.db_duration = 0.0
+        self.duration = 0.0
+
+    def __enter__(self):
+        self._wrapper = connection.execute_wrapper(self._execute)
+        self._wrapper.__enter__()
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.duration = time.perf_counter() - self._start
+        self._wrapper.__exit__(*exc_info)
+
+    def _execute(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.queries += 1
+            self.db_duration += time.perf_counter() - start
+
+    def observe(self, kind, name):
+        """
+        Record measurement in prometheus metrics
+        """
+        DURATION.labels(kind, name).observe(self.duration)
+        DB_DURATION.labels(kind, name).observe(self.db_duration)
+        QUERIES.labels(kind, name).observe(self.queries)
+
+
+def get_view_name(request):
+    """
+    Return (kind, name) of netbox_inventory view or API action that handled
+    request, or None for views of other apps.
+    """
+    match = request.resolver_match
+    if match is None or not match.namespaces:
+        return None
+    kind = PLUGIN_NAMESPACES.get(match.namespaces[-1])
+    if kind is None:
+        return None
+    method = request.method.lower()
+    # DRF viewsets
+    if hasattr(match.func, 'cls'):
+        actions = getattr(match.func, 'actions', None) or {}
+        return kind, f'{match.func.cls.__name__}.{actions.get(method, method)}'
+    view_class = getattr(match.func, 'view_class', None)
+    view_name = view_class.__name__ if view_class else match.func.__name__
+    return kind, f'{view_name}.{method}'
+
+
+class InstrumentationMiddleware:
+    """
+    Record duration and SQL queries of requests handled by netbox_inventory
+    views and API viewsets when instrumentation setting is enabled.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if not is_instrumentation_enabled():
+            return self.get_response(request)
+        with Measurement() as measurement:
+            response = self.get_response(request)
+        # request is resolved only after middleware is called
+        view_name = get_view_name(request)
+        if view_name:
+            measurement.observe(*view_name)
+        return response
+
+
+def instrument(method, name):
+    @wraps(method)
+    def wrapper(self, *args, **kwargs):
+        if not is_instrumentation_enabled():
+            return method(self, *args, **kwargs)
+        with Measurement() as measurement:
+            result = method(self, *args, **kwargs)
+        measurement.observe('template_extension', name)
+        return result
+
+    return wrapper
+
+
+def instrument_template_extensions(template_extensions):
+    """
+    Wrap left_page and right_page of given template extensions so that
+    calls are recorded under name of extension class, even if method is
+    inherited. Returns template_extensions.
+    """
+    for extension in template_extensions:
+        for method_name in TEMPLATE_EXTENSION_METHODS:
+            method = getattr(extension, method_name)
+            method = getattr(method, '__wrapped__', method)
+            if method is getattr(PluginTemplateExtension, method_name):
+                # not implemented by extension
+                continue
+            setattr(
+                extension,
+                method_name,
+                instrument(method, f'{extension.__name__}.{method_name}'),
+            )
+    return template_extensions
@@ -0,0 +1,345 @@
+import logging
+import re
+from contextlib import ExitStack, contextmanager
+from datetime import date
+
+from django import forms
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from django.forms.utils import ErrorDict
+from django.http import QueryDict
+from django.utils import timezone
+from django_rq import get_connection
+from rq.exceptions import NoSuchJobError
+from rq.job import Job as RQJob
+from rq.job import JobStatus as RQJobStatus
+
+from core.choices import JobStatusChoices
+from core.models import Job
+from netbox.jobs import JobRunner
+from netbox.registry import registry
+from utilities.exceptions import PermissionsViolation
+from utilities.forms import restrict_form_fields
+from utilities.request import NetBoxFakeRequest
+
+from .contract_statuses import (
+    AUTO_UPDATED_STATUSES,
+    apply_status_updates,
+    get_status_updates,
+)
+from .models import Asset, BulkJobItems, Contract
+from .utils import get_plugin_setting, get_tags_that_protect_asset_from_deletion
+
+__all__ = (
+    'JOB_RUNNERS',
+    'AssetBulkDeleteJob',
+    'AssetBulkEditJob',
+    'AssetBulkImportJob',
+    'ChunkedJob',
+    'ContractStatusUpdateJob',
+    'get_job_runner',
+    'is_resumable',
+    'run_in_background',
+)
+
+logger = logging.getLogger('netbox.netbox_inventory.jobs')
+
+# errors of import view start with number of record within chunk
+RECORD_NUMBER = re.compile(r'^Record (\d+)')
+
+
+def run_in_background(count):
+    """
+    Return True if bulk operation on count objects should run as a
+    background job, based on background_job_threshold setting.
+    """
+    threshold = get_plugin_setting('background_job_threshold')
+    return bool(threshold) and count > threshold
+
+
+class ChunkedJob(JobRunner):
+    """
+    Base of background jobs that process a list of items in chunks of
+    background_job_chunk_size items.
+
+    Each chunk is processed in its own transaction, which also saves progress
+    to job data. If job is interrupted (e.g. worker crashed), a new job can
+    resume it from first unprocessed chunk. Items to process (pks or import
+    records) are stored once in BulkJobItems of the job, so saving progress
+    writes only job data, which holds:
+        - params: keyword arguments for process_chunk()
+        - total, processed: number of all and of already processed items
+        - results: counts of processed objects (e.g. {'updated': 10})
+        - errors: list of error messages
+        - resumed_by: pk of job that resumed this one
+    """
+
+    class Meta:
+        name = 'Chunked job'
+
+    def run(self, items=None, resume_job=None, **params):
+        if resume_job is not None:
+            self.job.data = self.take_over(resume_job)
+            items = BulkJobItems.objects.get(job=self.job).items
+        else:
+            BulkJobItems.objects.create(job=self.job, items=items)
+            self.job.data = {
+                'params': params,
+                'total': len(items),
+                'processed': 0,
+                'results': {},
+                'errors': [],
+            }
+        self.job.save(update_fields=['data'])
+        data = self.job.data
+        chunk_size = get_plugin_setting('background_job_chunk_size')
+        while data['processed'] < data['total']:
+            offset = data['processed']
+            chunk = items[offset : offset + chunk_size]
+            with self.request_context() as request, transaction.atomic():
+                results, errors = self.process_chunk(
+                    request, chunk, offset, **data['params']
+                )
+                # progress is saved only when chunk is committed
+                for name, count in results.items():
+                    data['results'][name] = data['results'].get(name, 0) + count
+                data['errors'].extend(errors)
+                data['processed'] += len(chunk)
+                self.job.save(update_fields=['data'])
+            logger.info(f'{self.job}: processed {data["processed"]} of {data["total"]}')
+        # finished job can't be resumed, items are no longer needed
+        BulkJobItems.objects.filter(job=self.job).delete()
+
+    def process_chunk(self, request, chunk, offset, **params):
+        """
+        Process chunk of items starting at offset. Returns (results, errors)
+        of this chunk. Raising an exception rolls back the chunk and fails the
+        job, which can then be resumed from the same chunk.
+        """
+        raise NotImplementedError
+
+    def take_over(self, job_id):
+        """
+        Return data of interrupted job, to continue from where it stopped.
+        Items are moved from old job, so it can't be resumed again.
+        """
+        with transaction.atomic():
+            job = Job.objects.select_for_update().get(pk=job_id)
+            if not is_resumable(job, check_worker=False):
+                raise ValueError(f'Job {job} can not be resumed')
+            data = job.data
+            BulkJobItems.objects.filter(job=job).update(job=self.job)
+            job.data = {**data, 'resumed_by': self.job.pk}
+            if job.status not in JobStatusChoices.TERMINAL_STATE_CHOICES:
+                # worker died without marking job as finished
+                job.status = JobStatusChoices.STATUS_ERRORED
+                job.completed = timezone.now()
+            job.save()
+        return data
+
+    @contextmanager
+    def request_context(self):
+        """
+        Run request processors (change logging, events) with a fake request
+        made by user of job, so changes are logged the same as in views.
+        Jobs without user (e.g. enqueued by management commands) are run
+        without request, same as management commands.
+        """
+        if self.job.user is None:
+            yield None
+            return
+        request = NetBoxFakeRequest(
+            {
+                'META': {},
+                'POST': QueryDict(),
+                'GET': QueryDict(),
+                'FILES': {},
+                'user': self.job.user,
+                'path': '',
+                'id': self.job.job_id,
+            }
+        )
+        with ExitStack() as stack:
+            for request_processor in registry['request_processors']:
+                stack.enter_context(request_processor(request))
+            yield request
+
+
+def get_view(view_class, request, action):
+    """
+    Return instance of view_class set up for request, with queryset
+    restricted for action, same as when dispatched.
+    """
+    view = view_class()
+    view.setup(request)
+    view.queryset = view.queryset.restrict(request.user, action)
+    return view
+
+
+def check_permissions(queryset, objects):
+    """
+    Enforce object-level permissions on saved objects, same as bulk views.
+    """
+    if queryset.filter(pk__in=[obj.pk for obj in objects]).count() != len(objects):
+        raise PermissionsViolation
+
+
+class ImportRecords(forms.Form):
+    """
+    Stand-in for BulkImportForm with already parsed records, so
+    create_and_update_objects() of import view can be reused.
+    """
+
+    def __init__(self, records, headers):
+        super().__init__(data={})
+        self.cleaned_data = {'data': records}
+        self._csv_headers = headers
+        self._errors = ErrorDict()
+
+
+class AssetBulkImportJob(ChunkedJob):
+    """
+    Import asset records (parsed data of bulk import form). Records of a
+    chunk with any errors are not imported, errors are added to job data.
+    """
+
+    class Meta:
+        name = 'Asset bulk import'
+
+    def process_chunk(self, request, records, offset, headers=None):
+        # imported here, views import this module
+        from .views import AssetBulkImportView
+
+        view = get_view(AssetBulkImportView, request, 'add')
+        form = ImportRecords(records, headers)
+        try:
+            with transaction.atomic():
+                assets = view.create_and_update_objects(form, request)
+                check_permissions(view.queryset, assets)
+        except ValidationError:
+            # renumber records from start of import instead of chunk
+            return {}, [
+                RECORD_NUMBER.sub(
+                    lambda match: f'Record {int(match[1]) + offset}', error
+                )
+                for error in form.non_field_errors()
+            ]
+        return {'imported': len(assets)}, []
+
+
+class AssetBulkEditJob(ChunkedJob):
+    """
+    Apply bulk edit form data to assets with given pks.
+    """
+
+    class Meta:
+        name = 'Asset bulk edit'
+
+    def process_chunk(self, request, pks, offset, post_data=None):
+        from .views import AssetBulkEditView
+
+        # skip assets deleted since job was enqueued
+        pks = list(Asset.objects.filter(pk__in=pks).values_list('pk', flat=True))
+        if not pks:
+            return {}, []
+        request.POST = QueryDict(mutable=True)
+        for name, values in post_data.items():
+            request.POST.setlist(name, values)
+        request.POST.setlist('pk', pks)
+        view = get_view(AssetBulkEditView, request, 'change')
+        form = view.form(request.POST, initial={'pk': pks})
+        restrict_form_fields(form, request.user)
+        if not form.is_valid():
+            return {}, [
+                f'{name}: {", ".join(errors)}' for name, errors in form.errors.items()
+            ]
+        assets = view._update_objects(form, request)
+        check_permissions(view.queryset, assets)
+        return {'updated': len(assets)}, []
+
+
+class AssetBulkDeleteJob(ChunkedJob):
+    """
+    Delete assets with given pks. Assets protected by tags are skipped.
+    """
+
+    class Meta:
+        name = 'Asset bulk delete'
+
+    def process_chunk(self, request, pks, offset):
+        queryset = Asset.objects.restrict(request.user, 'delete').filter(pk__in=pks)
+        protected_tags = get_tags_that_protect_asset_from_deletion() or []
+        errors = [
+            f'Cannot delete asset {asset} protected by tags: {", ".join(protected_tags)}'
+            for asset in queryset.filter(tags__slug__in=protected_tags).distinct()
+        ]
+        deleted = 0
+        for asset in queryset.exclude(tags__slug__in=protected_tags):
+            asset.snapshot()
+            asset.delete()
+            deleted += 1
+        return {'deleted': deleted}, errors
+
+
+class ContractStatusUpdateJob(ChunkedJob):
+    """
+    Update statuses of contracts with given pks based on their dates, as
+    they were on given day.
+    """
+
+    class Meta:
+        name = 'Contract status update'
+
+    def process_chunk(self, request, pks, offset, today):
+        contracts = Contract.objects.filter(
+            pk__in=pks, status__in=AUTO_UPDATED_STATUSES
+        )
+        updated = apply_status_updates(
+            contracts, get_status_updates(date.fromisoformat(today))
+        )
+        return {'updated': updated}, []
+
+
+JOB_RUNNERS = {
+    runner.name: runner
+    for runner in (
+        AssetBulkImportJob,
+        AssetBulkEditJob,
+        AssetBulkDeleteJob,
+        ContractStatusUpdateJob,
+    )
+}
+
+
+def get_job_runner(job):
+    """
+    Return ChunkedJob subclass that runs job, or None for other jobs.
+    """
+    return JOB_RUNNERS.get(job.name)
+
+
+def is_resumable(job, check_worker=True):
+    """
+    Return True if job was interrupted before it processed all items. A job
+    that is still running is resumable only if its RQ job is no longer
+    being worked on (RQ marks jobs of crashed workers as failed).
+    """
+    data = job.data or {}
+    if (
+        get_job_runner(job) is None
+        or 'total' not in data
+        or data.get('resumed_by')
+        or data['processed'] >= data['total']
+    ):
+        return False
+    if job.status in (JobStatusChoices.STATUS_ERRORED, JobStatusChoices.STATUS_FAILED):
+        return True
+    if job.status != JobStatusChoices.STATUS_RUNNING:
+        return False
+    if not check_worker:
+        return True
+    try:
+        rq_job = RQJob.fetch(str(job.job_id), connection=get_connection())
+    except NoSuchJobError:
+        return True
+    return rq_job.get_status() != RQJobStatus.STARTED
@@ -0,0 +1,176 @@
+import json
+import time
+from datetime import date, timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+
+from netbox_inventory.datagen import DataGenerator
+from netbox_inventory.filtersets import AssetFilterSet
+from netbox_inventory.models import Asset
+from netbox_inventory.tables import AssetTable
+from netbox_inventory.utils import get_status_for
+
+BATCH_SIZE = 10000
+PAGE_SIZE = 50
+
+
+class Command(BaseCommand):
+    help = (
+        'Generate a synthetic asset dataset and compare EXPLAIN ANALYZE plans and '
+        'timings of common asset list queries with and without asset indexes. '
+        'All generated data is rolled back.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--assets',
+            type=int,
+            default=1000000,
+            help='Number of assets to generate',
+        )
+        parser.add_argument(
+            '--assigned',
+            type=float,
+            default=0.1,
+            help='Fraction of assets assigned to devices',
+        )
+        parser.add_argument(
+            '--repeat',
+            type=int,
+            default=3,
+            help='Run each query this many times and report the fastest run',
+        )
+        parser.add_argument(
+            '--seed',
+            type=int,
+            default=0,
+            help='Random seed for generated data',
+        )
+        parser.add_argument(
+            '--json',
+            action='store_true',
+            help='Output results as JSON',
+        )
+
+    def handle(self, *args, **options):
+        if connection.vendor != 'postgresql':
+            raise CommandError('Benchmark requires a PostgreSQL database')
+        self.verbose = not options['json']
+
+        with transaction.atomic():
+            self.log(f'Generating {options["assets"]} assets...')
+            context = self.generate(
+                options['assets'], options['assigned'], options['seed']
+            )
+            self.analyze()
+            queries = get_queries(context)
+
+            self.log('Running queries with indexes...')
+            after = self.run_queries(queries, options['repeat'])
+            self.log('Running queries without indexes...')
+            with connection.schema_editor() as schema_editor:
+                for index in Asset._meta.indexes:
+                    schema_editor.remove_index(Asset, index)
+            self.analyze()
+            before = self.run_queries(queries, options['repeat'])
+
+            # leave database as it was
+            transaction.set_rollback(True)
+
+        results = {
+            name: {'before': before[name], 'after': after[name]} for name in queries
+        }
+        if options['json']:
+            self.stdout.write(json.dumps(results, indent=2))
+            return
+        for name, result in results.items():
+            for label in ('before', 'after'):
+                self.stdout.write(f'\n--- {name} ({label}) ---')
+                self.stdout.write(result[label]['plan'])
+        self.stdout.write('\nquery                     before ms   after ms')
+        for name, result in results.items():
+            self.stdout.write(
+                f'{name:<24}{result["before"]["ms"]:>11.1f}{result["after"]["ms"]:>11.1f}'
+            )
+
+    def log(self, message):
+        if self.verbose:
+            self.stdout.write(message)
+
+    def analyze(self):
+        with connection.cursor() as cursor:
+            cursor.execute(f'ANALYZE {Asset._meta.db_table}')
+
+    def run_queries(self, queries, repeat):
+        """
+        Time count and first page of each query, as rendered by list view.
+        """
+        results = {}
+        for name, get_queryset in queries.items():
+            queryset = get_queryset()
+            timings = []
+            for _ in range(repeat):
+                start = time.perf_counter()
+                queryset.all().count()
+                list(queryset.all()[:PAGE_SIZE])
+                timings.append(time.perf_counter() - start)
+            results[name] = {
+                'ms': min(timings) * 1000,
+                'plan': queryset.all()[:PAGE_SIZE].explain(analyze=True),
+            }
+        return results
+
+    def generate(self, count, assigned, seed):
+        """
+        Create assets and objects they reference. Returns dict of objects
+        used by queries.
+        """
+        generator = DataGenerator(
+            prefix='benchmark', seed=seed, batch_size=BATCH_SIZE, log=self.log
+        )
+        generator.generate(assets=count, assigned=assigned)
+        return {
+            'stored_status': get_status_for('stored') or 'stored',
+            'location': generator.locations[0],
+            'purchase': generator.purchases[0],
+            'delivery': generator.deliveries[0],
+            'owner': generator.tenants[0],
+            'warranty_end': date.today() + timedelta(days=90),
+        }
+
+
+def get_queries(context):
+    """
+    Return dict of functions returning asset querysets as built by
+    AssetFilterSet and AssetTable for common filters and orderings.
+    """
+
+    def filtered(**params):
+        def get_queryset():
+            filterset = AssetFilterSet(params, Asset.objects.all())
+            if not filterset.is_valid():
+                raise CommandError(filterset.errors)
+            return filterset.qs
+
+        return get_queryset
+
+    table = AssetTable(Asset.objects.none())
+    return {
+        'status': filtered(status=[context['stored_status']]),
+        'storage_location': filtered(storage_location_id=[context['location'].pk]),
+        'located_location': filtered(located_location_id=[context['location'].pk]),
+        'warranty_end': filtered(warranty_end_before=context['warranty_end']),
+        'unassigned': filtered(is_assigned='false'),
+        'assigned': filtered(is_assigned='true'),
+        'purchase': filtered(purchase_id=[context['purchase'].pk]),
+        'delivery': filtered(delivery_id=[context['delivery'].pk]),
+        'owner': filtered(owner_id=[context['owner'].pk]),
+        'order_warranty_end': lambda: Asset.objects.order_by('warranty_end'),
+        'order_manufacturer': lambda: table.order_manufacturer(
+            Asset.objects.all(), False
+        )[0],
+        'order_hardware_type': lambda: table.order_hardware_type(
+            Asset.objects.all(), False
+        )[0],
+    }
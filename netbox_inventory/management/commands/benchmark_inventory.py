@@ -0,0 +1,84 @@
+import json
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from netbox_inventory.benchmark import Benchmark
+from netbox_inventory.datagen import DataGenerator
+
+
+class Command(BaseCommand):
+    help = (
+        'Time asset list, search, located queries, inventory item group view '
+        'and counts, import, bulk edit, contract updater and REST and GraphQL '
+        'list endpoints and report wall time and number of queries of each as JSON'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--repeat',
+            type=int,
+            default=3,
+            help='Run each case this many times and report the fastest run',
+        )
+        parser.add_argument(
+            '--only',
+            nargs='+',
+            metavar='PREFIX',
+            help='Only run cases whose names start with one of these prefixes',
+        )
+        parser.add_argument(
+            '--import-rows',
+            type=int,
+            default=100,
+            help='Number of assets imported by import case',
+        )
+        parser.add_argument(
+            '--edit-rows',
+            type=int,
+            default=100,
+            help='Number of assets edited by bulk edit case',
+        )
+        parser.add_argument(
+            '--generate',
+            type=int,
+            metavar='ASSETS',
+            help='Generate a dataset with this many assets before running '
+            'benchmarks (rolled back afterwards)',
+        )
+        parser.add_argument(
+            '--groups',
+            type=int,
+            default=20,
+            help='Number of inventory item groups in generated dataset',
+        )
+        parser.add_argument(
+            '--types',
+            type=int,
+            default=100,
+            help='Number of inventory item types in generated dataset',
+        )
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            if options['generate']:
+                DataGenerator(prefix='benchmark', log=self.stderr.write).generate(
+                    assets=options['generate'],
+                    groups=options['groups'],
+                    types=options['types'],
+                )
+            # temporary user that can see and change everything
+            user = get_user_model().objects.create(
+                username='netbox-inventory-benchmark', is_superuser=True
+            )
+            benchmark = Benchmark(
+                user,
+                repeat=options['repeat'],
+                import_rows=options['import_rows'],
+                edit_rows=options['edit_rows'],
+            )
+            results = benchmark.run(options['only'])
+            # leave database as it was
+            transaction.set_rollback(True)
+        self.stdout.write(json.dumps(results, indent=2))
@@ -0,0 +1,67 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from netbox_inventory.datagen import DataGenerator
+
+SIZES = (
+    ('suppliers', 10),
+    ('purchases', 100),
+    ('deliveries', 200),
+    ('contracts', 100),
+    ('groups', 20),
+    ('types', 100),
+    ('device-types', 20),
+    ('sites', 10),
+    ('racks', 10),
+    ('assets', 10000),
+)
+
+
+class Command(BaseCommand):
+    help = 'Generate a synthetic inventory dataset for testing and benchmarking'
+
+    def add_arguments(self, parser):
+        for name, default in SIZES:
+            parser.add_argument(
+                f'--{name}',
+                type=int,
+                default=default,
+                help=f'Number of {name.replace("-", " ")} to create'
+                + (' per site' if name == 'racks' else ''),
+            )
+        parser.add_argument(
+            '--assigned',
+            type=float,
+            default=0.3,
+            help='Fraction of device and rack assets assigned to hardware',
+        )
+        parser.add_argument(
+            '--prefix',
+            default='gen',
+            help='Prefix of names, slugs and serials of created objects',
+        )
+        parser.add_argument(
+            '--seed',
+            type=int,
+            default=0,
+            help='Random seed',
+        )
+
+    def handle(self, *args, **options):
+        generator = DataGenerator(
+            prefix=options['prefix'], seed=options['seed'], log=self.stdout.write
+        )
+        with transaction.atomic():
+            counts = generator.generate(
+                assigned=options['assigned'],
+                **{
+                    name.replace('-', '_'): options[name.replace('-', '_')]
+                    for name, _ in SIZES
+                },
+            )
+        self.stdout.write(
+            self.style.SUCCESS(
+                'Successfully created '
+                + ', '.join(f'{count} {name}' for name, count in counts.items())
+            )
+        )
@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from netbox_inventory.models import Asset
+from netbox_inventory.utils import asset_update_installed
+
+
+class Command(BaseCommand):
+    help = 'Rebuild installed site, location, rack and device of all assets from assigned hardware'
+
+    def handle(self, *args, **options):
+        self.stdout.write('Rebuilding installed fields of assets...')
+        with transaction.atomic():
+            updated_count = asset_update_installed(Asset.objects.all())
+        self.stdout.write(
+            self.style.SUCCESS(f'Successfully rebuilt {updated_count} assets')
+        )
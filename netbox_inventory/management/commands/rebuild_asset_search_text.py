@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from netbox_inventory.models import Asset
+from netbox_inventory.utils import asset_update_search_text
+
+
+class Command(BaseCommand):
+    help = 'Rebuild search text of all assets from their fields and related objects'
+
+    def handle(self, *args, **options):
+        self.stdout.write('Rebuilding search text of assets...')
+        with transaction.atomic():
+            updated_count = asset_update_search_text(Asset.objects.all())
+        self.stdout.write(
+            self.style.SUCCESS(f'Successfully rebuilt {updated_count} assets')
+        )
@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from netbox_inventory.counters import rebuild_inventoryitem_group_counts
+
+
+class Command(BaseCommand):
+    help = 'Recalculate stored asset and inventory item type counts of inventory item groups'
+
+    def handle(self, *args, **options):
+        self.stdout.write('Rebuilding inventory item group counts...')
+        with transaction.atomic():
+            fixed_count = rebuild_inventoryitem_group_counts()
+        self.stdout.write(
+            self.style.SUCCESS(f'Successfully fixed counts of {fixed_count} groups')
+        )
@@ -0,0 +1,56 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Q
+
+from netbox_inventory.models import Asset
+from netbox_inventory.sync import HardwareSync
+from netbox_inventory.utils import get_plugin_setting
+
+
+class Command(BaseCommand):
+    help = 'Sync serial number, asset tag and type from assets to assigned hardware'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=1000,
+            help='Number of assets processed in one transaction',
+        )
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+
+        if not get_plugin_setting('sync_hardware_serial_asset_tag'):
+            self.stdout.write(
+                self.style.WARNING(
+                    'sync_hardware_serial_asset_tag is not enabled, nothing to do'
+                )
+            )
+            return
+
+        asset_pks = list(
+            Asset.objects.filter(
+                Q(device__isnull=False)
+                | Q(module__isnull=False)
+                | Q(inventoryitem__isnull=False)
+                | Q(rack__isnull=False)
+            )
+            .order_by('pk')
+            .values_list('pk', flat=True)
+        )
+        self.stdout.write(f'Syncing hardware of {len(asset_pks)} assigned assets...')
+
+        updated_count = 0
+        for idx in range(0, len(asset_pks), batch_size):
+            hardware_sync = HardwareSync()
+            with transaction.atomic():
+                for asset in Asset.objects.filter(
+                    pk__in=asset_pks[idx : idx + batch_size]
+                ):
+                    hardware_sync.add(asset)
+                updated_count += hardware_sync.apply()
+
+        self.stdout.write(
+            self.style.SUCCESS(f'Successfully updated {updated_count} hardware objects')
+        )
@@ -1,7 +1,16 @@
-from django.core.management.base import BaseCommand
-from django.utils import timezone
+import operator
 from datetime import date
+from functools import reduce
+
+from django.core.management.base import BaseCommand
+from django.db.models import Case, Count, F, Value, When
 
+from netbox_inventory.contract_statuses import (
+    AUTO_UPDATED_STATUSES,
+    apply_status_updates,
+    get_status_updates,
+)
+from netbox_inventory.jobs import ContractStatusUpdateJob
 from netbox_inventory.models import Contract
 
 
@@ -19,47 +28,35 @@ class Command(BaseCommand):
             action='store_true',
             help='Show detailed output for each contract processed',
         )
+        parser.add_argument(
+            '--background',
+            action='store_true',
+            help='Enqueue updates as a background job, processed in chunks',
+        )
 
     def handle(self, *args, **options):
         dry_run = options['dry_run']
         verbose = options['verbose']
-        
+
         self.stdout.write(
             self.style.SUCCESS(
                 f'Starting contract status update {"(DRY RUN)" if dry_run else ""}'
             )
         )
-        
+
         # Get all contracts that might need status updates
-        contracts = Contract.objects.filter(
-            status__in=['draft', 'active', 'expired']
-        )
-        
-        updated_count = 0
+        contracts = Contract.objects.filter(status__in=AUTO_UPDATED_STATUSES)
+        status_updates = get_status_updates(date.today())
+
         total_count = contracts.count()
-        
-        for contract in contracts:
-            original_status = contract.status
-            status_changed = contract.update_status_based_on_dates()
-            
-            if status_changed:
-                if verbose or dry_run:
-                    self.stdout.write(
-                        f'Contract "{contract.name}" ({contract.pk}): '
-                        f'{original_status} → {contract.status} '
-                        f'(expires: {contract.end_date})'
-                    )
-                
-                if not dry_run:
-                    contract.save()
-                
-                updated_count += 1
-            elif verbose:
-                self.stdout.write(
-                    f'Contract "{contract.name}" ({contract.pk}): '
-                    f'No change needed (status: {contract.status}, expires: {contract.end_date})'
-                )
-        
+        if options['background'] and not dry_run:
+            self._enqueue_job(contracts, status_updates)
+            return
+        if verbose or dry_run:
+            updated_count = self._report_changes(contracts, status_updates, verbose)
+        if not dry_run:
+            updated_count = apply_status_updates(contracts, status_updates)
+
         if dry_run:
             self.stdout.write(
                 self.style.WARNING(
@@ -72,12 +69,57 @@ class Command(BaseCommand):
                     f'Successfully updated {updated_count} of {total_count} contracts'
                 )
             )
-            
+
         # Show summary of contracts by status
         if verbose or updated_count > 0:
             self.stdout.write('\nContract status summary:')
-            for status_choice in Contract._meta.get_field('status').choices:
-                status_value = status_choice[0]
-                status_label = status_choice[1]
-                count = Contract.objects.filter(status=status_value).count()
-                self.stdout.write(f'  {status_label}: {count}') 
\ No newline at end of file
+            counts = dict(
+                Contract.objects.order_by()
+                .values_list('status')
+                .annotate(count=Count('pk'))
+            )
+            for status_value, status_label in Contract._meta.get_field(
+                'status'
+            ).choices:
+                self.stdout.write(f'  {status_label}: {counts.get(status_value, 0)}')
+
+    def _enqueue_job(self, contracts, status_updates):
+        """
+        Enqueue a job updating contracts whose status would change. Their
+        pks and today's date are fixed now, so a resumed job applies the same
+        changes.
+        """
+        q = reduce(operator.or_, (q for status, q in status_updates))
+        pks = list(contracts.filter(q).values_list('pk', flat=True))
+        job = ContractStatusUpdateJob.enqueue(items=pks, today=date.today().isoformat())
+        self.stdout.write(
+            self.style.SUCCESS(f'Enqueued job {job.pk} to update {len(pks)} contracts')
+        )
+
+    def _report_changes(self, contracts, status_updates, verbose):
+        """
+        Write a line for each contract that would change (and each unchanged
+        one if verbose). New status is computed in the same query. Returns
+        number of contracts that would change.
+        """
+        updated_count = 0
+        contracts = contracts.annotate(
+            new_status=Case(
+                *(When(q, then=Value(status)) for status, q in status_updates),
+                default=F('status'),
+            )
+        ).values_list('pk', 'name', 'status', 'new_status', 'end_date')
+        for pk, name, status, new_status, end_date in contracts.iterator():
+            if new_status != status:
+                self.stdout.write(
+                    f'Contract "{name}" ({pk}): '
+                    f'{status} → {new_status} '
+                    f'(expires: {end_date})'
+                )
+                updated_count += 1
+            elif verbose:
+                self.stdout.write(
+                    f'Contract "{name}" ({pk}): '
+                    f'No change needed (status: {status}, expires: {end_date})'
+                )
+        return updated_count
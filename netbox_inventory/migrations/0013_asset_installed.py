@@ -0,0 +1,112 @@
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery
+
+INSTALLED_FIELD_PATHS = {
+    'device': {
+        'installed_device': 'pk',
+        'installed_site': 'site',
+        'installed_location': 'location',
+        'installed_rack': 'rack',
+    },
+    'module': {
+        'installed_device': 'device',
+        'installed_site': 'device__site',
+        'installed_location': 'device__location',
+        'installed_rack': 'device__rack',
+    },
+    'inventoryitem': {
+        'installed_device': 'device',
+        'installed_site': 'device__site',
+        'installed_location': 'device__location',
+        'installed_rack': 'device__rack',
+    },
+    'rack': {
+        'installed_device': None,
+        'installed_site': 'site',
+        'installed_location': 'location',
+        'installed_rack': 'pk',
+    },
+}
+
+
+def populate_installed(apps, schema_editor):
+    Asset = apps.get_model('netbox_inventory', 'Asset')
+    for kind, paths in INSTALLED_FIELD_PATHS.items():
+        hw_model = Asset._meta.get_field(kind).related_model
+        values = {}
+        for field_name, path in paths.items():
+            if path is None:
+                values[field_name] = None
+            else:
+                values[field_name] = Subquery(
+                    hw_model.objects.filter(pk=OuterRef(kind)).values(path)[:1]
+                )
+        Asset.objects.filter(**{f'{kind}__isnull': False}).update(**values)
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ('dcim', '0187_alter_device_vc_position'),
+        ('netbox_inventory', '0012_asset_contract_many_to_many'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='asset',
+            name='installed_device',
+            field=models.ForeignKey(
+                blank=True,
+                editable=False,
+                help_text='Device assigned hardware is installed in',
+                null=True,
+                on_delete=django.db.models.deletion.SET_NULL,
+                related_name='+',
+                to='dcim.device',
+                verbose_name='Installed Device',
+            ),
+        ),
+        migrations.AddField(
+            model_name='asset',
+            name='installed_location',
+            field=models.ForeignKey(
+                blank=True,
+                editable=False,
+                help_text='Location where assigned hardware is installed',
+                null=True,
+                on_delete=django.db.models.deletion.SET_NULL,
+                related_name='+',
+                to='dcim.location',
+                verbose_name='Installed Location',
+            ),
+        ),
+        migrations.AddField(
+            model_name='asset',
+            name='installed_rack',
+            field=models.ForeignKey(
+                blank=True,
+                editable=False,
+                help_text='Rack where assigned hardware is installed',
+                null=True,
+                on_delete=django.db.models.deletion.SET_NULL,
+                related_name='+',
+                to='dcim.rack',
+                verbose_name='Installed Rack',
+            ),
+        ),
+        migrations.AddField(
+            model_name='asset',
+            name='installed_site',
+            field=models.ForeignKey(
+                blank=True,
+                editable=False,
+                help_text='Site where assigned hardware is installed',
+                null=True,
+                on_delete=django.db.models.deletion.SET_NULL,
+                related_name='+',
+                to='dcim.site',
+                verbose_name='Installed Site',
+            ),
+        ),
+        migrations.RunPython(populate_installed, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,70 @@
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.operations import TrigramExtension
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery, TextField, Value
+from django.db.models.functions import Coalesce, Concat, Lower
+
+SEARCH_TEXT_FIELDS = ('serial', 'name', 'asset_tag', 'description')
+SEARCH_TEXT_RELATED_FIELDS = (
+    ('device_type', 'model'),
+    ('module_type', 'model'),
+    ('inventoryitem_type', 'model'),
+    ('rack_type', 'model'),
+    ('device', 'name'),
+    ('inventoryitem', 'name'),
+    ('rack', 'name'),
+    ('delivery', 'name'),
+    ('purchase', 'name'),
+    ('purchase__supplier', 'name'),
+    ('tenant', 'name'),
+    ('owner', 'name'),
+)
+
+
+def populate_search_text(apps, schema_editor):
+    # values of custom fields from asset_custom_fields_search_filters are
+    # added by rebuild_asset_search_text management command
+    Asset = apps.get_model('netbox_inventory', 'Asset')
+    values = list(SEARCH_TEXT_FIELDS)
+    for lookup, field_name in SEARCH_TEXT_RELATED_FIELDS:
+        fk_name, *path = lookup.split('__')
+        related_model = Asset._meta.get_field(fk_name).related_model
+        values.append(
+            Subquery(
+                related_model.objects.filter(pk=OuterRef(fk_name)).values(
+                    '__'.join([*path, field_name])
+                )[:1]
+            )
+        )
+    parts = []
+    for value in values:
+        if parts:
+            parts.append(Value('\n'))
+        parts.append(Coalesce(value, Value(''), output_field=TextField()))
+    # stored lowercased, so search can match it with plain LIKE served by
+    # the trigram index
+    Asset.objects.update(search_text=Lower(Concat(*parts, output_field=TextField())))
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ('netbox_inventory', '0013_asset_installed'),
+    ]
+
+    operations = [
+        TrigramExtension(),
+        migrations.AddField(
+            model_name='asset',
+            name='search_text',
+            field=models.TextField(blank=True, default='', editable=False),
+        ),
+        migrations.RunPython(populate_search_text, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='asset',
+            index=GinIndex(
+                fields=['search_text'],
+                name='nbi_asset_search_text_trgm',
+                opclasses=['gin_trgm_ops'],
+            ),
+        ),
+    ]
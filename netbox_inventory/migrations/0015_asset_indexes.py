@@ -0,0 +1,51 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ('netbox_inventory', '0014_asset_search_text'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='asset',
+            index=models.Index(
+                fields=['status', 'storage_location'],
+                name='nbi_asset_status_storage',
+            ),
+        ),
+        migrations.AddIndex(
+            model_name='asset',
+            index=models.Index(
+                fields=['warranty_end'],
+                name='nbi_asset_warranty_end',
+            ),
+        ),
+        migrations.AddIndex(
+            model_name='asset',
+            index=models.Index(
+                condition=models.Q(
+                    ('device__isnull', True),
+                    ('module__isnull', True),
+                    ('inventoryitem__isnull', True),
+                    ('rack__isnull', True),
+                ),
+                fields=['status'],
+                name='nbi_asset_unassigned',
+            ),
+        ),
+        migrations.AddIndex(
+            model_name='asset',
+            index=models.Index(
+                condition=models.Q(
+                    ('device__isnull', False),
+                    ('module__isnull', False),
+                    ('inventoryitem__isnull', False),
+                    ('rack__isnull', False),
+                    _connector='OR',
+                ),
+                fields=['installed_site'],
+                name='nbi_asset_assigned',
+            ),
+        ),
+    ]
@@ -0,0 +1,73 @@
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def populate_counts(apps, schema_editor):
+    Asset = apps.get_model('netbox_inventory', 'Asset')
+    InventoryItemGroup = apps.get_model('netbox_inventory', 'InventoryItemGroup')
+    InventoryItemType = apps.get_model('netbox_inventory', 'InventoryItemType')
+    direct_counts = {
+        'asset_count': dict(
+            Asset.objects.filter(inventoryitem_type__inventoryitem_group__isnull=False)
+            .order_by()
+            .values_list('inventoryitem_type__inventoryitem_group')
+            .annotate(count=Count('pk'))
+        ),
+        'inventoryitem_type_count': dict(
+            InventoryItemType.objects.filter(inventoryitem_group__isnull=False)
+            .order_by()
+            .values_list('inventoryitem_group')
+            .annotate(count=Count('pk'))
+        ),
+    }
+    groups = {group.pk: group for group in InventoryItemGroup.objects.all()}
+    for pk, group in groups.items():
+        for field, counts in direct_counts.items():
+            count = counts.get(pk, 0)
+            setattr(group, f'direct_{field}', count)
+            # add to group itself and all its ancestors
+            ancestor_id = pk
+            while ancestor_id is not None:
+                ancestor = groups[ancestor_id]
+                setattr(ancestor, field, getattr(ancestor, field) + count)
+                ancestor_id = ancestor.parent_id
+    InventoryItemGroup.objects.bulk_update(
+        groups.values(),
+        [
+            'asset_count',
+            'inventoryitem_type_count',
+            'direct_asset_count',
+            'direct_inventoryitem_type_count',
+        ],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ('netbox_inventory', '0015_asset_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='inventoryitemgroup',
+            name='asset_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='inventoryitemgroup',
+            name='inventoryitem_type_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='inventoryitemgroup',
+            name='direct_asset_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='inventoryitemgroup',
+            name='direct_inventoryitem_type_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(populate_counts, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,29 @@
+import django.db.models.functions.text
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ('netbox_inventory', '0016_inventoryitemgroup_counts'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='asset',
+            index=models.Index(
+                django.db.models.functions.text.Lower(
+                    django.db.models.functions.text.Trim('serial')
+                ),
+                name='nbi_asset_serial_normalized',
+            ),
+        ),
+        migrations.AddIndex(
+            model_name='asset',
+            index=models.Index(
+                django.db.models.functions.text.Lower(
+                    django.db.models.functions.text.Trim('asset_tag')
+                ),
+                name='nbi_asset_tag_normalized',
+            ),
+        ),
+    ]
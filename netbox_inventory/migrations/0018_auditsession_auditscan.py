@@ -0,0 +1,113 @@
+import django.db.models.deletion
+import taggit.managers
+from django.db import migrations, models
+
+from utilities.json import CustomFieldJSONEncoder
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ('dcim', '0187_alter_device_vc_position'),
+        ('extras', '0092_delete_jobresult'),
+        ('netbox_inventory', '0017_asset_identifier_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AuditSession',
+            fields=[
+                (
+                    'id',
+                    models.BigAutoField(
+                        auto_created=True, primary_key=True, serialize=False
+                    ),
+                ),
+                ('created', models.DateTimeField(auto_now_add=True, null=True)),
+                ('last_updated', models.DateTimeField(auto_now=True, null=True)),
+                (
+                    'custom_field_data',
+                    models.JSONField(
+                        blank=True, default=dict, encoder=CustomFieldJSONEncoder
+                    ),
+                ),
+                ('name', models.CharField(max_length=100, unique=True)),
+                (
+                    'status',
+                    models.CharField(
+                        default='open',
+                        help_text='Scans can only be added to open sessions',
+                        max_length=30,
+                    ),
+                ),
+                (
+                    'site',
+                    models.ForeignKey(
+                        help_text='Audited site',
+                        on_delete=django.db.models.deletion.PROTECT,
+                        related_name='+',
+                        to='dcim.site',
+                    ),
+                ),
+                (
+                    'storage_location',
+                    models.ForeignKey(
+                        blank=True,
+                        help_text='Audited storage location, leave empty to audit whole site',
+                        null=True,
+                        on_delete=django.db.models.deletion.PROTECT,
+                        related_name='+',
+                        to='dcim.location',
+                        verbose_name='Storage Location',
+                    ),
+                ),
+                ('description', models.CharField(blank=True, max_length=200)),
+                ('comments', models.TextField(blank=True)),
+                (
+                    'tags',
+                    taggit.managers.TaggableManager(
+                        through='extras.TaggedItem', to='extras.Tag'
+                    ),
+                ),
+            ],
+            options={
+                'verbose_name': 'audit session',
+                'ordering': ['-created'],
+            },
+        ),
+        migrations.CreateModel(
+            name='AuditScan',
+            fields=[
+                (
+                    'id',
+                    models.BigAutoField(
+                        auto_created=True, primary_key=True, serialize=False
+                    ),
+                ),
+                (
+                    'serial',
+                    models.CharField(
+                        help_text='Serial as it was scanned', max_length=60
+                    ),
+                ),
+                ('serial_key', models.CharField(editable=False, max_length=60)),
+                ('created', models.DateTimeField(auto_now_add=True)),
+                (
+                    'session',
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name='scans',
+                        to='netbox_inventory.auditsession',
+                    ),
+                ),
+            ],
+            options={
+                'ordering': ['session', 'pk'],
+                'constraints': [
+                    models.UniqueConstraint(
+                        fields=('session', 'serial_key'),
+                        name='nbi_auditscan_session_serial',
+                    )
+                ],
+            },
+        ),
+    ]
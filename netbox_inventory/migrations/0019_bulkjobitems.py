@@ -0,0 +1,32 @@
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ('core', '0003_job'),
+        ('netbox_inventory', '0018_auditsession_auditscan'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BulkJobItems',
+            fields=[
+                (
+                    'id',
+                    models.BigAutoField(
+                        auto_created=True, primary_key=True, serialize=False
+                    ),
+                ),
+                ('items', models.JSONField()),
+                (
+                    'job',
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name='+',
+                        to='core.job',
+                    ),
+                ),
+            ],
+        ),
+    ]
@@ -1,3 +1,5 @@
 from .assets import *
+from .audits import *
 from .contracts import *  # Re-enabled now that views are implemented
 from .deliveries import *
+from .jobs import *
@@ -1,20 +1,126 @@
-from datetime import date
+from datetime import date, timedelta
 
+from django.contrib.postgres.indexes import GinIndex
 from django.db import models
+from django.db.models import Case, F, Q, Value, When
+from django.db.models.functions import Lower, Trim
 from django.forms import ValidationError
 from django.urls import reverse
 
 from netbox.models import NestedGroupModel, NetBoxModel
 from netbox.models.features import ImageAttachmentsMixin
+from utilities.querysets import RestrictedQuerySet
 
 from ..choices import AssetStatusChoices, HardwareKindChoices
+from ..sync import get_deferred_hardware_sync
 from ..utils import (
+    DateDiff,
     asset_clear_old_hw,
     asset_set_new_hw,
+    clear_prechange_cache,
     get_plugin_setting,
     get_prechange_field,
+    get_search_text,
     get_status_for,
+    get_today_expression,
+    search_text_changed,
 )
+from .contracts import annotated_property
+
+GROUP_COUNT_FIELDS = (
+    'asset_count',
+    'inventoryitem_type_count',
+    'direct_asset_count',
+    'direct_inventoryitem_type_count',
+)
+
+
+def normalize_identifier(value):
+    """
+    Normalize serial or asset tag the same as normalized_identifier() does in
+    database: without surrounding spaces and lowercase. TRIM() strips only
+    spaces, other whitespace must be kept for keys to match.
+    """
+    return value.strip(' ').lower()
+
+
+def normalized_identifier(field):
+    """
+    Expression of normalized serial or asset tag, as in their indexes.
+    """
+    return Lower(Trim(field))
+
+
+WARRANTY_ANNOTATIONS = (
+    'warranty_remaining_days',
+    'warranty_progress',
+    'warranty_status',
+)
+
+
+class AssetQuerySet(RestrictedQuerySet):
+    def with_warranty(self, today=None):
+        """
+        Annotate warranty_remaining_days, warranty_progress and
+        warranty_status, computed in SQL. Asset properties with the same names
+        return annotated values when present, so they can also be used to
+        filter and order assets.
+        """
+        if all(name in self.query.annotations for name in WARRANTY_ANNOTATIONS):
+            return self
+        warning_days = get_plugin_setting('asset_warranty_expire_warning_days')
+        # without given date, date is read when each query runs
+        warning_date = get_today_expression(today, days=warning_days or 0)
+        today = get_today_expression(today)
+        status_whens = [
+            When(warranty_end__isnull=True, then=Value(None)),
+            When(warranty_end__lte=today, then=Value('expired')),
+            When(warranty_start__gt=today, then=Value('pending')),
+        ]
+        if warning_days:
+            status_whens.append(
+                When(warranty_end__lt=warning_date, then=Value('expiring'))
+            )
+        return self.annotate(
+            warranty_remaining_days=DateDiff('warranty_end', today),
+            # integer division truncates, same as warranty_progress property
+            warranty_progress=Case(
+                When(
+                    warranty_end__gt=F('warranty_start'),
+                    then=DateDiff(today, 'warranty_start')
+                    * Value(100)
+                    / DateDiff('warranty_end', 'warranty_start'),
+                ),
+                default=Value(None),
+                output_field=models.IntegerField(),
+            ),
+            warranty_status=Case(
+                *status_whens,
+                default=Value('active'),
+                output_field=models.CharField(),
+            ),
+        )
+
+    def lookup_identifiers(self, serials=(), asset_tags=()):
+        """
+        Filter assets whose serial or asset tag matches any of given values,
+        ignoring case and surrounding whitespace. Matching normalized_serial
+        and normalized_asset_tag are annotated, and filtering on them uses
+        the functional indexes of both fields.
+        """
+        query = Q()
+        if serials:
+            query |= Q(normalized_serial__in={normalize_identifier(s) for s in serials})
+        if asset_tags:
+            query |= Q(
+                normalized_asset_tag__in={normalize_identifier(t) for t in asset_tags}
+            )
+        if not query:
+            return self.none()
+        return self.annotate(
+            normalized_serial=normalized_identifier('serial'),
+            normalized_asset_tag=normalized_identifier('asset_tag'),
+        ).filter(query)
 
 
 class InventoryItemGroup(NestedGroupModel):
@@ -29,6 +135,15 @@ class InventoryItemGroup(NestedGroupModel):
 
     comments = models.TextField(blank=True)
 
+    # counts of assets and inventory item types in group itself (direct) and
+    # in group and all its descendants, kept up to date by signals
+    asset_count = models.PositiveIntegerField(default=0, editable=False)
+    inventoryitem_type_count = models.PositiveIntegerField(default=0, editable=False)
+    direct_asset_count = models.PositiveIntegerField(default=0, editable=False)
+    direct_inventoryitem_type_count = models.PositiveIntegerField(
+        default=0, editable=False
+    )
+
     class Meta:
         ordering = ['name']
         constraints = (
@@ -46,6 +161,21 @@ class InventoryItemGroup(NestedGroupModel):
     def get_absolute_url(self):
         return reverse('plugins:netbox_inventory:inventoryitemgroup', args=[self.pk])
 
+    def save(self, *args, **kwargs):
+        if not self._state.adding and kwargs.get('update_fields') is None:
+            # counts are updated directly in database, don't overwrite them
+            # with values loaded before
+            kwargs['update_fields'] = [
+                field.name
+                for field in self._meta.concrete_fields
+                if not field.primary_key and field.name not in GROUP_COUNT_FIELDS
+            ]
+        return super().save(*args, **kwargs)
+
+    def serialize_object(self, exclude=None):
+        # counts are derived from other objects, don't include them in changes
+        return super().serialize_object(exclude=[*(exclude or []), *GROUP_COUNT_FIELDS])
+
 
 class InventoryItemType(NetBoxModel, ImageAttachmentsMixin):
     """
@@ -227,6 +357,51 @@ class Asset(NetBoxModel, ImageAttachmentsMixin):
         blank=True,
         null=True,
     )
+
+    #
+    # installed fields, derived from assigned hardware by update_installed()
+    #
+    installed_site = models.ForeignKey(
+        help_text='Site where assigned hardware is installed',
+        to='dcim.Site',
+        on_delete=models.SET_NULL,
+        related_name='+',
+        blank=True,
+        null=True,
+        editable=False,
+        verbose_name='Installed Site',
+    )
+    installed_location = models.ForeignKey(
+        help_text='Location where assigned hardware is installed',
+        to='dcim.Location',
+        on_delete=models.SET_NULL,
+        related_name='+',
+        blank=True,
+        null=True,
+        editable=False,
+        verbose_name='Installed Location',
+    )
+    installed_rack = models.ForeignKey(
+        help_text='Rack where assigned hardware is installed',
+        to='dcim.Rack',
+        on_delete=models.SET_NULL,
+        related_name='+',
+        blank=True,
+        null=True,
+        editable=False,
+        verbose_name='Installed Rack',
+    )
+    installed_device = models.ForeignKey(
+        help_text='Device assigned hardware is installed in',
+        to='dcim.Device',
+        on_delete=models.SET_NULL,
+        related_name='+',
+        blank=True,
+        null=True,
+        editable=False,
+        verbose_name='Installed Device',
+    )
+
     tenant = models.ForeignKey(
         help_text='Tenant using this asset',
         to='tenancy.Tenant',
@@ -305,6 +480,15 @@ class Asset(NetBoxModel, ImageAttachmentsMixin):
         blank=True,
     )
 
+    # denormalized lowercase text searched by AssetFilterSet.search,
+    # maintained by save() and asset_update_search_text(), trigram indexed on
+    # PostgreSQL
+    search_text = models.TextField(
+        blank=True,
+        default='',
+        editable=False,
+    )
+
     clone_fields = [
         'name',
         'asset_tag',
@@ -324,6 +508,8 @@ class Asset(NetBoxModel, ImageAttachmentsMixin):
         'comments',
     ]
 
+    objects = AssetQuerySet.as_manager()
+
     @property
     def kind(self):
         if self.device_type_id:
@@ -358,41 +544,6 @@ class Asset(NetBoxModel, ImageAttachmentsMixin):
         if self.storage_location:
             return self.storage_location.site
 
-    @property
-    def installed_site(self):
-        device = self.installed_device
-        if device:
-            return device.site
-        if self.rack:
-            return self.rack.site
-
-    @property
-    def installed_location(self):
-        device = self.installed_device
-        if device:
-            return device.location
-        if self.rack:
-            return self.rack.location
-
-    @property
-    def installed_rack(self):
-        device = self.installed_device
-        if device:
-            return device.rack
-        if self.rack:
-            return self.rack
-
-    @property
-    def installed_device(self):
-        if self.kind == 'rack':
-            return None
-        elif self.kind == 'device':
-            return self.device
-        elif self.hardware:
-            return self.hardware.device
-        else:
-            return None
-
     @property
     def current_site(self):
         installed = self.installed_site
@@ -405,7 +556,7 @@ class Asset(NetBoxModel, ImageAttachmentsMixin):
         installed = self.installed_location
         # we can have an installed site but no installed location
         # so return None in that case
-        if installed or self.installed_site:
+        if installed or self.installed_site_id:
             return installed
         return self.storage_location
 
@@ -416,8 +567,18 @@ class Asset(NetBoxModel, ImageAttachmentsMixin):
         Returns negative duration if warranty expired
         Return None if warranty_end not defined
         """
+        if self.warranty_remaining_days is not None:
+            return timedelta(days=self.warranty_remaining_days)
+        return None
+
+    @annotated_property
+    def warranty_remaining_days(self):
+        """
+        Number of days left in warranty period, negative if warranty expired
+        and None if warranty_end not defined.
+        """
         if self.warranty_end:
-            return self.warranty_end - date.today()
+            return (self.warranty_end - date.today()).days
         return None
 
     @property
@@ -437,16 +598,41 @@ class Asset(NetBoxModel, ImageAttachmentsMixin):
             return self.warranty_end - self.warranty_start
         return None
 
-    @property
+    @annotated_property
     def warranty_progress(self):
         """
         Percentage of warranty elapsed
         Returns > 100 if warranty has expired, < 0 if not started yet and None
-        if warranty_start or warranty_end not set.
+        if warranty_start or warranty_end not set (or end is not after start).
         """
         if not self.warranty_start or not self.warranty_end:
             return None
-        return int(100 * (self.warranty_elapsed / self.warranty_total))
+        elapsed = self.warranty_elapsed.days
+        total = self.warranty_total.days
+        if total <= 0:
+            return None
+        # truncate towards zero, same as integer division in SQL
+        progress = abs(100 * elapsed) // total
+        return progress if elapsed >= 0 else -progress
+
+    @annotated_property
+    def warranty_status(self):
+        """
+        Bucket of warranty period: pending, active, expiring (ends within
+        asset_warranty_expire_warning_days), expired or None if warranty_end
+        not defined.
+        """
+        if not self.warranty_end:
+            return None
+        today = date.today()
+        if self.warranty_end <= today:
+            return 'expired'
+        if self.warranty_start and self.warranty_start > today:
+            return 'pending'
+        warning_days = get_plugin_setting('asset_warranty_expire_warning_days')
+        if warning_days and self.warranty_end < today + timedelta(days=warning_days):
+            return 'expiring'
+        return 'active'
 
     def clean(self):
         self.clean_delivery()
@@ -458,7 +644,18 @@ class Asset(NetBoxModel, ImageAttachmentsMixin):
 
     def save(self, clear_old_hw=True, *args, **kwargs):
         self.update_hardware_used(clear_old_hw)
-        return super().save(*args, **kwargs)
+        self.update_installed()
+        # built here, so it is written with the same statement as the asset
+        if search_text_changed(self):
+            self.search_text = get_search_text(self)
+        ret = super().save(*args, **kwargs)
+        # prechange relations are resolved at most once per save
+        clear_prechange_cache(self)
+        return ret
+
+    def serialize_object(self, exclude=None):
+        # search_text is derived from other fields, don't include it in changes
+        return super().serialize_object(exclude=[*(exclude or []), 'search_text'])
 
     def validate_hardware_types(self):
         """
@@ -544,6 +741,11 @@ class Asset(NetBoxModel, ImageAttachmentsMixin):
         """
         if not get_plugin_setting('sync_hardware_serial_asset_tag'):
             return None
+        hardware_sync = get_deferred_hardware_sync()
+        if hardware_sync is not None:
+            # hardware will be updated in bulk, see sync.deferred_hardware_sync
+            hardware_sync.add(self, clear_old_hw)
+            return None
         old_hw = get_prechange_field(self, self.kind)
         new_hw = getattr(self, self.kind)
         if old_hw:
@@ -566,6 +768,37 @@ class Asset(NetBoxModel, ImageAttachmentsMixin):
             if new_hw:
                 asset_set_new_hw(asset=self, hw=new_hw)
 
+    def update_installed(self):
+        """
+        Set installed_site, installed_location, installed_rack and installed_device
+        based on hardware this asset is assigned to.
+        """
+        device = None
+        rack = None
+        if self.device_id:
+            device = self.device
+        elif self.module_id:
+            device = self.module.device
+        elif self.inventoryitem_id:
+            device = self.inventoryitem.device
+        elif self.rack_id:
+            rack = self.rack
+        if device:
+            self.installed_device = device
+            self.installed_site_id = device.site_id
+            self.installed_location_id = device.location_id
+            self.installed_rack_id = device.rack_id
+        elif rack:
+            self.installed_device = None
+            self.installed_site_id = rack.site_id
+            self.installed_location_id = rack.location_id
+            self.installed_rack = rack
+        else:
+            self.installed_device = None
+            self.installed_site = None
+            self.installed_location = None
+            self.installed_rack = None
+
     def clean_delivery(self):
         if self.delivery and self.delivery.purchase != self.purchase:
             raise ValidationError(
@@ -630,3 +863,53 @@ class Asset(NetBoxModel, ImageAttachmentsMixin):
                 violation_error_message='Asset with this Asset Tag and no Owner already exists.',
             ),
         )
+        indexes = (
+            # stored assets in a location, see get_located_q()
+            models.Index(
+                fields=('status', 'storage_location'),
+                name='nbi_asset_status_storage',
+            ),
+            # warranty filters and warranty column ordering
+            models.Index(
+                fields=('warranty_end',),
+                name='nbi_asset_warranty_end',
+            ),
+            # assets not assigned to any hardware (is_assigned=False)
+            models.Index(
+                fields=('status',),
+                name='nbi_asset_unassigned',
+                condition=models.Q(
+                    device__isnull=True,
+                    module__isnull=True,
+                    inventoryitem__isnull=True,
+                    rack__isnull=True,
+                ),
+            ),
+            # assets assigned to any hardware (is_assigned=True)
+            models.Index(
+                fields=('installed_site',),
+                name='nbi_asset_assigned',
+                condition=(
+                    models.Q(device__isnull=False)
+                    | models.Q(module__isnull=False)
+                    | models.Q(inventoryitem__isnull=False)
+                    | models.Q(rack__isnull=False)
+                ),
+            ),
+            # case-insensitive lookups of serials and asset tags, see
+            # AssetQuerySet.lookup_identifiers()
+            models.Index(
+                normalized_identifier('serial'),
+                name='nbi_asset_serial_normalized',
+            ),
+            models.Index(
+                normalized_identifier('asset_tag'),
+                name='nbi_asset_tag_normalized',
+            ),
+            # substring search, see AssetFilterSet.search()
+            GinIndex(
+                fields=('search_text',),
+                name='nbi_asset_search_text_trgm',
+                opclasses=('gin_trgm_ops',),
+            ),
+        )
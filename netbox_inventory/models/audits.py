@@ -0,0 +1,217 @@
+from django.core.exceptions import ValidationError
+from django.db import models
+from django.urls import reverse
+
+from netbox.models import NetBoxModel
+from utilities.querysets import RestrictedQuerySet
+
+from ..choices import AuditResultChoices, AuditSessionStatusChoices
+from ..utils import query_located
+from .assets import Asset, normalize_identifier, normalized_identifier
+
+
+class AuditSession(NetBoxModel):
+    """
+    A stock-take of assets stored at a site or in one of its storage
+    locations. Serials of assets physically found there are scanned into the
+    session and reconciled against assets that are expected to be stored
+    there.
+    """
+
+    name = models.CharField(
+        max_length=100,
+        unique=True,
+    )
+    status = models.CharField(
+        max_length=30,
+        choices=AuditSessionStatusChoices,
+        default='open',
+        help_text='Scans can only be added to open sessions',
+    )
+    site = models.ForeignKey(
+        help_text='Audited site',
+        to='dcim.Site',
+        on_delete=models.PROTECT,
+        related_name='+',
+    )
+    storage_location = models.ForeignKey(
+        help_text='Audited storage location, leave empty to audit whole site',
+        to='dcim.Location',
+        on_delete=models.PROTECT,
+        related_name='+',
+        blank=True,
+        null=True,
+        verbose_name='Storage Location',
+    )
+    description = models.CharField(
+        max_length=200,
+        blank=True,
+    )
+    comments = models.TextField(
+        blank=True,
+    )
+
+    class Meta:
+        ordering = ['-created']
+        verbose_name = 'audit session'
+
+    def __str__(self):
+        return self.name
+
+    def get_absolute_url(self):
+        return reverse('plugins:netbox_inventory:auditsession', args=[self.pk])
+
+    def get_status_color(self):
+        return AuditSessionStatusChoices.colors.get(self.status)
+
+    @property
+    def is_open(self):
+        return self.status == 'open'
+
+    def clean(self):
+        super().clean()
+        if self.storage_location and self.storage_location.site_id != self.site_id:
+            raise ValidationError(
+                {'storage_location': 'Storage location must be in audited site.'}
+            )
+
+    def add_scans(self, serials):
+        """
+        Add scanned serials to session. Serials already scanned in this
+        session (e.g. when a batch is sent again) are ignored. Returns number
+        of added scans, counted in session, so scans of batches added at the
+        same time are included.
+        """
+        scans = {}
+        for serial in serials:
+            key = normalize_identifier(serial)
+            if key and key not in scans:
+                scans[key] = AuditScan(
+                    session=self, serial=serial.strip(' '), serial_key=key
+                )
+        count = self.scans.count()
+        # already scanned serials are ignored by database
+        AuditScan.objects.bulk_create(
+            scans.values(), batch_size=1000, ignore_conflicts=True
+        )
+        return self.scans.count() - count
+
+    #
+    # Reconciliation. Each result is a single query joining scans with
+    # assets on normalized serial (see Asset indexes), no matter how many
+    # serials were scanned.
+    #
+
+    def get_expected_assets(self):
+        """
+        Assets stored in audited storage location or site.
+        """
+        if self.storage_location_id:
+            return query_located(
+                Asset.objects.all(), 'location', [self.storage_location_id], 'stored'
+            )
+        return query_located(Asset.objects.all(), 'site', [self.site_id], 'stored')
+
+    def _with_normalized_serial(self, assets):
+        return assets.annotate(normalized_serial=normalized_identifier('serial'))
+
+    def _scanned_serials(self):
+        return self.scans.values('serial_key')
+
+    def get_found_assets(self):
+        """
+        Expected assets that were scanned.
+        """
+        return self._with_normalized_serial(self.get_expected_assets()).filter(
+            normalized_serial__in=self._scanned_serials()
+        )
+
+    def get_missing_assets(self):
+        """
+        Expected assets that were not scanned, including those without serial.
+        """
+        return self._with_normalized_serial(self.get_expected_assets()).exclude(
+            normalized_serial__isnull=False,
+            normalized_serial__in=self._scanned_serials(),
+        )
+
+    def get_wrong_location_assets(self):
+        """
+        Scanned assets that are not expected here: stored elsewhere, installed
+        or not in a stored status.
+        """
+        return (
+            self._with_normalized_serial(Asset.objects.all())
+            .filter(normalized_serial__in=self._scanned_serials())
+            .exclude(pk__in=self.get_expected_assets().values('pk'))
+        )
+
+    def get_unexpected_scans(self):
+        """
+        Scans whose serial doesn't match any asset.
+        """
+        serials = (
+            self._with_normalized_serial(Asset.objects.all())
+            .filter(normalized_serial__isnull=False)
+            .values('normalized_serial')
+        )
+        return self.scans.exclude(serial_key__in=serials)
+
+    def get_result(self, result):
+        """
+        Return queryset of assets (or scans for unexpected) of reconciliation
+        result, one of AuditResultChoices.
+        """
+        return {
+            'found': self.get_found_assets,
+            'missing': self.get_missing_assets,
+            'wrong_location': self.get_wrong_location_assets,
+            'unexpected': self.get_unexpected_scans,
+        }[result]()
+
+    def get_result_counts(self):
+        """
+        Number of assets or scans of each reconciliation result.
+        """
+        return {
+            result: self.get_result(result).count() for result, _ in AuditResultChoices
+        }
+
+
+class AuditScan(models.Model):
+    """
+    A serial scanned in an audit session. Scans are added in large batches,
+    so they are not change logged.
+    """
+
+    session = models.ForeignKey(
+        to='netbox_inventory.AuditSession',
+        on_delete=models.CASCADE,
+        related_name='scans',
+    )
+    serial = models.CharField(
+        max_length=60,
+        help_text='Serial as it was scanned',
+    )
+    # normalized serial, compared with normalized serials of assets
+    serial_key = models.CharField(
+        max_length=60,
+        editable=False,
+    )
+    created = models.DateTimeField(
+        auto_now_add=True,
+    )
+
+    objects = RestrictedQuerySet.as_manager()
+
+    class Meta:
+        ordering = ['session', 'pk']
+        constraints = (
+            models.UniqueConstraint(
+                fields=('session', 'serial_key'),
+                name='nbi_auditscan_session_serial',
+            ),
+        )
+
+    def __str__(self):
+        return self.serial
@@ -1,11 +1,82 @@
 from django.db import models
+from django.db.models import Case, ExpressionWrapper, F, Q, Value, When
+from django.db.models.functions import Cast, Greatest, Least
 from django.urls import reverse
 from django.db.models.signals import pre_save
 from django.dispatch import receiver
 
 from netbox.models import NetBoxModel
+from utilities.querysets import RestrictedQuerySet
 
 from ..choices import ContractStatusChoices, ContractTypeChoices
+from ..utils import DateDiff, get_today_expression
+
+EXPIRY_ANNOTATIONS = (
+    'days_until_expiry',
+    'is_active',
+    'is_expired',
+    'needs_renewal',
+    'progress_percentage',
+)
+
+
+class ContractQuerySet(RestrictedQuerySet):
+    def with_expiry(self, today=None):
+        """
+        Annotate days_until_expiry, is_active, is_expired, needs_renewal and
+        progress_percentage, computed in SQL. Contract properties with the same
+        names return annotated values when present, so they can also be used
+        to filter and order contracts.
+        """
+        if all(name in self.query.annotations for name in EXPIRY_ANNOTATIONS):
+            return self
+        # without given date, date is read when each query runs
+        today = get_today_expression(today)
+        return self.annotate(
+            days_until_expiry=Greatest(DateDiff('end_date', today), Value(0)),
+            is_active=ExpressionWrapper(
+                Q(start_date__lte=today, end_date__gte=today),
+                output_field=models.BooleanField(),
+            ),
+            is_expired=ExpressionWrapper(
+                Q(end_date__lt=today),
+                output_field=models.BooleanField(),
+            ),
+            needs_renewal=ExpressionWrapper(
+                Q(renewal_date__isnull=False, renewal_date__lte=today),
+                output_field=models.BooleanField(),
+            ),
+            progress_percentage=Case(
+                When(end_date__lte=F('start_date'), then=Value(0.0)),
+                When(end_date__lt=today, then=Value(100.0)),
+                When(start_date__gt=today, then=Value(0.0)),
+                default=Least(
+                    Value(100.0),
+                    Cast(DateDiff(today, 'start_date'), models.FloatField())
+                    * Value(100.0)
+                    / DateDiff('end_date', 'start_date'),
+                ),
+                output_field=models.FloatField(),
+            ),
+        )
+
+
+class annotated_property:
+    """
+    Read-only property whose value is replaced by a queryset annotation of
+    the same name, if instance was fetched with one.
+    """
+
+    def __init__(self, fget):
+        self.fget = fget
+        self.__doc__ = fget.__doc__
+
+    def __get__(self, instance, owner=None):
+        if instance is None:
+            return self
+        # annotations are stored in instance __dict__, which takes precedence
+        # over this (non-data) descriptor, so we only get here without one
+        return self.fget(instance)
 
 
 class Contract(NetBoxModel):
@@ -92,6 +163,8 @@ class Contract(NetBoxModel):
         'description', 'contact'
     ]
 
+    objects = ContractQuerySet.as_manager()
+
     class Meta:
         ordering = ['name']
         unique_together = [['supplier', 'contract_id']]
@@ -107,14 +180,14 @@ class Contract(NetBoxModel):
     def get_status_color(self):
         return ContractStatusChoices.colors.get(self.status)
 
-    @property
+    @annotated_property
     def is_active(self):
         """Check if the contract is currently active based on dates."""
         from datetime import date
         today = date.today()
         return self.start_date <= today <= self.end_date
 
-    @property
+    @annotated_property
     def days_until_expiry(self):
         """Calculate days until contract expires."""
         from datetime import date
@@ -123,13 +196,13 @@ class Contract(NetBoxModel):
             return (self.end_date - today).days
         return 0
 
-    @property
+    @annotated_property
     def is_expired(self):
         """Check if the contract has expired."""
         from datetime import date
         return self.end_date < date.today()
 
-    @property
+    @annotated_property
     def needs_renewal(self):
         """Check if the contract needs renewal based on renewal date."""
         if not self.renewal_date:
@@ -194,7 +267,7 @@ class Contract(NetBoxModel):
             return 0  # Contract hasn't started yet
         return (today - self.start_date).days
 
-    @property
+    @annotated_property
     def progress_percentage(self):
         """Get the contract progress as a percentage (0-100)."""
         if not self.contract_duration_days or self.contract_duration_days <= 0:
@@ -0,0 +1,19 @@
+from django.db import models
+
+
+class BulkJobItems(models.Model):
+    """
+    Items processed by a background bulk job (see ChunkedJob). They are kept
+    apart from job data, which is saved after every chunk, so they are
+    written only once.
+    """
+
+    job = models.OneToOneField(
+        to='core.Job',
+        on_delete=models.CASCADE,
+        related_name='+',
+    )
+    items = models.JSONField()
+
+    def __str__(self):
+        return f'Items of job {self.job_id}'
@@ -176,6 +176,29 @@ deliveries_items = (
 )
 
 
+#
+# Audits
+#
+
+auditsession_buttons = [
+    PluginMenuButton(
+        link='plugins:netbox_inventory:auditsession_add',
+        title='Add',
+        icon_class='mdi mdi-plus-thick',
+        permissions=['netbox_inventory.add_auditsession'],
+    ),
+]
+
+audits_items = (
+    PluginMenuItem(
+        link='plugins:netbox_inventory:auditsession_list',
+        link_text='Audit Sessions',
+        permissions=['netbox_inventory.view_auditsession'],
+        buttons=auditsession_buttons,
+    ),
+)
+
+
 #
 # Menu
 #
@@ -188,9 +211,10 @@ if get_plugin_config('netbox_inventory', 'top_level_menu'):
             ('Asset Management', assets_items),
             ('Contracts', contracts_items),
             ('Deliveries', deliveries_items),
+            ('Audits', audits_items),
         ),
         icon_class='mdi mdi-clipboard-text-multiple-outline',
     )
 else:
     # display under plugins
-    menu_items = assets_items + contracts_items + deliveries_items
+    menu_items = assets_items + contracts_items + deliveries_items + audits_items
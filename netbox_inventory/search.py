@@ -2,6 +2,7 @@ from netbox.search import SearchIndex
 
 from .models import (
     Asset,
+    AuditSession,
     Delivery,
     InventoryItemGroup,
     InventoryItemType,
@@ -77,6 +78,15 @@ class DeliveryIndex(SearchIndex):
     )
 
 
+class AuditSessionIndex(SearchIndex):
+    model = AuditSession
+    fields = (
+        ('name', 100),
+        ('description', 500),
+        ('comments', 5000),
+    )
+
+
 indexes = [
     InventoryItemGroupIndex,
     InventoryItemTypeIndex,
@@ -84,4 +94,5 @@ indexes = [
     SupplierIndex,
     PurchaseIndex,
     DeliveryIndex,
+    AuditSessionIndex,
 ]
@@ -1,13 +1,27 @@
 import logging
 
-from django.db.models.signals import post_save, pre_delete, pre_save
+from django.db.models import Q
+from django.db.models.signals import post_delete, post_save, pre_delete, pre_save
 from django.dispatch import receiver
 
-from dcim.models import Device, InventoryItem, Module, Rack
+from dcim.models import Device, InventoryItem, Location, Module, Rack
 from utilities.exceptions import AbortRequest
 
-from .models import Asset, Delivery
-from .utils import get_plugin_setting, get_status_for, is_equal_none
+from .counters import (
+    get_inventoryitem_group_id,
+    get_saved_inventoryitem_group_id,
+    update_inventoryitem_group_counts,
+)
+from .models import Asset, Delivery, InventoryItemGroup, InventoryItemType
+from .utils import (
+    INSTALLED_FIELD_PATHS,
+    asset_update_search_text,
+    clear_cached_asset_counts,
+    get_plugin_setting,
+    get_search_text_sources,
+    get_status_for,
+    is_equal_none,
+)
 
 logger = logging.getLogger('netbox.netbox_inventory.signals')
 
@@ -24,6 +38,9 @@ def prevent_update_serial_asset_tag(instance, **kwargs):
 
     Only enforces if `sync_hardware_serial_asset_tag` setting is true.
     """
+    if getattr(instance, '_in_asset_sync', False):
+        # change is made by asset sync itself
+        return
     try:
         # will raise RelatedObjectDoesNotExist if not set
         asset = instance.assigned_asset
@@ -76,4 +93,210 @@ def handle_delivery_purchase_change(instance, created, **kwargs):
     Update child Assets if Delivery Purchase has changed.
     """
     if not created:
-        Asset.objects.filter(delivery=instance).update(purchase=instance.purchase)
+        assets = Asset.objects.filter(delivery=instance)
+        if assets.update(purchase=instance.purchase):
+            asset_update_search_text(assets)
+            clear_cached_asset_counts()
+
+
+@receiver(post_save, sender=Device)
+def update_installed_device(instance, created, **kwargs):
+    """
+    Device may have moved to a different site, location or rack. Update
+    installed fields of Assets assigned to device and to its modules and
+    inventory items.
+    """
+    if created:
+        return
+    if Asset.objects.filter(installed_device=instance).update(
+        installed_site=instance.site_id,
+        installed_location=instance.location_id,
+        installed_rack=instance.rack_id,
+    ):
+        clear_cached_asset_counts()
+
+
+@receiver(post_save, sender=Module)
+@receiver(post_save, sender=InventoryItem)
+def update_installed_component(instance, created, **kwargs):
+    """
+    Module or InventoryItem may have been moved to a different device. Update
+    installed fields of Asset assigned to it.
+    """
+    if created:
+        return
+    device = instance.device
+    if Asset.objects.filter(**{instance._meta.model_name: instance}).update(
+        installed_device=device.pk,
+        installed_site=device.site_id,
+        installed_location=device.location_id,
+        installed_rack=device.rack_id,
+    ):
+        clear_cached_asset_counts()
+
+
+@receiver(post_save, sender=Rack)
+def update_installed_rack(instance, created, **kwargs):
+    """
+    Rack may have moved to a different site or location. Update installed
+    fields of Asset assigned to rack and of Assets installed in the rack.
+    """
+    if created:
+        return
+    if Asset.objects.filter(installed_rack=instance).update(
+        installed_site=instance.site_id,
+        installed_location=instance.location_id,
+    ):
+        clear_cached_asset_counts()
+
+
+@receiver(post_save, sender=Location)
+def update_installed_location(instance, created, **kwargs):
+    """
+    Location may have moved to a different site. Netbox moves all child
+    locations, racks and devices with it, so update Assets installed there.
+    """
+    if created:
+        return
+    if Asset.objects.filter(
+        installed_location__in=instance.get_descendants(include_self=True)
+    ).update(installed_site=instance.site_id):
+        clear_cached_asset_counts()
+
+
+@receiver(pre_delete, sender=Device)
+@receiver(pre_delete, sender=Module)
+@receiver(pre_delete, sender=InventoryItem)
+@receiver(pre_delete, sender=Rack)
+def clear_installed(instance, **kwargs):
+    """
+    If a hardware (Device, Module, InventoryItem, Rack) is deleted, Assets
+    assigned to it (or installed in deleted Device) are no longer installed.
+    """
+    kind = instance._meta.model_name
+    if kind == 'device':
+        assets = Asset.objects.filter(installed_device=instance)
+    else:
+        assets = Asset.objects.filter(**{kind: instance})
+    if assets.update(**dict.fromkeys(INSTALLED_FIELD_PATHS[kind])):
+        clear_cached_asset_counts()
+
+
+@receiver(post_save, sender=Asset)
+@receiver(post_delete, sender=Asset)
+def clear_asset_counts(**kwargs):
+    """
+    Invalidate cached asset counts shown on Site, Location, Manufacturer...
+    pages when any Asset changes. Receivers and helpers that change assets
+    with update() or bulk_create() invalidate them too.
+    """
+    clear_cached_asset_counts()
+
+
+@receiver(pre_save, sender=Asset)
+@receiver(pre_save, sender=InventoryItemType)
+@receiver(pre_save, sender=InventoryItemGroup)
+def remember_inventoryitem_group(instance, **kwargs):
+    """
+    Remember group Asset or InventoryItemType was in (or parent of
+    InventoryItemGroup) before save, so that group counts can be updated.
+    """
+    if instance.pk and not instance._state.adding:
+        instance._saved_inventoryitem_group_id = get_saved_inventoryitem_group_id(
+            instance
+        )
+
+
+@receiver(post_save, sender=Asset)
+@receiver(post_save, sender=InventoryItemType)
+def update_inventoryitem_group_counts_on_save(instance, created, **kwargs):
+    """
+    Add created Asset or InventoryItemType to counts of its group and its
+    ancestors, or move it between groups if group changed.
+    """
+    group_id = get_inventoryitem_group_id(instance)
+    old_group_id = None if created else instance._saved_inventoryitem_group_id
+    if group_id == old_group_id:
+        return
+    if isinstance(instance, Asset):
+        counts = {'assets': 1}
+    else:
+        # assets of type move with it
+        counts = {
+            'assets': Asset.objects.filter(inventoryitem_type=instance).count(),
+            'types': 1,
+        }
+    update_inventoryitem_group_counts(
+        old_group_id, **{key: -value for key, value in counts.items()}
+    )
+    update_inventoryitem_group_counts(group_id, **counts)
+
+
+@receiver(post_delete, sender=Asset)
+@receiver(post_delete, sender=InventoryItemType)
+def update_inventoryitem_group_counts_on_delete(instance, **kwargs):
+    """
+    Remove deleted Asset or InventoryItemType from counts of its group and
+    its ancestors. Types with assets can't be deleted.
+    """
+    if isinstance(instance, Asset):
+        counts = {'assets': -1}
+    else:
+        counts = {'types': -1}
+    update_inventoryitem_group_counts(get_inventoryitem_group_id(instance), **counts)
+
+
+@receiver(post_save, sender=InventoryItemGroup)
+def move_inventoryitem_group_counts(instance, created, **kwargs):
+    """
+    Group moved to a different parent. Move its cumulative counts from old
+    ancestors to new ones.
+    """
+    if created or instance.parent_id == instance._saved_inventoryitem_group_id:
+        return
+    assets, types = (
+        InventoryItemGroup.objects.filter(pk=instance.pk)
+        .values_list('asset_count', 'inventoryitem_type_count')
+        .get()
+    )
+    update_inventoryitem_group_counts(
+        instance._saved_inventoryitem_group_id, -assets, -types, direct=False
+    )
+    update_inventoryitem_group_counts(instance.parent_id, assets, types, direct=False)
+
+
+@receiver(pre_delete, sender=InventoryItemGroup)
+def remove_inventoryitem_group_counts(instance, **kwargs):
+    """
+    Remove direct counts of deleted group from its ancestors. Child groups
+    are deleted with it and each removes its own counts, types in them are
+    left without group.
+    """
+    assets, types = (
+        InventoryItemGroup.objects.filter(pk=instance.pk)
+        .values_list('direct_asset_count', 'direct_inventoryitem_type_count')
+        .get()
+    )
+    update_inventoryitem_group_counts(instance.parent_id, -assets, -types, direct=False)
+
+
+def update_related_search_text(sender, instance, created, **kwargs):
+    """
+    Object whose name is stored in Asset.search_text may have been renamed.
+    Rebuild search_text of Assets related to it.
+    """
+    if created:
+        return
+    snapshot = getattr(instance, '_prechange_snapshot', None)
+    query = Q()
+    for lookup, field_name in SEARCH_TEXT_SOURCES[sender]:
+        if snapshot and snapshot.get(field_name) == getattr(instance, field_name):
+            continue
+        query |= Q(**{lookup: instance})
+    if query:
+        asset_update_search_text(Asset.objects.filter(query))
+
+
+SEARCH_TEXT_SOURCES = get_search_text_sources(Asset)
+for model in SEARCH_TEXT_SOURCES:
+    post_save.connect(update_related_search_text, sender=model)
@@ -0,0 +1,187 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.utils import timezone
+
+from core.choices import ObjectChangeActionChoices
+from dcim.models import Device, InventoryItem, Module, Rack
+from netbox.search.backends import search_backend
+
+from .changelog import log_bulk_changes
+
+__all__ = (
+    'HardwareSync',
+    'deferred_hardware_sync',
+    'get_deferred_hardware_sync',
+    'get_hardware_sync_values',
+)
+
+HARDWARE_MODELS = {
+    'device': Device,
+    'module': Module,
+    'inventoryitem': InventoryItem,
+    'rack': Rack,
+}
+
+_deferred_hardware_sync = ContextVar('netbox_inventory_hardware_sync', default=None)
+
+
+def get_hardware_sync_values(asset, inventoryitem_type=None):
+    """
+    Return dict of values (by attname) that hardware assigned to asset should
+    have when sync_hardware_serial_asset_tag is enabled.
+    inventoryitem_type can be passed if it was already fetched in bulk.
+    """
+    values = {
+        # device, module... does not allow serial to be null
+        'serial': asset.serial or '',
+        # device, module... needs None for blank asset_tag to enforce uniqness at DB level
+        'asset_tag': asset.asset_tag or None,
+    }
+    kind = asset.kind
+    if kind in ['device', 'module', 'rack']:
+        # handle changing of model (<kind>_type)
+        values[f'{kind}_type_id'] = getattr(asset, f'{kind}_type_id')
+    else:
+        # for inventory items also set manufacturer and part_number
+        inventoryitem_type = inventoryitem_type or asset.inventoryitem_type
+        values['manufacturer_id'] = inventoryitem_type.manufacturer_id
+        values['part_id'] = inventoryitem_type.part_number
+    return values
+
+
+def get_deferred_hardware_sync():
+    """
+    Return HardwareSync collecting changes in current deferred_hardware_sync()
+    block or None if not inside one.
+    """
+    return _deferred_hardware_sync.get()
+
+
+@contextmanager
+def deferred_hardware_sync():
+    """
+    Inside this block Asset.save() does not update assigned hardware one by one.
+    Changes are collected and applied in bulk when block exits without errors.
+    Should be used inside a transaction.
+    """
+    hardware_sync = _deferred_hardware_sync.get()
+    if hardware_sync is not None:
+        # nested block, outermost block will apply changes
+        yield hardware_sync
+        return
+    hardware_sync = HardwareSync()
+    token = _deferred_hardware_sync.set(hardware_sync)
+    try:
+        yield hardware_sync
+    finally:
+        _deferred_hardware_sync.reset(token)
+    hardware_sync.apply()
+
+
+class HardwareSync:
+    """
+    Collects assets whose serial, asset tag and type should be synced to
+    assigned hardware and applies changes with one bulk_update per hardware
+    model. Hardware is never saved individually, so pre_save receivers that
+    prevent changing serial of hardware with asset assigned are not triggered.
+
+    Change log entries are created in bulk if there is an active request.
+    """
+
+    batch_size = 500
+
+    def __init__(self):
+        # {kind: {hw_pk: asset}}
+        self.assigned = {kind: {} for kind in HARDWARE_MODELS}
+        # {kind: {hw_pk, ...}}
+        self.cleared = {kind: set() for kind in HARDWARE_MODELS}
+
+    def add(self, asset, clear_old_hw=True):
+        """
+        Register asset to be synced. If asset has a prechange snapshot and
+        assigned hardware changed, old hardware will be cleared.
+        """
+        kind = asset.kind
+        old_hw_pk = getattr(asset, '_prechange_snapshot', {}).get(kind)
+        new_hw_pk = getattr(asset, f'{kind}_id')
+        if old_hw_pk and old_hw_pk != new_hw_pk and clear_old_hw:
+            self.cleared[kind].add(old_hw_pk)
+        if new_hw_pk:
+            self.assigned[kind][new_hw_pk] = asset
+
+    def apply(self):
+        """
+        Write all collected changes to hardware. Returns number of updated
+        hardware objects.
+        """
+        updated = 0
+        for kind, model in HARDWARE_MODELS.items():
+            # clear hardware first, so its asset_tag can be reused by new hardware
+            cleared_pks = self.cleared[kind] - self.assigned[kind].keys()
+            if cleared_pks:
+                updated += self._update(
+                    model,
+                    cleared_pks,
+                    lambda hw: {'serial': '', 'asset_tag': None},
+                )
+            if self.assigned[kind]:
+                updated += self._update(
+                    model,
+                    self.assigned[kind].keys(),
+                    self._get_assigned_values(kind),
+                )
+        self.assigned = {kind: {} for kind in HARDWARE_MODELS}
+        self.cleared = {kind: set() for kind in HARDWARE_MODELS}
+        return updated
+
+    def _get_assigned_values(self, kind):
+        assets = self.assigned[kind]
+        inventoryitem_types = {}
+        if kind == 'inventoryitem':
+            from .models import InventoryItemType
+
+            inventoryitem_types = InventoryItemType.objects.in_bulk(
+                {asset.inventoryitem_type_id for asset in assets.values()}
+            )
+
+        def _get_values(hw):
+            asset = assets[hw.pk]
+            return get_hardware_sync_values(
+                asset, inventoryitem_types.get(asset.inventoryitem_type_id)
+            )
+
+        return _get_values
+
+    def _update(self, model, pks, get_values):
+        """
+        Set values returned by get_values(hw) on hardware and bulk update
+        those that changed.
+        """
+        changed = []
+        fields = set()
+        now = timezone.now()
+        for hw in model.objects.filter(pk__in=pks).prefetch_related('tags'):
+            values = {
+                attname: value
+                for attname, value in get_values(hw).items()
+                if getattr(hw, attname) != value
+            }
+            if not values:
+                continue
+            hw.snapshot()
+            for attname, value in values.items():
+                setattr(hw, attname, value)
+            hw.last_updated = now
+            fields.update(model._meta.get_field(attname).name for attname in values)
+            changed.append(hw)
+        if not changed:
+            return 0
+        model.objects.bulk_update(
+            changed, [*fields, 'last_updated'], batch_size=self.batch_size
+        )
+        search_backend.cache(changed)
+        log_bulk_changes(
+            changed, ObjectChangeActionChoices.ACTION_UPDATE, self.batch_size
+        )
+        return len(changed)
@@ -1,13 +1,24 @@
 import django_tables2 as tables
+from django.db.models import Count, F
 from django.db.models.functions import Coalesce
 from django.utils.translation import gettext_lazy as _
-
-from dcim.tables import DeviceTypeTable, ModuleTypeTable, RackTypeTable
+from django_tables2.data import TableQuerysetData
+
+from dcim.tables import (
+    DeviceTable,
+    DeviceTypeTable,
+    ModuleTable,
+    ModuleTypeTable,
+    RackTable,
+    RackTypeTable,
+)
 from netbox.tables import NetBoxTable, columns
+from utilities.query import count_related
 from utilities.tables import register_table_column
 
 from .models import (
     Asset,
+    AuditSession,
     Contract,
     Delivery,
     InventoryItemGroup,
@@ -15,10 +26,10 @@ from .models import (
     Purchase,
     Supplier,
 )
-from .template_content import WARRANTY_PROGRESSBAR
 
 __all__ = (
     'AssetTable',
+    'AuditSessionTable',
     'ContractTable',
     'DeliveryTable',
     'InventoryItemGroupTable',
@@ -216,17 +227,17 @@ class AssetTable(NetBoxTable):
         verbose_name='Current Location',
         orderable=False,
     )
+    # template file is compiled once by cached template loader, template_code
+    # would be compiled again for every row
     warranty_progress = columns.TemplateColumn(
-        template_code=WARRANTY_PROGRESSBAR,
-        order_by='warranty_end',
-        # orderable=False,
+        template_name='netbox_inventory/inc/warranty_progressbar.html',
         verbose_name='Warranty remaining',
     )
     comments = columns.MarkdownColumn()
     tags = columns.TagColumn()
     actions = columns.ActionsColumn(
         extra_buttons="""
-            {% if record.hardware %}
+            {% if record.device_id or record.module_id or record.inventoryitem_id or record.rack_id %}
             <a href="#" class="btn btn-sm btn-outline-dark disabled">
                 <i class="mdi mdi-vector-difference-ba" aria-hidden="true"></i>
             </a>
@@ -241,6 +252,80 @@ class AssetTable(NetBoxTable):
         """
     )
 
+    # related objects rendered by each column, selected only if column is
+    # visible, so number of queries doesn't depend on columns shown
+    related_fields = {
+        'manufacturer': (
+            'device_type__manufacturer',
+            'module_type__manufacturer',
+            'inventoryitem_type__manufacturer',
+            'rack_type__manufacturer',
+        ),
+        'hardware_type': (
+            'device_type',
+            'module_type',
+            'inventoryitem_type',
+            'rack_type',
+        ),
+        'inventoryitem_group': ('inventoryitem_type__inventoryitem_group',),
+        'hardware': (
+            'device',
+            'module__module_bay',
+            'module__module_type',
+            'inventoryitem',
+            'rack',
+        ),
+        'hardware_role': (
+            'device__role',
+            'module',
+            'inventoryitem__role',
+            'rack__role',
+        ),
+        'installed_site': ('installed_site',),
+        'installed_location': ('installed_location',),
+        'installed_rack': ('installed_rack',),
+        'installed_device': ('installed_device',),
+        'tenant': ('tenant',),
+        'contact': ('contact',),
+        'storage_site': ('storage_location__site',),
+        'storage_location': ('storage_location',),
+        'current_site': ('installed_site', 'storage_location__site'),
+        'current_location': ('installed_location', 'storage_location'),
+        'owner': ('owner',),
+        'supplier': ('purchase__supplier',),
+        'purchase': ('purchase',),
+        'delivery': ('delivery',),
+        'purchase_date': ('purchase',),
+        'delivery_date': ('delivery',),
+    }
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        if isinstance(self.data, TableQuerysetData):
+            queryset = self.data.data.select_related(*self.get_related_fields())
+            if self.columns['warranty_progress'].visible:
+                queryset = queryset.with_warranty()
+            self.data.data = queryset
+
+    def get_related_fields(self):
+        """
+        Return set of related fields to select for visible columns
+        """
+        return {
+            field
+            for column in self.columns
+            if column.visible
+            for field in self.related_fields.get(column.name, ())
+        }
+
+    def order_warranty_progress(self, queryset, is_descending):
+        progress = F('warranty_progress')
+        queryset = queryset.with_warranty().order_by(
+            (progress.desc if is_descending else progress.asc)(nulls_last=True),
+            ('-' if is_descending else '') + 'warranty_end',
+        )
+        return (queryset, True)
+
     def order_manufacturer(self, queryset, is_descending):
         queryset = queryset.annotate(
             manufacturer=Coalesce(
@@ -299,64 +384,39 @@ class AssetTable(NetBoxTable):
         )
         return (queryset, True)
 
-    def _order_annotate_installed(self, queryset):
-        return queryset.annotate(
-            site_name=Coalesce(
-                'device__site__name',
-                'module__device__site__name',
-                'inventoryitem__device__site__name',
-                'rack__site__name',
-            ),
-            location_name=Coalesce(
-                'device__location__name',
-                'module__device__location__name',
-                'inventoryitem__device__location__name',
-                'rack__location__name',
-            ),
-            rack_name=Coalesce(
-                'device__rack__name',
-                'module__device__rack__name',
-                'inventoryitem__device__rack__name',
-                'rack__name',
-            ),
-            device_name=Coalesce(
-                'device__name', 'module__device__name', 'inventoryitem__device__name'
-            ),
-        )
-
     def order_installed_site(self, queryset, is_descending):
-        queryset = self._order_annotate_installed(queryset).order_by(
-            ('-' if is_descending else '') + 'site_name',
-            ('-' if is_descending else '') + 'device_name',
+        queryset = queryset.order_by(
+            ('-' if is_descending else '') + 'installed_site__name',
+            ('-' if is_descending else '') + 'installed_device__name',
             ('-' if is_descending else '') + 'module__module_bay',
             ('-' if is_descending else '') + 'serial',
         )
         return (queryset, True)
 
     def order_installed_location(self, queryset, is_descending):
-        queryset = self._order_annotate_installed(queryset).order_by(
-            ('-' if is_descending else '') + 'site_name',
-            ('-' if is_descending else '') + 'location_name',
-            ('-' if is_descending else '') + 'device_name',
+        queryset = queryset.order_by(
+            ('-' if is_descending else '') + 'installed_site__name',
+            ('-' if is_descending else '') + 'installed_location__name',
+            ('-' if is_descending else '') + 'installed_device__name',
             ('-' if is_descending else '') + 'module__module_bay',
             ('-' if is_descending else '') + 'serial',
         )
         return (queryset, True)
 
     def order_installed_rack(self, queryset, is_descending):
-        queryset = self._order_annotate_installed(queryset).order_by(
-            ('-' if is_descending else '') + 'site_name',
-            ('-' if is_descending else '') + 'location_name',
-            ('-' if is_descending else '') + 'rack_name',
-            ('-' if is_descending else '') + 'device_name',
+        queryset = queryset.order_by(
+            ('-' if is_descending else '') + 'installed_site__name',
+            ('-' if is_descending else '') + 'installed_location__name',
+            ('-' if is_descending else '') + 'installed_rack__name',
+            ('-' if is_descending else '') + 'installed_device__name',
             ('-' if is_descending else '') + 'module__module_bay',
             ('-' if is_descending else '') + 'serial',
         )
         return (queryset, True)
 
     def order_installed_device(self, queryset, is_descending):
-        queryset = self._order_annotate_installed(queryset).order_by(
-            ('-' if is_descending else '') + 'device_name',
+        queryset = queryset.order_by(
+            ('-' if is_descending else '') + 'installed_device__name',
             ('-' if is_descending else '') + 'module__module_bay',
             ('-' if is_descending else '') + 'serial',
         )
@@ -572,38 +632,174 @@ class DeliveryTable(NetBoxTable):
         )
 
 
+#
+# Audits
+#
+
+
+class AuditSessionTable(NetBoxTable):
+    name = tables.Column(
+        linkify=True,
+    )
+    status = columns.ChoiceFieldColumn()
+    site = tables.Column(
+        linkify=True,
+    )
+    storage_location = tables.Column(
+        linkify=True,
+    )
+    scan_count = tables.Column(
+        verbose_name='Scans',
+    )
+    comments = columns.MarkdownColumn()
+    tags = columns.TagColumn()
+
+    class Meta(NetBoxTable.Meta):
+        model = AuditSession
+        fields = (
+            'pk',
+            'id',
+            'name',
+            'status',
+            'site',
+            'storage_location',
+            'scan_count',
+            'description',
+            'comments',
+            'tags',
+            'created',
+            'last_updated',
+            'actions',
+        )
+        default_columns = (
+            'name',
+            'status',
+            'site',
+            'storage_location',
+            'scan_count',
+            'created',
+        )
+
+
 # ========================
 # DCIM model table columns
 # ========================
 
-asset_count = columns.LinkedCountColumn(
-    viewname='plugins:netbox_inventory:asset_list',
-    url_params={'device_type_id': 'pk'},
-    verbose_name=_('Assets'),
-    accessor='assets__count',
-)
 
-register_table_column(asset_count, 'assets', DeviceTypeTable)
+def get_rendered_records(table):
+    """
+    Return records of rows being rendered: current page, or all rows if
+    table is not paginated (e.g. when exported).
+    """
+    page = getattr(table, 'page', None)
+    rows = page.object_list if page else table.rows
+    return [row.record for row in rows]
+
+
+class AssetCountColumn(columns.LinkedCountColumn):
+    """
+    Number of assets of hardware type in each row, for DCIM type tables whose
+    list views don't annotate it. Counts for all rows being rendered are
+    fetched with one query when the first cell is rendered, so nothing is
+    added to queryset unless column is visible.
+    """
+
+    def __init__(self, asset_field, **kwargs):
+        self.asset_field = asset_field
+        super().__init__(
+            viewname='plugins:netbox_inventory:asset_list',
+            url_params={f'{asset_field}_id': 'pk'},
+            verbose_name=_('Assets'),
+            # not a relation, so netbox doesn't prefetch all assets of rows
+            accessor='pk',
+            **kwargs,
+        )
 
+    def get_counts(self, table):
+        counts = table.__dict__.setdefault('_asset_counts', {})
+        if self.asset_field not in counts:
+            pks = [record.pk for record in get_rendered_records(table)]
+            counts[self.asset_field] = dict(
+                Asset.objects.filter(**{f'{self.asset_field}__in': pks})
+                .order_by()
+                .values_list(self.asset_field)
+                .annotate(count=Count('pk'))
+            )
+        return counts[self.asset_field]
 
-asset_count = columns.LinkedCountColumn(
-    viewname='plugins:netbox_inventory:asset_list',
-    url_params={'module_type_id': 'pk'},
-    verbose_name=_('Assets'),
-    accessor='assets__count',
-)
+    def render(self, record, table):
+        return super().render(record, self.get_counts(table).get(record.pk, 0))
 
-register_table_column(asset_count, 'assets', ModuleTypeTable)
+    def value(self, record, table):
+        return self.get_counts(table).get(record.pk, 0)
 
+    def order(self, queryset, is_descending):
+        queryset = queryset.annotate(
+            asset_count=count_related(Asset, self.asset_field)
+        ).order_by(('-' if is_descending else '') + 'asset_count', 'pk')
+        return (queryset, True)
 
-asset_count = columns.LinkedCountColumn(
-    viewname='plugins:netbox_inventory:asset_list',
-    url_params={'rack_type_id': 'pk'},
-    verbose_name=_('Assets'),
-    accessor='assets__count',
-)
 
-register_table_column(asset_count, 'assets', RackTypeTable)
+register_table_column(AssetCountColumn('device_type'), 'assets', DeviceTypeTable)
+register_table_column(AssetCountColumn('module_type'), 'assets', ModuleTypeTable)
+register_table_column(AssetCountColumn('rack_type'), 'assets', RackTypeTable)
+
+
+# Columns of asset assigned to device, module or rack. Accessors go through
+# assigned_asset relation, so netbox prefetches assets (and their contracts)
+# of listed objects with one query when any of these columns is visible.
+
+register_table_column(
+    columns.TemplateColumn(
+        accessor='assigned_asset__serial',
+        template_code="""
+        {% if value %}
+          <a href="{% url 'plugins:netbox_inventory:asset' pk=record.assigned_asset.pk %}">{{ value }}</a>
+        {% endif %}
+        """,
+        verbose_name=_('Asset serial'),
+    ),
+    'asset_serial',
+    DeviceTable,
+    ModuleTable,
+    RackTable,
+)
+register_table_column(
+    columns.TemplateColumn(
+        accessor='assigned_asset__status',
+        template_code="""
+        {% if value %}
+          {% badge record.assigned_asset.get_status_display bg_color=record.assigned_asset.get_status_color %}
+        {% endif %}
+        """,
+        verbose_name=_('Asset status'),
+    ),
+    'asset_status',
+    DeviceTable,
+    ModuleTable,
+    RackTable,
+)
+register_table_column(
+    columns.DateColumn(
+        accessor='assigned_asset__warranty_end',
+        verbose_name=_('Asset warranty end'),
+    ),
+    'asset_warranty_end',
+    DeviceTable,
+    ModuleTable,
+    RackTable,
+)
+register_table_column(
+    columns.ManyToManyColumn(
+        accessor='assigned_asset__contract',
+        linkify_item=True,
+        verbose_name=_('Asset contracts'),
+    ),
+    'asset_contracts',
+    DeviceTable,
+    ModuleTable,
+    RackTable,
+)
 
 
 class ContractTable(NetBoxTable):
@@ -1,105 +1,113 @@
-from django.template import Template
+from django.db.models import Count, Q
 
 from netbox.plugins import PluginTemplateExtension
 
 # Remove direct import of Asset model to avoid circular import issues
 # from .models import Asset
-from .utils import query_located
-
-WARRANTY_PROGRESSBAR = """
-{% with record.warranty_progress as wp %}
-{% with record.warranty_remaining as wr %}
-{% with settings.PLUGINS_CONFIG.netbox_inventory.asset_warranty_expire_warning_days as wthresh %}
-
-{% if wp is None and wr.days <= 0 %}
-  <div class="progress" role="progressbar">
-    <div class="progress-bar progress-bar-striped text-bg-danger" style="width:100%;">
-      Expired {{ record.warranty_end|timesince|split:','|first }} ago
-    </div>
-  </div>
-{% elif wp is None and wr.days > 0 %}
-  <div class="progress" role="progressbar">
-    <div class="progress-bar progress-bar-striped text-bg-{% if wthresh and wr.days < wthresh %}warning{% else %}success{% endif %}" style="width:100%;">
-      {{ record.warranty_end|timeuntil|split:','|first }}
-    </div>
-  </div>
-{% elif wp is None %}
-    {{ ""|placeholder }}
-{% else %}
-
-<div
-  class="progress"
-  role="progressbar"
-  aria-valuemin="0"
-  aria-valuemax="100"
-  aria-valuenow="{% if wp < 0 %}0{% else %}{{ wp }}{% endif %}"
->
-  <div
-    class="progress-bar text-bg-{% if wp >= 100 %}danger{% elif wthresh and wr.days < wthresh %}warning{% else %}success{% endif %}"
-    style="width: {% if wp < 0 %}0%{% else %}{{ wp }}%{% endif %};"
-  ></div>
-  {% if record.warranty_progress >= 100 %}
-    <span class="justify-content-center d-flex align-items-center position-absolute text-light w-100 h-100">Expired {{ record.warranty_end|timesince|split:','|first }} ago</span>
-  {% elif record.warranty_progress >= 35 %}
-    <span class="justify-content-center d-flex align-items-center position-absolute text-body-emphasis w-100 h-100">{{ record.warranty_end|timeuntil|split:','|first }}</span>
-  {% elif record.warranty_progress >= 0 %}
-    <span class="justify-content-center d-flex align-items-center position-absolute text-body-emphasis w-100 h-100">{{ record.warranty_end|timeuntil|split:','|first }}</span>
-  {% else %}
-    <span class="justify-content-center d-flex align-items-center position-absolute text-body-emphasis w-100 h-100">Starts in {{ record.warranty_start|timeuntil|split:','|first }}</span>
-  {% endif %}
-</div>
-
-{% endif %}
-{% endwith wthresh %}
-{% endwith wr %}
-{% endwith wp %}
-"""
+from .instrumentation import instrument_template_extensions
+from .utils import get_cached_asset_counts, get_located_q
 
 
 class AssetInfoExtension(PluginTemplateExtension):
-    def left_page(self):
+    # related objects shown in panel, besides hardware type and its manufacturer
+    related_fields = ('owner', 'purchase__supplier')
+
+    def get_asset(self, object):
+        """
+        Return asset assigned to object, with all objects shown in panel
+        loaded by one query (and one more for contracts). If object already
+        has its asset cached (e.g. selected with object), it is only used to
+        skip the query when there is none.
+        """
         # Lazy import to avoid circular import issues
         from .models import Asset
-        
+
+        related = type(object).assigned_asset.related
+        if related.is_cached(object):
+            cached = related.get_cached_value(object)
+            if cached is None:
+                return None
+            lookup = {'pk': cached.pk}
+        else:
+            lookup = {self.kind: object}
+        return (
+            Asset.objects.with_warranty()
+            .select_related(f'{self.kind}_type__manufacturer', *self.related_fields)
+            .prefetch_related('contract')
+            .filter(**lookup)
+            .first()
+        )
+
+    def left_page(self):
         object = self.context.get('object')
-        asset = Asset.objects.filter(**{self.kind: object}).first()
-        context = {'asset': asset}
-        context['warranty_progressbar'] = Template(WARRANTY_PROGRESSBAR)
+        context = {'asset': self.get_asset(object)}
         return self.render(
             'netbox_inventory/inc/asset_info.html', extra_context=context
         )
 
 
-class AssetLocationCounts(PluginTemplateExtension):
-    def right_page(self):
+class AssetCountsExtension(PluginTemplateExtension):
+    """
+    Base for panels showing counts of assets related to object. All counts
+    for a panel are calculated with a single query.
+    """
+
+    def get_asset_counts(self, q, **counts):
+        """
+        Returns dict of asset counts. Only assets matching q are counted,
+        each keyword argument is a Q() defining assets to count under that key.
+        """
         # Lazy import to avoid circular import issues
         from .models import Asset
-        
+
         object = self.context.get('object')
         user = self.context['request'].user
-        assets_qs = Asset.objects.restrict(user, 'view')
-        count_installed = query_located(
-            assets_qs, self.location_type, [object.pk], assets_shown='installed'
-        ).count()
-        count_stored = query_located(
-            assets_qs, self.location_type, [object.pk], assets_shown='stored'
-        ).count()
+
+        def _get_counts():
+            return (
+                Asset.objects.restrict(user, 'view')
+                .filter(q)
+                .aggregate(
+                    **{
+                        name: Count('pk', filter=count_q)
+                        for name, count_q in counts.items()
+                    }
+                )
+            )
+
+        return get_cached_asset_counts(
+            f'{self.__class__.__name__}_{object.pk}_{user.pk}', _get_counts
+        )
+
+
+class AssetLocationCounts(AssetCountsExtension):
+    def right_page(self):
+        object = self.context.get('object')
+        q_installed = get_located_q(
+            self.location_type, [object.pk], assets_shown='installed'
+        )
+        q_stored = get_located_q(self.location_type, [object.pk], assets_shown='stored')
+        counts = self.get_asset_counts(
+            q_installed | q_stored,
+            installed=q_installed,
+            stored=q_stored,
+        )
         context = {
             'asset_stats': [
                 {
                     'label': 'Installed',
                     'filter_field': f'installed_{self.location_type}_id',
-                    'count': count_installed,
+                    'count': counts['installed'],
                 },
                 {
                     'label': 'Stored',
                     'filter_field': f'storage_{self.location_type}_id',
-                    'count': count_stored,
+                    'count': counts['stored'],
                 },
                 {
                     'label': 'Total',
                     'filter_field': f'located_{self.location_type}_id',
-                    'count': count_installed + count_stored,
+                    'count': counts['installed'] + counts['stored'],
                 },
             ],
         }
@@ -128,29 +136,19 @@ class RackAssetInfo(AssetInfoExtension):
     kind = 'rack'
 
 
-class ManufacturerAssetCounts(PluginTemplateExtension):
+class ManufacturerAssetCounts(AssetCountsExtension):
     models = ['dcim.manufacturer']
 
     def right_page(self):
-        # Lazy import to avoid circular import issues
-        from .models import Asset
-        
         object = self.context.get('object')
-        user = self.context['request'].user
-        count_device = (
-            Asset.objects.restrict(user, 'view')
-            .filter(device_type__manufacturer=object)
-            .count()
-        )
-        count_module = (
-            Asset.objects.restrict(user, 'view')
-            .filter(module_type__manufacturer=object)
-            .count()
-        )
-        count_inventoryitem = (
-            Asset.objects.restrict(user, 'view')
-            .filter(inventoryitem_type__manufacturer=object)
-            .count()
+        q_device = Q(device_type__manufacturer=object)
+        q_module = Q(module_type__manufacturer=object)
+        q_inventoryitem = Q(inventoryitem_type__manufacturer=object)
+        counts = self.get_asset_counts(
+            q_device | q_module | q_inventoryitem,
+            device=q_device,
+            module=q_module,
+            inventoryitem=q_inventoryitem,
         )
         context = {
             'asset_stats': [
@@ -158,24 +156,26 @@ class ManufacturerAssetCounts(PluginTemplateExtension):
                     'label': 'Device',
                     'filter_field': 'manufacturer_id',
                     'extra_filter': '&kind=device',
-                    'count': count_device,
+                    'count': counts['device'],
                 },
                 {
                     'label': 'Module',
                     'filter_field': 'manufacturer_id',
                     'extra_filter': '&kind=module',
-                    'count': count_module,
+                    'count': counts['module'],
                 },
                 {
                     'label': 'Inventory Item',
                     'filter_field': 'manufacturer_id',
                     'extra_filter': '&kind=inventoryitem',
-                    'count': count_inventoryitem,
+                    'count': counts['inventoryitem'],
                 },
                 {
                     'label': 'Total',
                     'filter_field': 'manufacturer_id',
-                    'count': count_device + count_module + count_inventoryitem,
+                    'count': counts['device']
+                    + counts['module']
+                    + counts['inventoryitem'],
                 },
             ],
         }
@@ -194,24 +194,20 @@ class LocationAssetCounts(AssetLocationCounts):
     location_type = 'location'
 
 
-class RackAssetCounts(PluginTemplateExtension):
+class RackAssetCounts(AssetCountsExtension):
     # rack cannot have stored assets so we can't use AssetLocationStats
     models = ['dcim.rack']
 
     def right_page(self):
-        # Lazy import to avoid circular import issues
-        from .models import Asset
-        
         object = self.context.get('object')
-        user = self.context['request'].user
-        assets_qs = Asset.objects.restrict(user, 'view')
-        assets_qs = query_located(assets_qs, 'rack', [object.pk])
+        q_installed = get_located_q('rack', [object.pk], assets_shown='installed')
+        counts = self.get_asset_counts(q_installed, installed=q_installed)
         context = {
             'asset_stats': [
                 {
                     'label': 'Installed',
                     'filter_field': 'installed_rack_id',
-                    'count': assets_qs.count(),
+                    'count': counts['installed'],
                 },
             ],
         }
@@ -220,30 +216,29 @@ class RackAssetCounts(PluginTemplateExtension):
         )
 
 
-class TenantAssetCounts(PluginTemplateExtension):
+class TenantAssetCounts(AssetCountsExtension):
     models = ['tenancy.tenant']
 
     def right_page(self):
-        # Lazy import to avoid circular import issues
-        from .models import Asset
-        
         object = self.context.get('object')
-        user = self.context['request'].user
+        q_assigned = Q(tenant=object)
+        q_owned = Q(owner=object)
+        counts = self.get_asset_counts(
+            q_assigned | q_owned,
+            assigned=q_assigned,
+            owned=q_owned,
+        )
         context = {
             'asset_stats': [
                 {
                     'label': 'Assigned',
                     'filter_field': 'tenant_id',
-                    'count': Asset.objects.restrict(user, 'view')
-                    .filter(tenant=object)
-                    .count(),
+                    'count': counts['assigned'],
                 },
                 {
                     'label': 'Owned',
                     'filter_field': 'owner_id',
-                    'count': Asset.objects.restrict(user, 'view')
-                    .filter(owner=object)
-                    .count(),
+                    'count': counts['owned'],
                 },
             ],
         }
@@ -252,23 +247,19 @@ class TenantAssetCounts(PluginTemplateExtension):
         )
 
 
-class ContactAssetCounts(PluginTemplateExtension):
+class ContactAssetCounts(AssetCountsExtension):
     models = ['tenancy.contact']
 
     def right_page(self):
-        # Lazy import to avoid circular import issues
-        from .models import Asset
-        
         object = self.context.get('object')
-        user = self.context['request'].user
+        q_assigned = Q(contact=object)
+        counts = self.get_asset_counts(q_assigned, assigned=q_assigned)
         context = {
             'asset_stats': [
                 {
                     'label': 'Assigned',
                     'filter_field': 'contact_id',
-                    'count': Asset.objects.restrict(user, 'view')
-                    .filter(contact=object)
-                    .count(),
+                    'count': counts['assigned'],
                 },
             ],
         }
@@ -277,15 +268,17 @@ class ContactAssetCounts(PluginTemplateExtension):
         )
 
 
-template_extensions = (
-    DeviceAssetInfo,
-    ModuleAssetInfo,
-    InventoryItemAssetInfo,
-    RackAssetInfo,
-    ManufacturerAssetCounts,
-    SiteAssetCounts,
-    LocationAssetCounts,
-    RackAssetCounts,
-    TenantAssetCounts,
-    ContactAssetCounts,
+template_extensions = instrument_template_extensions(
+    (
+        DeviceAssetInfo,
+        ModuleAssetInfo,
+        InventoryItemAssetInfo,
+        RackAssetInfo,
+        ManufacturerAssetCounts,
+        SiteAssetCounts,
+        LocationAssetCounts,
+        RackAssetCounts,
+        TenantAssetCounts,
+        ContactAssetCounts,
+    )
 )
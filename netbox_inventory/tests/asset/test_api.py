@@ -1,5 +1,9 @@
 from copy import copy
 
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
 from rest_framework import status
 
 from core.models import ObjectType
@@ -35,6 +39,82 @@ class AssetTest(
         'status': 'used',
     }
 
+    def test_list_objects_query_count(self):
+        """
+        number of queries doesn't depend on number of listed assets
+        """
+        obj_perm = ObjectPermission(name='Test permission', actions=['view'])
+        obj_perm.save()
+        obj_perm.users.add(self.user)
+        obj_perm.object_types.add(ObjectType.objects.get_for_model(self.model))
+        Asset.objects.create(
+            serial='asset4',
+            inventoryitem_type=InventoryItemType.objects.first(),
+            delivery=self.delivery1,
+            purchase=self.purchase1,
+        )
+        Asset.objects.create(
+            serial='asset5',
+            module_type=ModuleType.objects.first(),
+            purchase=self.purchase1,
+        )
+
+        url = self._get_list_url()
+        for params in ('', '&brief=1', '&fields=id,display,delivery', '&omit=tags'):
+            with self.subTest(params=params):
+                # warm up caches
+                self.client.get(f'{url}?limit=1{params}', **self.header)
+                with CaptureQueriesContext(connection) as queries_one:
+                    response = self.client.get(f'{url}?limit=1{params}', **self.header)
+                self.assertHttpStatus(response, status.HTTP_200_OK)
+                with CaptureQueriesContext(connection) as queries_all:
+                    response = self.client.get(
+                        f'{url}?limit=100{params}', **self.header
+                    )
+                self.assertHttpStatus(response, status.HTTP_200_OK)
+                self.assertEqual(len(response.data['results']), 5)
+                self.assertEqual(len(queries_all), len(queries_one))
+
+    @override_settings(EXEMPT_VIEW_PERMISSIONS=['*'])
+    def test_graphql_list_query_count(self):
+        """
+        nested relations in GraphQL are fetched in a fixed number of queries
+        """
+        query = """{
+            asset_list {
+                kind
+                device { site { name } }
+                purchase { supplier { name } }
+                contract { name }
+            }
+        }"""
+
+        def graphql_query():
+            with CaptureQueriesContext(connection) as queries:
+                response = self.client.post(
+                    reverse('graphql'), {'query': query}, format='json', **self.header
+                )
+            self.assertHttpStatus(response, status.HTTP_200_OK)
+            self.assertNotIn('errors', response.json())
+            return len(queries)
+
+        graphql_query()
+        query_count = graphql_query()
+        Asset.objects.create(
+            serial='asset4',
+            device_type=self.device1.device_type,
+            device=self.device1,
+            purchase=self.purchase1,
+        )
+        Asset.objects.create(
+            serial='asset5',
+            device_type=self.device2.device_type,
+            device=self.device2,
+            delivery=self.delivery1,
+            purchase=self.purchase1,
+        )
+        self.assertEqual(graphql_query(), query_count)
+
     def test_assign_device_matching_device_type(self):
         """
         check assigning device to asset when asset's & device's device_type matches
@@ -138,6 +218,65 @@ class AssetTest(
         self.assertEqual(instance.serial, None)
         self.assertEqual(instance.asset_tag, None)
 
+    def lookup(self, data):
+        url = reverse('plugins-api:netbox_inventory-api:asset-lookup')
+        return self.client.post(url, data, format='json', **self.header)
+
+    @override_settings(EXEMPT_VIEW_PERMISSIONS=['*'])
+    def test_lookup(self):
+        """
+        serials and asset tags match ignoring case and whitespace, one result
+        for each of them in order of request
+        """
+        asset = Asset.objects.get(serial='asset1')
+        asset.asset_tag = 'TAG1'
+        asset.device = self.device1
+        asset.save()
+
+        response = self.lookup(
+            {'serials': [' ASSET1 ', 'missing', 'asset3'], 'asset_tags': ['tag1']}
+        )
+        self.assertHttpStatus(response, status.HTTP_200_OK)
+        results = response.data['results']
+        self.assertEqual(
+            [(r['identifier'], r['field'], r['found']) for r in results],
+            [
+                (' ASSET1 ', 'serial', True),
+                ('missing', 'serial', False),
+                ('asset3', 'serial', True),
+                ('tag1', 'asset_tag', True),
+            ],
+        )
+        self.assertEqual(results[1]['assets'], [])
+        self.assertEqual(results[2]['assets'][0]['kind'], 'rack')
+        self.assertEqual(results[0]['assets'], results[3]['assets'])
+        compact = results[0]['assets'][0]
+        self.assertEqual(compact['id'], asset.pk)
+        self.assertEqual(compact['kind'], 'device')
+        self.assertEqual(compact['hardware']['id'], self.device1.pk)
+        self.assertEqual(compact['site']['id'], self.device1.site_id)
+
+    @override_settings(EXEMPT_VIEW_PERMISSIONS=['*'])
+    def test_lookup_query_count(self):
+        with CaptureQueriesContext(connection) as queries_one:
+            self.assertHttpStatus(
+                self.lookup({'serials': ['asset1']}), status.HTTP_200_OK
+            )
+        with CaptureQueriesContext(connection) as queries_all:
+            response = self.lookup(
+                {'serials': ['asset1', 'asset2', 'asset3', 'missing']}
+            )
+        self.assertHttpStatus(response, status.HTTP_200_OK)
+        self.assertEqual(len(queries_all), len(queries_one))
+
+    def test_lookup_invalid(self):
+        with disable_warnings('django.request'):
+            self.assertHttpStatus(self.lookup({}), status.HTTP_400_BAD_REQUEST)
+            self.assertHttpStatus(
+                self.lookup({'serials': ['serial'] * 10001}),
+                status.HTTP_400_BAD_REQUEST,
+            )
+
     @classmethod
     def setUpTestData(cls):
         manufacturer = Manufacturer.objects.create(
@@ -0,0 +1,137 @@
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+
+from core.models import ObjectType
+from dcim.models import DeviceType, Manufacturer
+from extras.models import Tag
+from tenancy.models import Tenant
+from users.models import ObjectPermission
+
+from ..settings import CONFIG_ALLOW_CREATE_DEVICE_TYPE
+from netbox_inventory.forms import AssetImportForm
+from netbox_inventory.importer import AssetImporter
+from netbox_inventory.models import Asset, Delivery, Purchase, Supplier
+
+
+class TestAssetImporter(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.manufacturer = Manufacturer.objects.create(
+            name='manufacturer1', slug='manufacturer1'
+        )
+        cls.device_type = DeviceType.objects.create(
+            manufacturer=cls.manufacturer, model='device_type1', slug='device_type1'
+        )
+        supplier = Supplier.objects.create(name='Supplier1', slug='supplier1')
+        cls.purchase = Purchase.objects.create(
+            name='Purchase1', supplier=supplier, status='closed'
+        )
+        cls.delivery = Delivery.objects.create(name='Delivery1', purchase=cls.purchase)
+        cls.tag = Tag.objects.create(name='tag1', slug='tag1')
+
+    def _records(self, count, model_name='device_type1', start=0):
+        return [
+            {
+                'serial': f'serial{i}',
+                'status': 'stored',
+                'hardware_kind': 'device',
+                'manufacturer': 'manufacturer1',
+                'model_name': model_name,
+                'supplier': 'Supplier1',
+                'purchase': 'Purchase1',
+                'delivery': 'Delivery1',
+                'tags': 'tag1',
+            }
+            for i in range(start, start + count)
+        ]
+
+    def test_import(self):
+        importer = AssetImporter(AssetImportForm, self._records(3))
+        assets = importer.run()
+        self.assertEqual(importer.errors, [])
+        self.assertEqual(len(assets), 3)
+        asset = Asset.objects.get(serial='serial1')
+        self.assertEqual(asset.device_type, self.device_type)
+        self.assertEqual(asset.purchase, self.purchase)
+        self.assertEqual(asset.delivery, self.delivery)
+        self.assertEqual(list(asset.tags.all()), [self.tag])
+
+    def test_import_query_count(self):
+        with CaptureQueriesContext(connection) as few:
+            AssetImporter(AssetImportForm, self._records(5)).run()
+        with CaptureQueriesContext(connection) as many:
+            AssetImporter(AssetImportForm, self._records(100, start=5)).run()
+        self.assertEqual(Asset.objects.count(), 105)
+        # related objects are fetched in bulk, only full_clean() of each asset
+        # may look up its custom fields
+        self.assertLessEqual(len(many) - len(few), 95)
+
+    def test_import_errors(self):
+        records = self._records(4)
+        records[0]['model_name'] = 'unknown'
+        records[2]['serial'] = 'serial1'
+        records[3]['status'] = 'invalid'
+        importer = AssetImporter(AssetImportForm, records)
+        self.assertIsNone(importer.run())
+        self.assertEqual(
+            [(idx, field_name) for idx, field_name, _ in importer.errors],
+            [(4, 'status'), (1, 'model_name'), (3, None)],
+        )
+        self.assertFalse(Asset.objects.exists())
+
+    def test_import_duplicate_serial(self):
+        Asset.objects.create(
+            serial='serial0', status='stored', device_type=self.device_type
+        )
+        importer = AssetImporter(AssetImportForm, self._records(2))
+        self.assertIsNone(importer.run())
+        self.assertEqual(
+            [(idx, field_name) for idx, field_name, _ in importer.errors],
+            [(1, None)],
+        )
+
+    @override_settings(PLUGINS_CONFIG=CONFIG_ALLOW_CREATE_DEVICE_TYPE)
+    def test_import_create_device_type(self):
+        importer = AssetImporter(
+            AssetImportForm, self._records(3, model_name='device_type_new')
+        )
+        assets = importer.run()
+        self.assertEqual(importer.errors, [])
+        device_type = DeviceType.objects.get(model='device_type_new')
+        self.assertEqual({asset.device_type for asset in assets}, {device_type})
+
+    def test_import_forbidden_related_objects(self):
+        Tenant.objects.create(name='tenant1', slug='tenant1')
+        user = get_user_model().objects.create_user(username='importuser')
+        obj_perm = ObjectPermission(name='Test permission', actions=['view'])
+        obj_perm.save()
+        obj_perm.users.add(user)
+        # user can't view tenants and deliveries
+        for model in (Manufacturer, DeviceType, Supplier, Purchase, Tag):
+            obj_perm.object_types.add(ObjectType.objects.get_for_model(model))
+        records = self._records(2)
+        for record in records:
+            record['owner'] = 'tenant1'
+        importer = AssetImporter(AssetImportForm, records, user=user)
+        self.assertIsNone(importer.run())
+        self.assertEqual(
+            [(idx, field_name) for idx, field_name, _ in importer.errors],
+            [(1, 'owner'), (1, 'delivery'), (2, 'owner'), (2, 'delivery')],
+        )
+        self.assertFalse(Asset.objects.exists())
+
+    @override_settings(
+        CUSTOM_VALIDATORS={'netbox_inventory.asset': [{'serial': {'regex': '^SN'}}]}
+    )
+    def test_import_custom_validators(self):
+        records = self._records(2)
+        records[1]['serial'] = 'SN1'
+        importer = AssetImporter(AssetImportForm, records)
+        self.assertIsNone(importer.run())
+        self.assertEqual(
+            [(idx, field_name) for idx, field_name, _ in importer.errors],
+            [(1, 'serial')],
+        )
+        self.assertFalse(Asset.objects.exists())
@@ -0,0 +1,71 @@
+import uuid
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+
+from core.choices import JobStatusChoices
+from core.models import Job
+
+from ..settings import CONFIG_BACKGROUND_JOBS
+from netbox_inventory.jobs import AssetBulkDeleteJob, AssetBulkEditJob, is_resumable
+from netbox_inventory.models import Asset, BulkJobItems
+
+
+@override_settings(PLUGINS_CONFIG=CONFIG_BACKGROUND_JOBS)
+class TestAssetBulkJobs(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = get_user_model().objects.create_user(
+            username='jobuser', is_superuser=True
+        )
+        Asset.objects.bulk_create(
+            Asset(serial=f'serial{i}', status='stored') for i in range(5)
+        )
+        cls.pks = list(Asset.objects.order_by('pk').values_list('pk', flat=True))
+
+    def test_edit(self):
+        job = AssetBulkEditJob.enqueue(
+            user=self.user,
+            immediate=True,
+            items=self.pks,
+            post_data={'status': ['retired']},
+        )
+        job.refresh_from_db()
+        self.assertEqual(job.status, JobStatusChoices.STATUS_COMPLETED)
+        self.assertEqual(job.data['processed'], 5)
+        self.assertEqual(job.data['results'], {'updated': 5})
+        self.assertEqual(Asset.objects.filter(status='retired').count(), 5)
+        # items are stored apart from job data and dropped when job finishes
+        self.assertNotIn('items', job.data)
+        self.assertFalse(BulkJobItems.objects.filter(job=job).exists())
+
+    def test_resume_interrupted_delete(self):
+        # first two chunks were committed before worker crashed
+        interrupted = Job.objects.create(
+            name=AssetBulkDeleteJob.name,
+            user=self.user,
+            status=JobStatusChoices.STATUS_ERRORED,
+            job_id=uuid.uuid4(),
+            data={
+                'params': {},
+                'total': 5,
+                'processed': 4,
+                'results': {'deleted': 4},
+                'errors': [],
+            },
+        )
+        BulkJobItems.objects.create(job=interrupted, items=self.pks)
+        self.assertTrue(is_resumable(interrupted))
+
+        job = AssetBulkDeleteJob.enqueue(
+            user=self.user, immediate=True, resume_job=interrupted.pk
+        )
+        job.refresh_from_db()
+        interrupted.refresh_from_db()
+        self.assertEqual(job.data['processed'], 5)
+        self.assertEqual(job.data['results'], {'deleted': 5})
+        # only last chunk was processed
+        self.assertEqual(list(Asset.objects.values_list('pk', flat=True)), self.pks[:4])
+        self.assertEqual(interrupted.data['resumed_by'], job.pk)
+        self.assertFalse(is_resumable(interrupted))
+        self.assertFalse(BulkJobItems.objects.exists())
@@ -1,11 +1,25 @@
+import uuid
+from datetime import date, timedelta
+from unittest import mock
+
+from django.db.models import Value
 from django.forms import ValidationError
 from django.test import TestCase, override_settings
 
 from dcim.models import Device, DeviceRole, DeviceType, Manufacturer, Site
 from utilities.exceptions import AbortRequest
 
-from ..settings import CONFIG_SYNC_OFF, CONFIG_SYNC_ON
+from ..settings import CONFIG_ASSET_COUNTS_CACHE, CONFIG_SYNC_OFF, CONFIG_SYNC_ON
+from netbox_inventory.filtersets import AssetFilterSet
 from netbox_inventory.models import Asset, Delivery, Purchase, Supplier
+from netbox_inventory.models.assets import normalize_identifier, normalized_identifier
+from netbox_inventory.sync import deferred_hardware_sync
+from netbox_inventory.utils import (
+    asset_update_search_text,
+    get_cached_asset_counts,
+    get_prechange_field_stats,
+    reset_prechange_field_stats,
+)
 
 
 class TestAssetModel(TestCase):
@@ -111,6 +125,56 @@ class TestAssetModel(TestCase):
         self.assertEqual(self.device2.serial, '')
         self.assertEqual(self.device2.asset_tag, None)
 
+    @override_settings(PLUGINS_CONFIG=CONFIG_SYNC_ON)
+    def test_update_hardware_used_deferred(self):
+        # hardware is not updated until deferred block exits
+        with deferred_hardware_sync():
+            self.asset1.snapshot()
+            self.asset1.device = self.device1
+            self.asset1.full_clean()
+            self.asset1.save()
+            self.device1.refresh_from_db()
+            self.assertEqual(self.device1.serial, '')
+        self.device1.refresh_from_db()
+        self.assertEqual(self.device1.serial, self.asset1.serial)
+        self.assertEqual(self.device1.asset_tag, self.asset1.asset_tag)
+
+        # assign different device clears old one
+        with deferred_hardware_sync():
+            self.asset1.snapshot()
+            self.asset1.device = self.device2
+            self.asset1.full_clean()
+            self.asset1.save()
+        self.device1.refresh_from_db()
+        self.device2.refresh_from_db()
+        self.assertEqual(self.device1.serial, '')
+        self.assertEqual(self.device1.asset_tag, None)
+        self.assertEqual(self.device2.serial, self.asset1.serial)
+        self.assertEqual(self.device2.asset_tag, self.asset1.asset_tag)
+
+    @override_settings(PLUGINS_CONFIG=CONFIG_SYNC_ON)
+    def test_prechange_field_cache(self):
+        self.asset1.snapshot()
+        self.asset1.device = self.device1
+        self.asset1.full_clean()
+        self.asset1.save()
+
+        # assigned device did not change, loaded device is reused
+        reset_prechange_field_stats()
+        self.asset1.snapshot()
+        self.asset1.serial = 'changed'
+        self.asset1.full_clean()
+        self.asset1.save()
+        self.assertEqual(get_prechange_field_stats()['misses'], 0)
+
+        # old device is fetched only once per save
+        reset_prechange_field_stats()
+        self.asset1.snapshot()
+        self.asset1.device = self.device2
+        self.asset1.full_clean()
+        self.asset1.save()
+        self.assertEqual(get_prechange_field_stats()['misses'], 1)
+
     @override_settings(PLUGINS_CONFIG=CONFIG_SYNC_OFF)
     def test_update_hardware_used_off(self):
         # assign device to asset
@@ -212,3 +276,231 @@ class TestAssetModel(TestCase):
         self.delivery1.save()
         self.asset1.refresh_from_db()
         self.assertEqual(self.asset1.purchase, self.purchase2)
+
+    def test_installed_fields(self):
+        site2 = Site.objects.create(
+            name='site2',
+            slug='site2',
+            status='active',
+        )
+        self.asset1.snapshot()
+        self.asset1.device = self.device1
+        self.asset1.full_clean()
+        self.asset1.save()
+        self.asset1.refresh_from_db()
+        self.assertEqual(self.asset1.installed_device, self.device1)
+        self.assertEqual(self.asset1.installed_site, self.site1)
+        self.assertIsNone(self.asset1.installed_rack)
+
+        # moving device updates asset via signals
+        self.device1.snapshot()
+        self.device1.site = site2
+        self.device1.full_clean()
+        self.device1.save()
+        self.asset1.refresh_from_db()
+        self.assertEqual(self.asset1.installed_site, site2)
+        self.assertQuerySetEqual(
+            Asset.objects.filter(installed_site=site2), [self.asset1]
+        )
+
+        # unassign device from asset
+        self.asset1.snapshot()
+        self.asset1.device = None
+        self.asset1.full_clean()
+        self.asset1.save()
+        self.asset1.refresh_from_db()
+        self.assertIsNone(self.asset1.installed_device)
+        self.assertIsNone(self.asset1.installed_site)
+
+    def test_installed_fields_device_deleted(self):
+        self.asset1.snapshot()
+        self.asset1.device = self.device1
+        self.asset1.full_clean()
+        self.asset1.save()
+        self.device1.delete()
+        self.asset1.refresh_from_db()
+        self.assertIsNone(self.asset1.installed_device)
+        self.assertIsNone(self.asset1.installed_site)
+
+    @override_settings(PLUGINS_CONFIG=CONFIG_ASSET_COUNTS_CACHE)
+    def test_installed_fields_clear_cached_counts(self):
+        site2 = Site.objects.create(name='site2', slug='site2', status='active')
+        self.asset1.snapshot()
+        self.asset1.device = self.device1
+        self.asset1.full_clean()
+        self.asset1.save()
+
+        # cache may outlive test database, don't reuse keys of earlier runs
+        cache_key = f'test_{uuid.uuid4()}'
+
+        def get_counts():
+            return get_cached_asset_counts(
+                cache_key, Asset.objects.filter(installed_site=self.site1).count
+            )
+
+        self.assertEqual(get_counts(), 1)
+        # asset is updated with update(), without post_save of asset
+        self.device1.snapshot()
+        self.device1.site = site2
+        self.device1.full_clean()
+        self.device1.save()
+        self.assertEqual(get_counts(), 0)
+
+    def test_search_text(self):
+        self.asset1.snapshot()
+        self.asset1.purchase = self.purchase1
+        self.asset1.delivery = self.delivery1
+        self.asset1.full_clean()
+        self.asset1.save()
+
+        def search(value):
+            return AssetFilterSet({'q': value}, Asset.objects.all()).qs
+
+        self.assertQuerySetEqual(search('SUPPLIER1'), [self.asset1])
+        self.assertQuerySetEqual(search('device_type1'), [self.asset1])
+        self.assertQuerySetEqual(search(str(self.asset1.pk)), [self.asset1])
+        self.assertFalse(search('supplier2').exists())
+
+        # renaming related object updates asset via signals
+        self.supplier1.snapshot()
+        self.supplier1.name = 'Supplier2'
+        self.supplier1.full_clean()
+        self.supplier1.save()
+        self.assertQuerySetEqual(search('supplier2'), [self.asset1])
+        self.assertFalse(search('supplier1').exists())
+
+    def test_search_text_case_insensitive(self):
+        self.asset1.snapshot()
+        self.asset1.name = 'Rack Switch A'
+        self.asset1.full_clean()
+        self.asset1.save()
+        self.asset1.refresh_from_db()
+        # stored lowercased, so search can use plain LIKE served by the index
+        self.assertIn('rack switch a', self.asset1.search_text)
+        self.assertNotIn('Rack', self.asset1.search_text)
+
+        def search(value):
+            return AssetFilterSet({'q': value}, Asset.objects.all()).qs
+
+        for value in ('rack switch', 'RACK SWITCH', 'Switch A', 'k sWi'):
+            with self.subTest(value=value):
+                self.assertQuerySetEqual(search(value), [self.asset1])
+        # LIKE wildcards in search value are matched literally
+        self.assertFalse(search('rack%a').exists())
+        self.assertFalse(search('switch_a').exists())
+
+    def test_search_text_built_on_save(self):
+        self.asset1.snapshot()
+        self.asset1.name = 'Asset One'
+        self.asset1.purchase = self.purchase1
+        self.asset1.delivery = self.delivery1
+        self.asset1.save()
+        self.asset1.refresh_from_db()
+        search_text = self.asset1.search_text
+        # same value as built in SQL
+        asset_update_search_text(Asset.objects.filter(pk=self.asset1.pk))
+        self.asset1.refresh_from_db()
+        self.assertEqual(self.asset1.search_text, search_text)
+
+        # status is not in search_text, so it is not rebuilt
+        Asset.objects.filter(pk=self.asset1.pk).update(search_text='unchanged')
+        self.asset1.refresh_from_db()
+        self.asset1.snapshot()
+        self.asset1.status = 'used'
+        self.asset1.save()
+        self.asset1.refresh_from_db()
+        self.assertEqual(self.asset1.search_text, 'unchanged')
+
+    def test_normalize_identifier(self):
+        # keys built in python must match those built in database
+        for value in (' Asset1 ', '\tasset1\n', 'ASSET1'):
+            with self.subTest(value=value):
+                self.assertEqual(
+                    normalize_identifier(value),
+                    Asset.objects.annotate(
+                        key=normalized_identifier(Value(value))
+                    ).values_list('key', flat=True)[0],
+                )
+
+
+class TestAssetWarranty(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        today = date.today()
+        # (start, end) relative to today
+        periods = {
+            'none': (None, None),
+            'no_start': (None, 10),
+            'pending': (10, 400),
+            'active': (-100, 200),
+            'expiring': (-300, 29),
+            'expired': (-400, -1),
+            'third': (-29, 71),
+        }
+        for serial, (start, end) in periods.items():
+            Asset.objects.create(
+                serial=serial,
+                status='stored',
+                warranty_start=today + timedelta(days=start) if start else None,
+                warranty_end=today + timedelta(days=end) if end else None,
+            )
+
+    def test_annotations_match_properties(self):
+        for asset in Asset.objects.with_warranty():
+            unannotated = Asset.objects.get(pk=asset.pk)
+            for name in (
+                'warranty_remaining_days',
+                'warranty_progress',
+                'warranty_status',
+            ):
+                self.assertEqual(
+                    getattr(asset, name), getattr(unannotated, name), (asset, name)
+                )
+        self.assertEqual(Asset.objects.get(serial='third').warranty_progress, 29)
+
+    def test_filter_and_order(self):
+        def filter_serials(**params):
+            return set(
+                AssetFilterSet(params, Asset.objects.all()).qs.values_list(
+                    'serial', flat=True
+                )
+            )
+
+        self.assertEqual(
+            filter_serials(warranty_status=['expiring', 'expired']),
+            {'no_start', 'expiring', 'third', 'expired'},
+        )
+        self.assertEqual(
+            filter_serials(warranty_progress__gte=50), {'expiring', 'expired'}
+        )
+        self.assertEqual(
+            list(
+                Asset.objects.with_warranty()
+                .filter(warranty_progress__isnull=False)
+                .order_by('warranty_progress')
+                .values_list('serial', flat=True)
+            ),
+            ['pending', 'third', 'active', 'expiring', 'expired'],
+        )
+
+    def test_date_read_per_query(self):
+        # queryset built once, like queryset attributes of views
+        assets = Asset.objects.with_warranty()
+        self.assertEqual(assets.get(serial='active').warranty_remaining_days, 200)
+
+        class NextMonth(date):
+            @classmethod
+            def today(cls):
+                return date.today() + timedelta(days=30)
+
+        with mock.patch('netbox_inventory.utils.date', NextMonth):
+            self.assertEqual(assets.get(serial='active').warranty_remaining_days, 170)
+            self.assertEqual(assets.get(serial='pending').warranty_status, 'active')
+            self.assertEqual(
+                set(
+                    AssetFilterSet(
+                        {'warranty_status': ['expired']}, assets
+                    ).qs.values_list('serial', flat=True)
+                ),
+                {'no_start', 'expiring', 'expired'},
+            )
@@ -0,0 +1,101 @@
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from dcim.models import Device, DeviceRole, DeviceType, Manufacturer, Site
+from utilities.testing import TestCase
+
+from netbox_inventory.models import Asset, Contract, Supplier
+
+
+class TestDCIMAssetColumns(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.site = Site.objects.create(name='site1', slug='site1')
+        manufacturer = Manufacturer.objects.create(
+            name='manufacturer1', slug='manufacturer1'
+        )
+        cls.device_type = DeviceType.objects.create(
+            manufacturer=manufacturer, model='device_type1', slug='device_type1'
+        )
+        cls.role = DeviceRole.objects.create(name='role1', slug='role1')
+        cls.supplier = Supplier.objects.create(name='supplier1', slug='supplier1')
+
+    def create_device(self, suffix):
+        device = Device.objects.create(
+            name=f'device-{suffix}',
+            site=self.site,
+            device_type=self.device_type,
+            role=self.role,
+        )
+        asset = Asset.objects.create(
+            serial=f'serial-{suffix}',
+            status='used',
+            device_type=self.device_type,
+            device=device,
+        )
+        contract = Contract.objects.create(
+            name=f'contract-{suffix}',
+            supplier=self.supplier,
+            contract_type='support',
+        )
+        asset.contract.add(contract)
+
+    def assertQueryCountConstant(self, url, create_objects):
+        create_objects('1')
+        response = self.client.get(url)
+        self.assertHttpStatus(response, 200)
+        with CaptureQueriesContext(connection) as queries_before:
+            self.assertHttpStatus(self.client.get(url), 200)
+        create_objects('2')
+        create_objects('3')
+        with CaptureQueriesContext(connection) as queries_after:
+            self.assertHttpStatus(self.client.get(url), 200)
+        self.assertEqual(len(queries_after), len(queries_before))
+        return response
+
+    @override_settings(EXEMPT_VIEW_PERMISSIONS=['*'])
+    def test_device_list(self):
+        self.user.config.set(
+            'tables.DeviceTable.columns',
+            [
+                'name',
+                'asset_serial',
+                'asset_status',
+                'asset_warranty_end',
+                'asset_contracts',
+            ],
+            commit=True,
+        )
+        response = self.assertQueryCountConstant(
+            reverse('dcim:device_list'), self.create_device
+        )
+        self.assertContains(response, 'serial-1')
+        self.assertContains(response, 'contract-1')
+
+    @override_settings(EXEMPT_VIEW_PERMISSIONS=['*'])
+    def test_device_type_list(self):
+        self.user.config.set(
+            'tables.DeviceTypeTable.columns', ['model', 'assets'], commit=True
+        )
+
+        def create_device_type(suffix):
+            device_type = DeviceType.objects.create(
+                manufacturer=self.device_type.manufacturer,
+                model=f'device_type-{suffix}',
+                slug=f'device_type-{suffix}',
+            )
+            for i in range(2):
+                Asset.objects.create(
+                    serial=f'serial-{suffix}-{i}',
+                    status='stored',
+                    device_type=device_type,
+                )
+
+        self.assertQueryCountConstant(
+            reverse('dcim:devicetype_list'), create_device_type
+        )
+        response = self.client.get(reverse('dcim:devicetype_list'), {'sort': '-assets'})
+        self.assertHttpStatus(response, 200)
+        self.assertContains(response, f'device_type_id={self.device_type.pk}')
@@ -0,0 +1,70 @@
+from datetime import date
+
+from django.test import TestCase
+
+from dcim.models import Device, DeviceRole, DeviceType, Manufacturer, Site
+from tenancy.models import Tenant
+
+from netbox_inventory.models import Asset, Contract, Purchase, Supplier
+from netbox_inventory.template_content import DeviceAssetInfo
+
+
+class TestAssetInfoExtension(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        site = Site.objects.create(name='site1', slug='site1')
+        manufacturer = Manufacturer.objects.create(
+            name='manufacturer1', slug='manufacturer1'
+        )
+        device_type = DeviceType.objects.create(
+            manufacturer=manufacturer, model='device_type1', slug='device_type1'
+        )
+        role = DeviceRole.objects.create(name='role1', slug='role1')
+        cls.device = Device.objects.create(
+            site=site, device_type=device_type, role=role, name='device1'
+        )
+        cls.device_without_asset = Device.objects.create(
+            site=site, device_type=device_type, role=role, name='device2'
+        )
+        supplier = Supplier.objects.create(name='supplier1', slug='supplier1')
+        asset = Asset.objects.create(
+            serial='asset1',
+            status='used',
+            device_type=device_type,
+            device=cls.device,
+            owner=Tenant.objects.create(name='tenant1', slug='tenant1'),
+            purchase=Purchase.objects.create(
+                name='purchase1', supplier=supplier, status='closed'
+            ),
+        )
+        for i in range(2):
+            contract = Contract.objects.create(
+                name=f'contract{i}',
+                supplier=supplier,
+                contract_type='support',
+                start_date=date(2020, 1, 1),
+                end_date=date(2030, 1, 1),
+            )
+            asset.contract.add(contract)
+
+    def render(self, device):
+        return DeviceAssetInfo({'object': device}).left_page()
+
+    def test_query_count(self):
+        # asset with all related objects, contracts
+        with self.assertNumQueries(2):
+            html = self.render(Device.objects.get(pk=self.device.pk))
+        for text in ('manufacturer1', 'asset1', 'tenant1', 'purchase1', 'contract1'):
+            self.assertIn(text, html)
+
+    def test_cached_accessor(self):
+        device = Device.objects.select_related('assigned_asset').get(
+            pk=self.device_without_asset.pk
+        )
+        with self.assertNumQueries(0):
+            html = self.render(device)
+        self.assertIn('None assigned', html)
+
+        device = Device.objects.select_related('assigned_asset').get(pk=self.device.pk)
+        with self.assertNumQueries(2):
+            self.assertIn('asset1', self.render(device))
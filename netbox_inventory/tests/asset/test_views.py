@@ -1,12 +1,26 @@
+import json
+
+from django.db import connection
 from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
 
-from core.models import ObjectType
-from dcim.models import Device, DeviceRole, DeviceType, Manufacturer, Site
+from core.models import ObjectChange, ObjectType
+from dcim.models import (
+    Device,
+    DeviceRole,
+    DeviceType,
+    Location,
+    Manufacturer,
+    Site,
+)
+from extras.models import Tag
 from users.models import ObjectPermission
 from utilities.testing import ViewTestCases, post_data
 
-from ..settings import CONFIG_ALLOW_CREATE_DEVICE_TYPE
-from netbox_inventory.models import Asset, Delivery, Purchase, Supplier
+from ..settings import CONFIG_ALLOW_CREATE_DEVICE_TYPE, CONFIG_EDIT_PROTECTED
+from netbox_inventory.models import Asset, Contract, Delivery, Purchase, Supplier
+from netbox_inventory.tables import AssetTable
 from netbox_inventory.tests.custom import ModelViewTestCase
 
 
@@ -137,6 +151,109 @@ class AssetTestCase(
         self.assertEqual(len(devices), 1)
         self.assertEqual(devices.first().assigned_asset, asset)
 
+    @override_settings(EXEMPT_VIEW_PERMISSIONS=['*'])
+    def test_list_all_columns_query_count(self):
+        self.user.config.set(
+            'tables.AssetTable.columns', list(AssetTable.Meta.fields), commit=True
+        )
+        site = Site.objects.first()
+        location = Location.objects.create(
+            name='location1', slug='location1', site=site, status='active'
+        )
+        device_type = DeviceType.objects.first()
+
+        def create_assets(suffix):
+            Asset.objects.create(
+                status='stored',
+                serial=f'stored-{suffix}',
+                device_type=device_type,
+                storage_location=location,
+            )
+            device = Device.objects.create(
+                name=f'device-{suffix}',
+                role=DeviceRole.objects.first(),
+                device_type=device_type,
+                site=site,
+                location=location,
+                status='active',
+            )
+            Asset.objects.create(
+                status='used',
+                serial=f'used-{suffix}',
+                device_type=device_type,
+                device=device,
+            )
+
+        url = self._get_url('list')
+        create_assets('1')
+        self.assertHttpStatus(self.client.get(url), 200)
+        with CaptureQueriesContext(connection) as queries_before:
+            self.assertHttpStatus(self.client.get(url), 200)
+        create_assets('2')
+        create_assets('3')
+        with CaptureQueriesContext(connection) as queries_after:
+            self.assertHttpStatus(self.client.get(url), 200)
+        self.assertEqual(len(queries_after), len(queries_before))
+
+    @override_settings(EXEMPT_VIEW_PERMISSIONS=['*'])
+    def test_export_stream(self):
+        Asset.objects.filter(serial='223').update(status='used')
+        asset = Asset.objects.get(serial='223')
+        url = reverse('plugins:netbox_inventory:asset_export')
+
+        response = self.client.get(f'{url}?export_format=csv&status=stored')
+        self.assertHttpStatus(response, 200)
+        lines = b''.join(response.streaming_content).decode().splitlines()
+        self.assertEqual(
+            lines[0].split(',')[:4], ['ID', 'Name', 'Asset Tag', 'Serial Number']
+        )
+        self.assertEqual(len(lines), 3)
+
+        response = self.client.get(f'{url}?export_format=json&serial=223')
+        self.assertHttpStatus(response, 200)
+        rows = json.loads(b''.join(response.streaming_content))
+        self.assertEqual(len(rows), 1)
+        self.assertEqual(rows[0]['id'], asset.pk)
+        self.assertEqual(rows[0]['status'], 'Used')
+        self.assertEqual(rows[0]['kind'], 'Device')
+        self.assertEqual(rows[0]['manufacturer'], 'manufacturer1')
+        self.assertEqual(rows[0]['hardware_type'], 'device_type1')
+        self.assertIsNone(rows[0]['warranty_progress'])
+        self.assertEqual(rows[0]['tags'], [])
+
+        response = self.client.get(f'{url}?export_format=xml')
+        self.assertHttpStatus(response, 400)
+
+    @override_settings(
+        EXEMPT_VIEW_PERMISSIONS=['*'], PLUGINS_CONFIG=CONFIG_EDIT_PROTECTED
+    )
+    def test_bulk_edit_protected_by_tag(self):
+        obj_perm = ObjectPermission(
+            name='test-bulk-edit permission', actions=['change']
+        )
+        obj_perm.save()
+        obj_perm.users.add(self.user)
+        obj_perm.object_types.add(ObjectType.objects.get_for_model(self.model))
+        tag = Tag.objects.create(name='locked', slug='locked')
+        assets = list(Asset.objects.order_by('pk')[:3])
+        assets[0].tags.add(tag)
+        pk_list = [asset.pk for asset in assets]
+
+        # status is protected by tag of first asset, nothing is changed
+        request = {
+            'path': self._get_url('bulk_edit'),
+            'data': post_data({'pk': pk_list, '_apply': True, 'status': 'retired'}),
+        }
+        self.assertHttpStatus(self.client.post(**request), 302)
+        self.assertFalse(Asset.objects.filter(status='retired').exists())
+
+        # description is not protected
+        request['data'] = post_data(
+            {'pk': pk_list, '_apply': True, 'description': 'edited'}
+        )
+        self.assertHttpStatus(self.client.post(**request), 302)
+        self.assertEqual(Asset.objects.filter(description='edited').count(), 3)
+
     @override_settings(PLUGINS_CONFIG=CONFIG_ALLOW_CREATE_DEVICE_TYPE)
     def test_bulk_import_objects_with_permission(self):
         return super().test_bulk_import_objects_with_permission()
@@ -219,6 +336,47 @@ class AssetBulkAddTestCase(
             'device_type': device_type1.pk,
         }
 
+    @override_settings(EXEMPT_VIEW_PERMISSIONS=['*'])
+    def test_bulk_add_tags_contracts(self):
+        obj_perm = ObjectPermission(name='test-bulk-add permission', actions=['add'])
+        obj_perm.save()
+        obj_perm.users.add(self.user)
+        obj_perm.object_types.add(ObjectType.objects.get_for_model(self.model))
+        supplier = Supplier.objects.create(name='Supplier1', slug='supplier1')
+        contract = Contract.objects.create(
+            name='Contract1',
+            supplier=supplier,
+            contract_type='support',
+            status='active',
+            start_date='2025-01-01',
+            end_date='2027-01-01',
+        )
+        tag = Tag.objects.create(name='tag1', slug='tag1')
+
+        request = {
+            'path': self._get_url('add'),
+            'data': post_data(
+                {
+                    **self.bulk_create_data,
+                    'count': 5,
+                    'contract': [contract.pk],
+                    'tags': [tag.pk],
+                }
+            ),
+        }
+        self.assertHttpStatus(self.client.post(**request), 302)
+
+        assets = Asset.objects.filter(tags=tag, contract=contract)
+        self.assertEqual(assets.count(), 5)
+        self.assertEqual(
+            ObjectChange.objects.filter(
+                changed_object_type=ObjectType.objects.get_for_model(Asset),
+                changed_object_id__in=assets.values('pk'),
+                action='create',
+            ).count(),
+            5,
+        )
+
     def _get_url(self, action, instance=None):
         # fix - CreateMultipleObjectsViewTestCase assumes view names contains only 'add' but we need 'bulk_add'
         if action == 'add':
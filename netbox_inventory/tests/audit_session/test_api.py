@@ -0,0 +1,109 @@
+from django.urls import reverse
+from rest_framework import status
+
+from core.models import ObjectType
+from dcim.models import DeviceType, Location, Manufacturer, Site
+from users.models import ObjectPermission
+from utilities.testing import APIViewTestCases, disable_warnings
+
+from ...models import Asset, AuditSession
+from ..custom import APITestCase
+
+
+class AuditSessionTest(
+    APITestCase,
+    APIViewTestCases.GetObjectViewTestCase,
+    APIViewTestCases.ListObjectsViewTestCase,
+    APIViewTestCases.CreateObjectViewTestCase,
+    APIViewTestCases.UpdateObjectViewTestCase,
+    APIViewTestCases.DeleteObjectViewTestCase,
+):
+    model = AuditSession
+    brief_fields = ['description', 'display', 'id', 'name', 'status', 'url']
+
+    bulk_update_data = {
+        'description': 'new description',
+    }
+
+    @classmethod
+    def setUpTestData(cls) -> None:
+        site = Site.objects.create(name='Site 1', slug='site1')
+        cls.location = Location.objects.create(
+            name='Location 1', slug='location1', site=site, status='active'
+        )
+        manufacturer = Manufacturer.objects.create(
+            name='Manufacturer 1', slug='manufacturer1'
+        )
+        device_type = DeviceType.objects.create(
+            model='Device Type 1', slug='devicetype1', manufacturer=manufacturer
+        )
+        for serial in ('asset1', 'asset2'):
+            Asset.objects.create(
+                serial=serial,
+                status='stored',
+                device_type=device_type,
+                storage_location=cls.location,
+            )
+        cls.session = AuditSession.objects.create(
+            name='Audit 1', site=site, storage_location=cls.location
+        )
+        AuditSession.objects.create(name='Audit 2', site=site)
+        AuditSession.objects.create(name='Audit 3', site=site, status='closed')
+        cls.create_data = [
+            {'name': 'Audit 4', 'site': site.pk},
+            {'name': 'Audit 5', 'site': site.pk, 'storage_location': cls.location.pk},
+            {'name': 'Audit 6', 'site': site.pk, 'status': 'closed'},
+        ]
+
+    def add_permission(self, actions):
+        obj_perm = ObjectPermission(name=f'Test {actions}', actions=actions)
+        obj_perm.save()
+        obj_perm.users.add(self.user)
+        obj_perm.object_types.add(ObjectType.objects.get_for_model(self.model))
+        obj_perm.object_types.add(ObjectType.objects.get_for_model(Asset))
+
+    def post_scans(self, session, serials):
+        url = reverse(
+            'plugins-api:netbox_inventory-api:auditsession-scans',
+            kwargs={'pk': session.pk},
+        )
+        return self.client.post(url, {'serials': serials}, format='json', **self.header)
+
+    def get_reconciliation(self, params=None):
+        url = reverse(
+            'plugins-api:netbox_inventory-api:auditsession-reconciliation',
+            kwargs={'pk': self.session.pk},
+        )
+        return self.client.get(url, params or {}, **self.header)
+
+    def test_scans(self):
+        self.add_permission(['view', 'change'])
+        response = self.post_scans(self.session, ['ASSET1', 'unknown1'])
+        self.assertHttpStatus(response, status.HTTP_200_OK)
+        self.assertEqual(response.data, {'received': 2, 'added': 2, 'scan_count': 2})
+        response = self.post_scans(self.session, ['asset1'])
+        self.assertEqual(response.data['added'], 0)
+
+        response = self.get_reconciliation()
+        self.assertHttpStatus(response, status.HTTP_200_OK)
+        self.assertEqual(
+            response.data['results'],
+            {'found': 1, 'missing': 1, 'wrong_location': 0, 'unexpected': 1},
+        )
+        response = self.get_reconciliation({'result': 'missing'})
+        self.assertHttpStatus(response, status.HTTP_200_OK)
+        self.assertEqual(response.data['count'], 1)
+        self.assertEqual(response.data['results'][0]['serial'], 'asset2')
+
+    def test_scans_permissions(self):
+        self.add_permission(['view'])
+        closed = AuditSession.objects.get(status='closed')
+        with disable_warnings('django.request'):
+            response = self.post_scans(self.session, ['asset1'])
+            self.assertHttpStatus(response, status.HTTP_404_NOT_FOUND)
+
+            self.add_permission(['change'])
+            response = self.post_scans(closed, ['asset1'])
+            self.assertHttpStatus(response, status.HTTP_400_BAD_REQUEST)
+            response = self.get_reconciliation({'result': 'invalid'})
+            self.assertHttpStatus(response, status.HTTP_400_BAD_REQUEST)
@@ -0,0 +1,84 @@
+from django.test import TestCase
+
+from dcim.models import DeviceType, Location, Manufacturer, Site
+
+from netbox_inventory.models import Asset, AuditSession
+
+
+class TestAuditSessionReconciliation(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.site = Site.objects.create(name='site1', slug='site1')
+        cls.location1 = Location.objects.create(
+            name='location1', slug='location1', site=cls.site, status='active'
+        )
+        location2 = Location.objects.create(
+            name='location2', slug='location2', site=cls.site, status='active'
+        )
+        manufacturer = Manufacturer.objects.create(
+            name='manufacturer1', slug='manufacturer1'
+        )
+        device_type = DeviceType.objects.create(
+            manufacturer=manufacturer, model='device_type1', slug='device_type1'
+        )
+
+        def create_asset(serial, status='stored', storage_location=cls.location1):
+            return Asset.objects.create(
+                serial=serial,
+                status=status,
+                device_type=device_type,
+                storage_location=storage_location,
+            )
+
+        cls.found = create_asset('FOUND1')
+        cls.missing = create_asset('MISSING1')
+        cls.without_serial = create_asset(None)
+        cls.elsewhere = create_asset('ELSEWHERE1', storage_location=location2)
+        cls.used = create_asset('USED1', status='used')
+
+        cls.session = AuditSession.objects.create(
+            name='audit1', site=cls.site, storage_location=cls.location1
+        )
+        cls.session.add_scans(
+            [' found1 ', 'elsewhere1', 'used1', 'UNKNOWN1', 'Found1', '']
+        )
+
+    def assertResult(self, session, result, expected):
+        self.assertEqual(set(session.get_result(result)), set(expected))
+
+    def test_add_scans(self):
+        self.assertEqual(
+            set(self.session.scans.values_list('serial', flat=True)),
+            {'found1', 'elsewhere1', 'used1', 'UNKNOWN1'},
+        )
+        # batch sent again adds only new serials
+        self.assertEqual(self.session.add_scans(['FOUND1', 'missing1']), 1)
+        self.assertEqual(self.session.scans.count(), 5)
+        # only spaces are stripped, same as from serials of assets in database
+        self.assertEqual(self.session.add_scans(['\tfound1']), 1)
+        self.assertEqual(self.session.scans.count(), 6)
+
+    def test_storage_location(self):
+        self.assertResult(self.session, 'found', [self.found])
+        self.assertResult(self.session, 'missing', [self.missing, self.without_serial])
+        self.assertResult(self.session, 'wrong_location', [self.elsewhere, self.used])
+        self.assertEqual(
+            list(self.session.get_unexpected_scans().values_list('serial', flat=True)),
+            ['UNKNOWN1'],
+        )
+
+    def test_site(self):
+        session = AuditSession.objects.create(name='audit2', site=self.site)
+        session.add_scans(['FOUND1', 'ELSEWHERE1', 'USED1'])
+        self.assertResult(session, 'found', [self.found, self.elsewhere])
+        self.assertResult(session, 'missing', [self.missing, self.without_serial])
+        self.assertResult(session, 'wrong_location', [self.used])
+        self.assertResult(session, 'unexpected', [])
+
+    def test_result_counts_query_count(self):
+        with self.assertNumQueries(4):
+            counts = self.session.get_result_counts()
+        self.assertEqual(
+            counts,
+            {'found': 1, 'missing': 2, 'wrong_location': 2, 'unexpected': 1},
+        )
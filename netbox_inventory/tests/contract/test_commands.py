@@ -0,0 +1,69 @@
+from datetime import date, timedelta
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase
+
+from netbox_inventory.models import Contract, Supplier
+
+
+class TestUpdateContractStatuses(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        supplier = Supplier.objects.create(name='Supplier1', slug='supplier1')
+        today = date.today()
+        past = (today - timedelta(days=20), today - timedelta(days=10))
+        current = (today - timedelta(days=10), today + timedelta(days=10))
+        future = (today + timedelta(days=10), today + timedelta(days=20))
+        # bulk_create skips pre_save receiver, so statuses can be out of date
+        Contract.objects.bulk_create(
+            Contract(
+                name=name,
+                supplier=supplier,
+                contract_type='support',
+                status=status,
+                start_date=dates[0],
+                end_date=dates[1],
+            )
+            for name, status, dates in (
+                ('active_to_expired', 'active', past),
+                ('draft_to_active', 'draft', current),
+                ('expired_to_draft', 'expired', future),
+                ('expired', 'expired', past),
+                ('cancelled', 'cancelled', past),
+            )
+        )
+
+    def _statuses(self):
+        return dict(Contract.objects.values_list('name', 'status'))
+
+    def test_update(self):
+        stdout = StringIO()
+        call_command('update_contract_statuses', stdout=stdout)
+        self.assertEqual(
+            self._statuses(),
+            {
+                'active_to_expired': 'expired',
+                'draft_to_active': 'active',
+                'expired_to_draft': 'draft',
+                'expired': 'expired',
+                'cancelled': 'cancelled',
+            },
+        )
+        self.assertIn('Successfully updated 3 of 4 contracts', stdout.getvalue())
+        self.assertIn('Expired: 2', stdout.getvalue())
+
+    def test_update_matches_model(self):
+        call_command('update_contract_statuses', stdout=StringIO())
+        for contract in Contract.objects.all():
+            self.assertFalse(contract.update_status_based_on_dates())
+
+    def test_dry_run(self):
+        stdout = StringIO()
+        call_command('update_contract_statuses', dry_run=True, stdout=stdout)
+        output = stdout.getvalue()
+        self.assertIn('active → expired', output)
+        self.assertIn('draft → active', output)
+        self.assertIn('expired → draft', output)
+        self.assertIn('DRY RUN: Would update 3 of 4 contracts', output)
+        self.assertEqual(self._statuses()['active_to_expired'], 'active')
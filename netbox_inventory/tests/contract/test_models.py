@@ -0,0 +1,77 @@
+from datetime import date, timedelta
+from unittest import mock
+
+from django.test import TestCase
+
+from netbox_inventory.filtersets import ContractFilterSet
+from netbox_inventory.models import Contract, Supplier
+from netbox_inventory.models.contracts import EXPIRY_ANNOTATIONS
+
+
+class TestContractExpiry(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        supplier = Supplier.objects.create(name='Supplier1', slug='supplier1')
+        today = date.today()
+        dates = (
+            # start, end, renewal
+            (today - timedelta(days=20), today - timedelta(days=10), None),
+            (today - timedelta(days=10), today + timedelta(days=30), today),
+            (today - timedelta(days=1), today + timedelta(days=2), None),
+            (today, today, today + timedelta(days=1)),
+            (today + timedelta(days=10), today + timedelta(days=20), None),
+        )
+        Contract.objects.bulk_create(
+            Contract(
+                name=f'contract{i}',
+                supplier=supplier,
+                contract_type='support',
+                status='active',
+                start_date=start_date,
+                end_date=end_date,
+                renewal_date=renewal_date,
+            )
+            for i, (start_date, end_date, renewal_date) in enumerate(dates)
+        )
+
+    def test_annotations_match_properties(self):
+        for contract in Contract.objects.with_expiry():
+            plain = Contract.objects.get(pk=contract.pk)
+            for name in EXPIRY_ANNOTATIONS:
+                self.assertIn(name, contract.__dict__)
+                self.assertAlmostEqual(
+                    getattr(contract, name),
+                    getattr(plain, name),
+                    msg=f'{contract} {name}',
+                )
+
+    def test_filter_and_order(self):
+        contracts = Contract.objects.with_expiry()
+        self.assertEqual(contracts.filter(is_expired=True).count(), 1)
+        self.assertEqual(contracts.filter(is_active=True).count(), 3)
+        self.assertEqual(contracts.filter(needs_renewal=True).count(), 1)
+        self.assertEqual(
+            list(
+                contracts.order_by('-days_until_expiry', 'name').values_list(
+                    'name', flat=True
+                )
+            ),
+            ['contract1', 'contract4', 'contract2', 'contract0', 'contract3'],
+        )
+
+    def test_date_read_per_query(self):
+        # queryset built once, like queryset attributes of views
+        contracts = Contract.objects.with_expiry()
+        self.assertEqual(contracts.get(name='contract1').days_until_expiry, 30)
+
+        class NextMonth(date):
+            @classmethod
+            def today(cls):
+                return date.today() + timedelta(days=25)
+
+        with mock.patch('netbox_inventory.utils.date', NextMonth):
+            self.assertEqual(contracts.get(name='contract1').days_until_expiry, 5)
+            self.assertEqual(contracts.filter(is_expired=True).count(), 4)
+            self.assertEqual(
+                ContractFilterSet({'is_active': True}, contracts).qs.count(), 1
+            )
@@ -0,0 +1,115 @@
+from django.test import TestCase
+
+from dcim.models import Manufacturer
+
+from netbox_inventory.analyzers import asset_counts_status, asset_counts_type_status
+from netbox_inventory.choices import AssetStatusChoices
+from netbox_inventory.models import Asset, InventoryItemGroup, InventoryItemType
+
+
+class TestAssetCounts(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.manufacturer = Manufacturer.objects.create(
+            name='manufacturer1', slug='manufacturer1'
+        )
+        cls.group = InventoryItemGroup.objects.create(name='group')
+        cls.child_group = InventoryItemGroup.objects.create(
+            name='child group', parent=cls.group
+        )
+        cls.type_a = InventoryItemType.objects.create(
+            manufacturer=cls.manufacturer,
+            model='type_a',
+            slug='type_a',
+            inventoryitem_group=cls.group,
+        )
+        cls.type_b = InventoryItemType.objects.create(
+            manufacturer=cls.manufacturer,
+            model='type_b',
+            slug='type_b',
+            inventoryitem_group=cls.child_group,
+        )
+        # no assets and in child group, should not be listed
+        InventoryItemType.objects.create(
+            manufacturer=cls.manufacturer,
+            model='type_c',
+            slug='type_c',
+            inventoryitem_group=cls.child_group,
+        )
+        cls.type_d = InventoryItemType.objects.create(
+            manufacturer=cls.manufacturer,
+            model='type_d',
+            slug='type_d',
+            inventoryitem_group=cls.group,
+        )
+        Asset.objects.bulk_create(
+            [
+                Asset(inventoryitem_type=cls.type_a, status='stored'),
+                Asset(inventoryitem_type=cls.type_a, status='stored'),
+                Asset(inventoryitem_type=cls.type_a, status='used'),
+                Asset(inventoryitem_type=cls.type_b, status='retired'),
+            ]
+        )
+
+    def test_asset_counts_type_status(self):
+        statuses = AssetStatusChoices.values()
+        counts = asset_counts_type_status(self.group)
+
+        self.assertEqual(counts['total'], 4)
+        self.assertEqual([s['value'] for s in counts['statuses']], statuses)
+        self.assertEqual(
+            [row['inventoryitem_type'] for row in counts['rows']],
+            [self.type_a.pk, self.type_b.pk, self.type_d.pk],
+        )
+        expected = {
+            self.type_a.pk: {'stored': 2, 'used': 1},
+            self.type_b.pk: {'retired': 1},
+            self.type_d.pk: {},
+        }
+        for row in counts['rows']:
+            self.assertEqual(
+                [(status['value'], count) for status, count in row['status_list']],
+                [(s, expected[row['inventoryitem_type']].get(s, 0)) for s in statuses],
+            )
+
+        status_counts = asset_counts_status(counts)
+        self.assertEqual(status_counts['stored']['count'], 2)
+        self.assertEqual(status_counts['used']['count'], 1)
+        self.assertEqual(status_counts['retired']['count'], 1)
+
+    def test_asset_counts_type_status_filtered(self):
+        assets = Asset.objects.filter(status='stored')
+        counts = asset_counts_type_status(self.group, assets)
+        self.assertEqual(counts['total'], 2)
+        self.assertEqual(
+            [row['inventoryitem_type'] for row in counts['rows']],
+            [self.type_a.pk, self.type_d.pk],
+        )
+
+    def test_asset_counts_type_status_many_types(self):
+        """
+        Number of queries does not grow with number of inventoryitem types.
+        """
+        types = InventoryItemType.objects.bulk_create(
+            [
+                InventoryItemType(
+                    manufacturer=self.manufacturer,
+                    model=f'sfp_{i}',
+                    slug=f'sfp_{i}',
+                    inventoryitem_group=self.group,
+                )
+                for i in range(5000)
+            ]
+        )
+        Asset.objects.bulk_create(
+            [
+                Asset(inventoryitem_type=iit, status=status)
+                for iit in types[::5]
+                for status in ('stored', 'used')
+            ]
+        )
+        # one grouped query for counts and one for types
+        with self.assertNumQueries(2):
+            counts = asset_counts_type_status(self.group)
+        self.assertEqual(len(counts['rows']), 5003)
+        self.assertEqual(counts['total'], 4 + 2000)
@@ -0,0 +1,101 @@
+from django.test import TestCase
+
+from dcim.models import Manufacturer
+
+from netbox_inventory.counters import rebuild_inventoryitem_group_counts
+from netbox_inventory.models import Asset, InventoryItemGroup, InventoryItemType
+
+
+class TestInventoryItemGroupCounts(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.root = InventoryItemGroup.objects.create(name='root')
+        cls.child = InventoryItemGroup.objects.create(name='child', parent=cls.root)
+        cls.grandchild = InventoryItemGroup.objects.create(
+            name='grandchild', parent=cls.child
+        )
+        cls.other = InventoryItemGroup.objects.create(name='other')
+        manufacturer = Manufacturer.objects.create(
+            name='manufacturer1', slug='manufacturer1'
+        )
+        cls.type_child = InventoryItemType.objects.create(
+            model='type1',
+            slug='type1',
+            manufacturer=manufacturer,
+            inventoryitem_group=cls.child,
+        )
+        cls.type_grandchild = InventoryItemType.objects.create(
+            model='type2',
+            slug='type2',
+            manufacturer=manufacturer,
+            inventoryitem_group=cls.grandchild,
+        )
+        for i in range(2):
+            Asset.objects.create(
+                serial=f'child{i}',
+                status='stored',
+                inventoryitem_type=cls.type_child,
+            )
+        Asset.objects.create(
+            serial='grandchild',
+            status='stored',
+            inventoryitem_type=cls.type_grandchild,
+        )
+
+    def assertCounts(self, group, assets, types, direct_assets, direct_types):
+        group.refresh_from_db()
+        self.assertEqual(
+            (
+                group.asset_count,
+                group.inventoryitem_type_count,
+                group.direct_asset_count,
+                group.direct_inventoryitem_type_count,
+            ),
+            (assets, types, direct_assets, direct_types),
+        )
+        # stored counts match counts calculated from scratch
+        self.assertEqual(rebuild_inventoryitem_group_counts(), 0)
+
+    def test_create(self):
+        self.assertCounts(self.root, 3, 2, 0, 0)
+        self.assertCounts(self.child, 3, 2, 2, 1)
+        self.assertCounts(self.grandchild, 1, 1, 1, 1)
+        self.assertCounts(self.other, 0, 0, 0, 0)
+
+    def test_asset_change_type_and_delete(self):
+        asset = Asset.objects.get(serial='child0')
+        asset.inventoryitem_type = self.type_grandchild
+        asset.save()
+        self.assertCounts(self.child, 3, 2, 1, 1)
+        self.assertCounts(self.grandchild, 2, 1, 2, 1)
+
+        asset.delete()
+        self.assertCounts(self.root, 2, 2, 0, 0)
+        self.assertCounts(self.grandchild, 1, 1, 1, 1)
+
+    def test_type_change_group(self):
+        self.type_grandchild.inventoryitem_group = self.other
+        self.type_grandchild.save()
+        self.assertCounts(self.root, 2, 1, 0, 0)
+        self.assertCounts(self.grandchild, 0, 0, 0, 0)
+        self.assertCounts(self.other, 1, 1, 1, 1)
+
+        self.type_grandchild.inventoryitem_group = None
+        self.type_grandchild.save()
+        self.assertCounts(self.other, 0, 0, 0, 0)
+
+    def test_group_move_and_delete(self):
+        self.grandchild.parent = self.other
+        self.grandchild.save()
+        self.assertCounts(self.root, 2, 1, 0, 0)
+        self.assertCounts(self.child, 2, 1, 2, 1)
+        self.assertCounts(self.other, 1, 1, 0, 0)
+
+        Asset.objects.filter(inventoryitem_type=self.type_child).delete()
+        self.child.delete()
+        self.assertCounts(self.root, 0, 0, 0, 0)
+
+    def test_rebuild(self):
+        InventoryItemGroup.objects.update(asset_count=0, direct_asset_count=5)
+        self.assertEqual(rebuild_inventoryitem_group_counts(), 4)
+        self.assertCounts(self.root, 3, 2, 0, 0)
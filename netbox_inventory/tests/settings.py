@@ -15,3 +15,18 @@ CONFIG_SYNC_ON['netbox_inventory']['sync_hardware_serial_asset_tag'] = True
 
 CONFIG_SYNC_OFF = deepcopy(settings.PLUGINS_CONFIG)
 CONFIG_SYNC_OFF['netbox_inventory']['sync_hardware_serial_asset_tag'] = False
+
+CONFIG_EDIT_PROTECTED = deepcopy(settings.PLUGINS_CONFIG)
+CONFIG_EDIT_PROTECTED['netbox_inventory']['asset_disable_editing_fields_for_tags'] = {
+    'locked': ['status', 'serial'],
+}
+
+CONFIG_INSTRUMENTATION_ON = deepcopy(settings.PLUGINS_CONFIG)
+CONFIG_INSTRUMENTATION_ON['netbox_inventory']['instrumentation'] = True
+
+CONFIG_BACKGROUND_JOBS = deepcopy(settings.PLUGINS_CONFIG)
+CONFIG_BACKGROUND_JOBS['netbox_inventory']['background_job_threshold'] = 1
+CONFIG_BACKGROUND_JOBS['netbox_inventory']['background_job_chunk_size'] = 2
+
+CONFIG_ASSET_COUNTS_CACHE = deepcopy(settings.PLUGINS_CONFIG)
+CONFIG_ASSET_COUNTS_CACHE['netbox_inventory']['asset_counts_cache_timeout'] = 60
@@ -0,0 +1,64 @@
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from prometheus_client import REGISTRY
+
+from dcim.models import Site
+from netbox.plugins import PluginTemplateExtension
+
+from .settings import CONFIG_INSTRUMENTATION_ON
+from netbox_inventory.instrumentation import instrument_template_extensions
+from netbox_inventory.tests.custom import APITestCase
+
+
+def get_sample(metric, kind, name):
+    return REGISTRY.get_sample_value(metric, {'kind': kind, 'name': name}) or 0
+
+
+class InstrumentationAPITestCase(APITestCase):
+    def get_asset_list(self):
+        url = reverse('plugins-api:netbox_inventory-api:asset-list')
+        before = get_sample(
+            'netbox_inventory_queries_count', 'api', 'AssetViewSet.list'
+        )
+        self.client.get(url, **self.header)
+        after = get_sample('netbox_inventory_queries_count', 'api', 'AssetViewSet.list')
+        return after - before
+
+    @override_settings(
+        PLUGINS_CONFIG=CONFIG_INSTRUMENTATION_ON, EXEMPT_VIEW_PERMISSIONS=['*']
+    )
+    def test_api_action_recorded(self):
+        self.assertEqual(self.get_asset_list(), 1)
+
+    @override_settings(EXEMPT_VIEW_PERMISSIONS=['*'])
+    def test_disabled(self):
+        self.assertEqual(self.get_asset_list(), 0)
+
+
+class InstrumentationTemplateExtensionTestCase(TestCase):
+    @override_settings(PLUGINS_CONFIG=CONFIG_INSTRUMENTATION_ON)
+    def test_template_extension_recorded(self):
+        class SiteExtension(PluginTemplateExtension):
+            def left_page(self):
+                return str(Site.objects.count())
+
+        class InheritedExtension(SiteExtension):
+            pass
+
+        instrument_template_extensions([SiteExtension, InheritedExtension])
+        SiteExtension({}).left_page()
+        InheritedExtension({}).left_page()
+
+        for name in ('SiteExtension.left_page', 'InheritedExtension.left_page'):
+            self.assertEqual(
+                get_sample('netbox_inventory_queries_sum', 'template_extension', name),
+                1,
+            )
+        self.assertEqual(
+            get_sample(
+                'netbox_inventory_queries_count',
+                'template_extension',
+                'SiteExtension.right_page',
+            ),
+            0,
+        )
@@ -113,4 +113,24 @@ urlpatterns = (
         'deliveries/<int:pk>/',
         include(get_model_urls('netbox_inventory', 'delivery')),
     ),
+    # Audit sessions
+    path(
+        'audit-sessions/',
+        include(get_model_urls('netbox_inventory', 'auditsession', detail=False)),
+    ),
+    path(
+        'audit-sessions/<int:pk>/',
+        include(get_model_urls('netbox_inventory', 'auditsession')),
+    ),
+    # Background jobs
+    path(
+        'bulk-jobs/<int:pk>/',
+        views.BulkJobView.as_view(),
+        name='bulk_job',
+    ),
+    path(
+        'bulk-jobs/<int:pk>/resume/',
+        views.BulkJobResumeView.as_view(),
+        name='bulk_job_resume',
+    ),
 )
@@ -1,28 +1,117 @@
+import json
+from datetime import date, timedelta
+from functools import lru_cache
+
+from django.core.cache import cache
 from django.core.exceptions import ImproperlyConfigured
-from django.db.models import Q
-from django.db.models.signals import pre_save
+from django.db.models import (
+    DateField,
+    Expression,
+    Func,
+    IntegerField,
+    OuterRef,
+    Q,
+    Subquery,
+    TextField,
+    Value,
+)
+from django.db.models.fields.json import KT
+from django.db.models.functions import Coalesce, Concat, Lower
 
-from dcim.models import Device, InventoryItem, Module, Rack
 from netbox.plugins import get_plugin_config
 
 from .choices import AssetStatusChoices
+from .sync import get_hardware_sync_values
+
+
+class DateDiff(Func):
+    """
+    Number of days between two dates (PostgreSQL date subtraction).
+    """
+
+    arg_joiner = ' - '
+    template = '(%(expressions)s)'
+    output_field = IntegerField()
+
+
+class Today(Expression):
+    """
+    Today's date shifted by days, read when query is compiled rather than
+    when queryset is built. Querysets built once (e.g. queryset attributes of
+    views) keep following the current date after midnight.
+    """
+
+    output_field = DateField()
+
+    def __init__(self, days=0):
+        super().__init__()
+        self.days = days
+
+    def as_sql(self, compiler, connection):
+        value = Value(date.today() + timedelta(days=self.days), self.output_field)
+        return value.as_sql(compiler, connection)
+
+
+def get_today_expression(today=None, days=0):
+    """
+    Return expression of given date (or today, if None) shifted by days.
+    """
+    if today is None:
+        return Today(days)
+    return Value(today + timedelta(days=days), output_field=DateField())
+
+
+# counters of how prechange relations were resolved by get_prechange_field
+prechange_field_stats = {'hits': 0, 'misses': 0}
 
 
 def get_prechange_field(obj, field_name):
     """Get value from obj._prechange_snapshot. If field is a relation,
     return object instance.
+
+    Related objects are resolved at most once per snapshot. If relation
+    did not change and related object is already loaded on obj, that object
+    is returned without a query. Otherwise it is fetched and remembered on obj
+    until clear_prechange_cache(obj) is called.
     """
     value = getattr(obj, '_prechange_snapshot', {}).get(field_name)
     if value is None:
         return None
     field = obj._meta.get_field(field_name)
-    if field.is_relation:
-        rel_obj = field.related_model.objects.filter(pk=value).first()
-        if rel_obj:
-            return rel_obj
-        else:
-            return None
-    return value
+    if not field.is_relation:
+        return value
+    if field.is_cached(obj) and getattr(obj, field.attname) == value:
+        prechange_field_stats['hits'] += 1
+        return getattr(obj, field_name)
+    if not hasattr(obj, '_prechange_objects'):
+        obj._prechange_objects = {}
+    key = (field_name, value)
+    if key in obj._prechange_objects:
+        prechange_field_stats['hits'] += 1
+    else:
+        prechange_field_stats['misses'] += 1
+        obj._prechange_objects[key] = field.related_model.objects.filter(
+            pk=value
+        ).first()
+    return obj._prechange_objects[key]
+
+
+def clear_prechange_cache(obj):
+    """Forget related objects resolved by get_prechange_field for obj."""
+    obj.__dict__.pop('_prechange_objects', None)
+
+
+def get_prechange_field_stats():
+    """
+    Return dict with number of hits (no query needed) and misses (related
+    object fetched from DB) of get_prechange_field since last reset.
+    """
+    return dict(prechange_field_stats)
+
+
+def reset_prechange_field_stats():
+    prechange_field_stats['hits'] = 0
+    prechange_field_stats['misses'] = 0
 
 
 def get_plugin_setting(setting_name):
@@ -86,21 +175,52 @@ def get_tags_and_edit_protected_asset_fields():
     return get_plugin_setting('asset_disable_editing_fields_for_tags')
 
 
-def asset_clear_old_hw(old_hw):
-    # need to temporarily disconnect signal receiver that prevents update of device serial if asset assigned
-    from .signals import prevent_update_serial_asset_tag
+def get_edit_protected_fields_by_tag():
+    """Return asset_disable_editing_fields_for_tags compiled to a lookup
+    structure of tag slugs and frozensets of protected field names.
+
+    Compiled structure is cached for each distinct configuration, so it is
+    only built once.
+
+    Returns:
+        dict: dict of tag slug strings and frozensets of field names
+    """
+    config = get_tags_and_edit_protected_asset_fields() or {}
+    return _compile_edit_protected_fields(
+        tuple((tag, tuple(fields)) for tag, fields in config.items())
+    )
+
 
-    pre_save.disconnect(prevent_update_serial_asset_tag, sender=Device)
-    pre_save.disconnect(prevent_update_serial_asset_tag, sender=Module)
-    pre_save.disconnect(prevent_update_serial_asset_tag, sender=InventoryItem)
-    pre_save.disconnect(prevent_update_serial_asset_tag, sender=Rack)
+@lru_cache(maxsize=8)
+def _compile_edit_protected_fields(config):
+    return {tag: frozenset(fields) for tag, fields in config}
+
+
+def get_edit_protected_tags(fields):
+    """Return dict of tag slugs that protect any of fields from editing and
+    which of those fields each tag protects.
+
+    Returns:
+        dict: dict of tag slug strings and sets of field names
+    """
+    fields = set(fields)
+    return {
+        tag: fields & protected_fields
+        for tag, protected_fields in get_edit_protected_fields_by_tag().items()
+        if fields & protected_fields
+    }
+
+
+def asset_clear_old_hw(old_hw):
+    # mark hardware so receiver that prevents update of device serial if asset
+    # assigned lets this change through
+    old_hw._in_asset_sync = True
     old_hw.serial = ''
     old_hw.asset_tag = None
-    old_hw.save()
-    pre_save.connect(prevent_update_serial_asset_tag, sender=Device)
-    pre_save.connect(prevent_update_serial_asset_tag, sender=Module)
-    pre_save.connect(prevent_update_serial_asset_tag, sender=InventoryItem)
-    pre_save.connect(prevent_update_serial_asset_tag, sender=Rack)
+    try:
+        old_hw.save()
+    finally:
+        del old_hw._in_asset_sync
 
 
 def asset_set_new_hw(asset, hw):
@@ -109,32 +229,10 @@ def asset_set_new_hw(asset, hw):
     sync some field values from asset to hardware
     Validation if asset can be assigned to hw should be done before calling this function.
     """
-    # device, module... needs None for blank asset_tag to enforce uniqness at DB level
-    new_asset_tag = asset.asset_tag or None
-    # device, module... does not allow serial to be null
-    new_serial = asset.serial or ''
     hw_save = False
-    if hw.serial != new_serial:
-        hw.serial = new_serial
-        hw_save = True
-    if hw.asset_tag != new_asset_tag:
-        hw.asset_tag = new_asset_tag
-        hw_save = True
-    # handle changing of model (<kind>_type)
-    if asset.kind in ['device', 'module', 'rack']:
-        asset_type = getattr(asset, asset.kind + '_type')
-        hw_type = getattr(hw, asset.kind + '_type')
-        if asset_type != hw_type:
-            setattr(hw, asset.kind + '_type', asset_type)
-            hw_save = True
-    # for inventory items also set manufacturer and part_number
-    if asset.inventoryitem_type:
-        if hw.manufacturer != asset.inventoryitem_type.manufacturer:
-            hw.manufacturer = asset.inventoryitem_type.manufacturer
-            hw_save = True
-        part_id = asset.inventoryitem_type.part_number
-        if hw.part_id != part_id:
-            hw.part_id = part_id
+    for attname, value in get_hardware_sync_values(asset).items():
+        if getattr(hw, attname) != value:
+            setattr(hw, attname, value)
             hw_save = True
     if hw_save:
         hw.save()
@@ -147,26 +245,12 @@ def is_equal_none(a, b):
     return a == b
 
 
-def query_located(queryset, field_name, values, assets_shown='all'):
+def get_located_q(field_name, values, assets_shown='all'):
     """
-    Filters queryset on located values. Can filter for installed
-    location/site and/or stored location/site for assets makred as stored.
-    Args:
-        * queryset - queryset of Asset model
-        * field_name - 'site' or 'location' or 'rack'
-        * values - list of PKs of location types to filter on
-        * assets_shown - 'all' or 'installed' or 'stored'
+    Returns Q() that filters assets on located values. See query_located
+    for description of arguments.
     """
-    if field_name == 'rack':
-        q_installed = Q(**{'rack__in': values})
-    else:
-        q_installed = Q(**{f'rack__{field_name}__in': values})
-    q_installed = (
-        q_installed
-        | Q(**{f'device__{field_name}__in': values})
-        | Q(**{f'module__device__{field_name}__in': values})
-        | Q(**{f'inventoryitem__device__{field_name}__in': values})
-    )
+    q_installed = Q(**{f'installed_{field_name}__in': values})
 
     # Q expressions for stored
     if field_name == 'rack':
@@ -190,22 +274,228 @@ def query_located(queryset, field_name, values, assets_shown='all'):
         q = q_stored
     else:
         raise Exception('unsupported')
-    return queryset.filter(q)
+    return q
+
+
+def query_located(queryset, field_name, values, assets_shown='all'):
+    """
+    Filters queryset on located values. Can filter for installed
+    location/site and/or stored location/site for assets makred as stored.
+    Args:
+        * queryset - queryset of Asset model
+        * field_name - 'site' or 'location' or 'rack', optionally followed by
+          a lookup on that model (e.g. 'site__slug')
+        * values - list of PKs of location types to filter on
+        * assets_shown - 'all' or 'installed' or 'stored'
+    """
+    return queryset.filter(get_located_q(field_name, values, assets_shown))
+
+
+# for each hardware kind, path from hardware to values stored in
+# Asset.installed_* fields
+INSTALLED_FIELD_PATHS = {
+    'device': {
+        'installed_device': 'pk',
+        'installed_site': 'site',
+        'installed_location': 'location',
+        'installed_rack': 'rack',
+    },
+    'module': {
+        'installed_device': 'device',
+        'installed_site': 'device__site',
+        'installed_location': 'device__location',
+        'installed_rack': 'device__rack',
+    },
+    'inventoryitem': {
+        'installed_device': 'device',
+        'installed_site': 'device__site',
+        'installed_location': 'device__location',
+        'installed_rack': 'device__rack',
+    },
+    'rack': {
+        'installed_device': None,
+        'installed_site': 'site',
+        'installed_location': 'location',
+        'installed_rack': 'pk',
+    },
+}
+
+
+def asset_update_installed(assets):
+    """
+    Recalculate installed_site, installed_location, installed_rack and
+    installed_device for all assets in queryset. Uses one UPDATE statement
+    per hardware kind instead of saving each asset.
+    Returns number of updated assets.
+    """
+    updated = 0
+    for kind, paths in INSTALLED_FIELD_PATHS.items():
+        hw_model = assets.model._meta.get_field(kind).related_model
+        values = {}
+        for field_name, path in paths.items():
+            if path is None:
+                values[field_name] = None
+            else:
+                values[field_name] = Subquery(
+                    hw_model.objects.filter(pk=OuterRef(kind)).values(path)[:1]
+                )
+        updated += assets.filter(**{f'{kind}__isnull': False}).update(**values)
+    updated += assets.filter(
+        device__isnull=True,
+        module__isnull=True,
+        inventoryitem__isnull=True,
+        rack__isnull=True,
+    ).update(**dict.fromkeys(INSTALLED_FIELD_PATHS['rack']))
+    if updated:
+        clear_cached_asset_counts()
+    return updated
+
+
+# Asset fields and (lookup from asset to related object, field of related
+# object) whose values are stored in Asset.search_text
+SEARCH_TEXT_FIELDS = ('serial', 'name', 'asset_tag', 'description')
+SEARCH_TEXT_RELATED_FIELDS = (
+    ('device_type', 'model'),
+    ('module_type', 'model'),
+    ('inventoryitem_type', 'model'),
+    ('rack_type', 'model'),
+    ('device', 'name'),
+    ('inventoryitem', 'name'),
+    ('rack', 'name'),
+    ('delivery', 'name'),
+    ('purchase', 'name'),
+    ('purchase__supplier', 'name'),
+    ('tenant', 'name'),
+    ('owner', 'name'),
+)
+
+
+def get_search_text_expression(model):
+    """
+    Return expression that builds Asset.search_text from asset fields, names
+    of related objects (each read with a subquery, so expression can be used
+    in UPDATE) and values of custom fields listed in
+    ``asset_custom_fields_search_filters``. Values are separated by newlines
+    and lowercased, so search can match them case-sensitively.
+    """
+    values = list(SEARCH_TEXT_FIELDS)
+    for lookup, field_name in SEARCH_TEXT_RELATED_FIELDS:
+        fk_name, *path = lookup.split('__')
+        related_model = model._meta.get_field(fk_name).related_model
+        values.append(
+            Subquery(
+                related_model.objects.filter(pk=OuterRef(fk_name)).values(
+                    '__'.join([*path, field_name])
+                )[:1]
+            )
+        )
+    for field_name in get_plugin_setting('asset_custom_fields_search_filters'):
+        values.append(KT(f'custom_field_data__{field_name}'))
+    parts = []
+    for value in values:
+        if parts:
+            parts.append(Value('\n'))
+        parts.append(Coalesce(value, Value(''), output_field=TextField()))
+    return Lower(Concat(*parts, output_field=TextField()))
+
+
+def get_search_text(asset):
+    """
+    Return search_text of asset built in Python, same value as
+    get_search_text_expression() builds in SQL. Related objects that are not
+    loaded on asset yet are fetched.
+    """
+    values = [getattr(asset, field_name) for field_name in SEARCH_TEXT_FIELDS]
+    for lookup, field_name in SEARCH_TEXT_RELATED_FIELDS:
+        obj = asset
+        for fk_name in lookup.split('__'):
+            obj = getattr(obj, fk_name) if obj is not None else None
+        values.append(getattr(obj, field_name) if obj is not None else None)
+    for field_name in get_plugin_setting('asset_custom_fields_search_filters'):
+        value = asset.custom_field_data.get(field_name)
+        if value is not None and not isinstance(value, str):
+            # same text as PostgreSQL returns for non-string jsonb values
+            value = json.dumps(value)
+        values.append(value)
+    return '\n'.join('' if value is None else str(value) for value in values).lower()
+
+
+def search_text_changed(asset):
+    """
+    Return True if any value stored in search_text of asset could have changed
+    since its prechange snapshot was taken, or if there is no snapshot.
+    """
+    snapshot = getattr(asset, '_prechange_snapshot', None)
+    if asset._state.adding or not snapshot:
+        return True
+    for field_name in SEARCH_TEXT_FIELDS:
+        if snapshot.get(field_name) != getattr(asset, field_name):
+            return True
+    for lookup, _ in SEARCH_TEXT_RELATED_FIELDS:
+        fk_name = lookup.split('__')[0]
+        if snapshot.get(fk_name) != getattr(asset, f'{fk_name}_id'):
+            return True
+    custom_fields = snapshot.get('custom_fields') or {}
+    return any(
+        custom_fields.get(field_name) != asset.custom_field_data.get(field_name)
+        for field_name in get_plugin_setting('asset_custom_fields_search_filters')
+    )
 
 
-def get_asset_custom_fields_search_filters():
-    """Returns a list of custom field filter strings that can be used in Q() filter.
+def get_search_text_sources(model):
+    """
+    Return dict of models whose fields are stored in Asset.search_text and
+    list of (lookup from asset, field name) for each of them.
+    """
+    sources = {}
+    for lookup, field_name in SEARCH_TEXT_RELATED_FIELDS:
+        related_model = model
+        for fk_name in lookup.split('__'):
+            related_model = related_model._meta.get_field(fk_name).related_model
+        sources.setdefault(related_model, []).append((lookup, field_name))
+    return sources
 
-    Custom fields and filters are used is defined in the plugin configuration,
-    under the key ``asset_custom_fields_search_filters``.
 
-    Returns:
-        list: list of custom field filter strings
+def asset_update_search_text(assets):
     """
-    custom_fields_filters = get_plugin_setting('asset_custom_fields_search_filters')
+    Rebuild search_text of all assets in queryset with one UPDATE statement.
+    Returns number of updated assets.
+    """
+    return assets.update(search_text=get_search_text_expression(assets.model))
+
+
+ASSET_COUNTS_CACHE_VERSION_KEY = 'netbox_inventory_asset_counts_version'
+
+
+def get_cached_asset_counts(cache_key, get_counts):
+    """
+    Return asset counts shown in panels on other objects' pages. If
+    ``asset_counts_cache_timeout`` setting is set, counts are cached for that
+    many seconds, else ``get_counts`` is called every time.
+
+    Args:
+        * cache_key - key unique for panel, object and user
+        * get_counts - callable returning counts
+    """
+    timeout = get_plugin_setting('asset_counts_cache_timeout')
+    if not timeout:
+        return get_counts()
+    # all cached counts are invalidated by bumping version on asset changes
+    version = cache.get_or_set(ASSET_COUNTS_CACHE_VERSION_KEY, 1, None)
+    return cache.get_or_set(
+        f'netbox_inventory_asset_counts_{cache_key}',
+        get_counts,
+        timeout,
+        version=version,
+    )
+
 
-    fields = []
-    for field_name, filters in custom_fields_filters.items():
-        for filter in filters:
-            fields.append(f'custom_field_data__{field_name}__{filter}')
-    return fields
+def clear_cached_asset_counts():
+    """Invalidate all asset counts cached by get_cached_asset_counts."""
+    if not get_plugin_setting('asset_counts_cache_timeout'):
+        return
+    try:
+        cache.incr(ASSET_COUNTS_CACHE_VERSION_KEY)
+    except ValueError:
+        # version not set yet, so there is nothing cached
+        pass
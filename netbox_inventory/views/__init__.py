@@ -2,9 +2,11 @@ from .asset import *
 from .asset_assign import *
 from .asset_create import *
 from .asset_reassign import *
+from .audit import *
 from .contract import *
 from .delivery import *
 from .inventoryitem_group import *
 from .inventoryitem_type import *
+from .job import *
 from .purchase import *
 from .supplier import *
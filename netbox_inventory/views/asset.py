@@ -1,24 +1,40 @@
 import logging
 
 from django.contrib import messages
+from django.contrib.postgres.aggregates import ArrayAgg
+from django.core.exceptions import ValidationError
 from django.db import IntegrityError
+from django.http import HttpResponseBadRequest, StreamingHttpResponse
 from django.shortcuts import redirect
-from django.template import Template
+from django.views.generic import View
 
 from netbox.views import generic
 from utilities.forms import ConfirmationForm, restrict_form_fields
-from utilities.views import register_model_view
-
-from .. import filtersets, forms, models, tables
-from ..template_content import WARRANTY_PROGRESSBAR
+from utilities.forms.bulk_import import BulkImportForm
+from utilities.permissions import get_permission_for_model
+from utilities.views import ObjectPermissionRequiredMixin, register_model_view
+
+from .. import export, filtersets, forms, models, tables
+from ..importer import AssetImporter, bulk_create_assets
+from ..jobs import (
+    AssetBulkDeleteJob,
+    AssetBulkEditJob,
+    AssetBulkImportJob,
+    run_in_background,
+)
+from ..sync import deferred_hardware_sync
 from ..utils import (
-    get_tags_and_edit_protected_asset_fields,
+    clear_cached_asset_counts,
+    get_edit_protected_tags,
+    get_plugin_setting,
     get_tags_that_protect_asset_from_deletion,
 )
+from .job import enqueue_background_job
 
 __all__ = (
     'AssetView',
     'AssetListView',
+    'AssetExportView',
     'AssetBulkCreateView',
     'AssetEditView',
     'AssetDeleteView',
@@ -30,34 +46,52 @@ __all__ = (
 
 @register_model_view(models.Asset)
 class AssetView(generic.ObjectView):
-    queryset = models.Asset.objects.all()
-
-    def get_extra_context(self, request, instance):
-        context = super().get_extra_context(request, instance)
-        context['warranty_progressbar'] = Template(WARRANTY_PROGRESSBAR)
-        return context
+    queryset = models.Asset.objects.with_warranty()
 
 
 @register_model_view(models.Asset, 'list', path='', detail=False)
 class AssetListView(generic.ObjectListView):
-    queryset = models.Asset.objects.prefetch_related(
-        'device_type__manufacturer',
-        'module_type__manufacturer',
-        'inventoryitem_type__manufacturer',
-        'rack_type__manufacturer',
-        'device__role',
-        'module__module_bay',
-        'module__module_type',
-        'inventoryitem__role',
-        'rack__role',
-        'owner',
-        'purchase__supplier',
-        'delivery',
-        'storage_location',
-    )
+    # related objects are selected by table for visible columns only
+    queryset = models.Asset.objects.all()
     table = tables.AssetTable
     filterset = filtersets.AssetFilterSet
     filterset_form = forms.AssetFilterForm
+    template_name = 'netbox_inventory/asset_list.html'
+
+
+@register_model_view(models.Asset, 'export', path='export', detail=False)
+class AssetExportView(ObjectPermissionRequiredMixin, View):
+    """
+    Stream assets matching list filters as CSV or JSON. Rows are read with a
+    server-side cursor and are not rendered through AssetTable, so memory use
+    does not grow with number of exported assets.
+    """
+
+    queryset = models.Asset.objects.all()
+    filterset = filtersets.AssetFilterSet
+    formats = {
+        'csv': (export.stream_csv, 'text/csv'),
+        'json': (export.stream_json, 'application/json'),
+    }
+    chunk_size = 2000
+
+    def get_required_permission(self):
+        return get_permission_for_model(self.queryset.model, 'view')
+
+    def get(self, request):
+        export_format = request.GET.get('export_format', 'csv')
+        if export_format not in self.formats:
+            return HttpResponseBadRequest(f'Unsupported export format: {export_format}')
+        stream, content_type = self.formats[export_format]
+        queryset = self.filterset(request.GET, self.queryset).qs
+        response = StreamingHttpResponse(
+            stream(queryset, chunk_size=self.chunk_size),
+            content_type=content_type,
+        )
+        response['Content-Disposition'] = (
+            f'attachment; filename="netbox_assets.{export_format}"'
+        )
+        return response
 
 
 @register_model_view(models.Asset, 'bulk_add', path='bulk-add', detail=False)
@@ -69,22 +103,30 @@ class AssetBulkCreateView(generic.BulkCreateView):
     template_name = 'netbox_inventory/asset_bulk_add.html'
 
     def _create_objects(self, form, request):
+        # All assets are the same, so the model form is validated only once. Use
+        # a mutable copy of the POST QueryDict so that we can remove count.
+        model_form = self.model_form(request.POST.copy())
+        del model_form.data['count']
+        if not model_form.is_valid():
+            # Raise an IntegrityError to abort the transaction.
+            raise IntegrityError()
+
+        instance = model_form.instance
+        values = {
+            field.attname: getattr(instance, field.attname)
+            for field in models.Asset._meta.concrete_fields
+            if not field.primary_key
+        }
+        tags = list(model_form.cleaned_data.get('tags') or [])
+        contracts = list(model_form.cleaned_data.get('contract') or [])
         new_objects = []
         for _ in range(form.cleaned_data['count']):
-            # Reinstantiate the model form each time to avoid overwriting the same instance. Use a mutable
-            # copy of the POST QueryDict so that we can update the target field value.
-            model_form = self.model_form(request.POST.copy())
-            del model_form.data['count']
-
-            # Validate each new object independently.
-            if model_form.is_valid():
-                obj = model_form.save()
-                new_objects.append(obj)
-            else:
-                # Raise an IntegrityError to break the for loop and abort the transaction.
-                raise IntegrityError()
-
-        return new_objects
+            asset = models.Asset(**values)
+            asset.custom_field_data = dict(instance.custom_field_data)
+            asset._tags = tags
+            asset._contracts = contracts
+            new_objects.append(asset)
+        return bulk_create_assets(new_objects)
 
 
 @register_model_view(models.Asset, 'edit')
@@ -138,6 +180,43 @@ class AssetBulkImportView(generic.BulkImportView):
     model_form = forms.AssetImportForm
     template_name = 'netbox_inventory/asset_bulk_import.html'
 
+    def post(self, request):
+        if get_plugin_setting('background_job_threshold'):
+            form = BulkImportForm(request.POST, request.FILES)
+            if form.is_valid() and run_in_background(len(form.cleaned_data['data'])):
+                return enqueue_background_job(
+                    request,
+                    AssetBulkImportJob,
+                    items=form.cleaned_data['data'],
+                    headers=getattr(form, '_csv_headers', None),
+                )
+        return super().post(request)
+
+    def create_and_update_objects(self, form, request):
+        records = form.cleaned_data['data']
+        if any(record.get('id') for record in records):
+            # updating existing assets, each one is validated and saved with its
+            # own form, but serial and asset tag are synced to hardware in bulk
+            with deferred_hardware_sync():
+                return super().create_and_update_objects(form, request)
+
+        importer = AssetImporter(
+            self.model_form,
+            records,
+            headers=getattr(form, '_csv_headers', None),
+            user=request.user,
+        )
+        assets = importer.run()
+        if importer.errors:
+            # Replicate errors for display, same as netbox does for model forms
+            for idx, field_name, error in importer.errors:
+                if field_name is None:
+                    form.add_error(None, f'Record {idx}: {error}')
+                else:
+                    form.add_error(None, f'Record {idx} {field_name}: {error}')
+            raise ValidationError('')
+        return assets
+
 
 @register_model_view(models.Asset, 'bulk_edit', path='edit', detail=False)
 class AssetBulkEditView(generic.BulkEditView):
@@ -146,6 +225,13 @@ class AssetBulkEditView(generic.BulkEditView):
     table = tables.AssetTable
     form = forms.AssetBulkEditForm
 
+    def _update_objects(self, form, request):
+        # sync serial and asset tag to assigned hardware in bulk
+        with deferred_hardware_sync():
+            updated_objects = super()._update_objects(form, request)
+        clear_cached_asset_counts()
+        return updated_objects
+
     def post(self, request, **kwargs):
         """Override post method to check if assets are protected from editing"""
 
@@ -161,11 +247,6 @@ class AssetBulkEditView(generic.BulkEditView):
 
         # Include the PK list as initial data for the form
         initial_data = {'pk': pk_list}
-        protected_fields_by_tags = get_tags_and_edit_protected_asset_fields()
-        
-        # Safety check: if no configuration is set, protected_fields_by_tags might be None
-        if not protected_fields_by_tags:
-            protected_fields_by_tags = {}
 
         errors = []
         protected_assets = []
@@ -176,38 +257,41 @@ class AssetBulkEditView(generic.BulkEditView):
 
             if form.is_valid():
                 nullified_fields = set(request.POST.getlist('_nullify'))
-
-                queryset = self.queryset.filter(pk__in=pk_list)
-
-                for asset in queryset:
-                    asset_tags = set(asset.tags.all().values_list('slug', flat=True))
-                    intersection_of_tags = set(asset_tags).intersection(
-                        protected_fields_by_tags.keys()
-                    )
-
-                    # Check if asset is protected from editing
-                    for tag in intersection_of_tags:
-                        # TODO: Check if custom fields can be protected
-                        protected_fields = set(protected_fields_by_tags[tag])
-
-                        modified_fields = set(form.changed_data)
-                        nullable = set(form.nullable_fields).intersection(
-                            set(nullified_fields)
+                # TODO: Check if custom fields can be protected
+                modified_fields = set(form.changed_data).union(
+                    set(form.nullable_fields).intersection(nullified_fields)
+                )
+                # {tag: fields} of protected fields this edit would modify
+                protected_fields_by_tags = get_edit_protected_tags(modified_fields)
+
+                if protected_fields_by_tags:
+                    # assets with any of those tags, with list of their tags
+                    # that protect them, fetched with one query
+                    queryset = (
+                        self.queryset.filter(
+                            pk__in=pk_list,
+                            tags__slug__in=protected_fields_by_tags.keys(),
                         )
-
-                        if modified_fields.intersection(
-                            protected_fields
-                        ) or nullable.intersection(protected_fields):
-                            protected_assets.append(asset)
-
-                            fields = modified_fields.intersection(
-                                protected_fields
-                            ).union(nullable.intersection(protected_fields))
+                        .select_related(
+                            'device_type',
+                            'module_type',
+                            'inventoryitem_type',
+                            'rack_type',
+                        )
+                        .annotate(
+                            protected_by_tags=ArrayAgg(
+                                'tags__slug', ordering='tags__slug'
+                            )
+                        )
+                    )
+                    for asset in queryset:
+                        protected_assets.append(asset)
+                        for tag in asset.protected_by_tags:
                             errors.append(
                                 'Cannot edit asset {} fields protected by tag {}: {}.'.format(
                                     asset,
                                     tag,
-                                    ','.join(fields),
+                                    ','.join(sorted(protected_fields_by_tags[tag])),
                                 )
                             )
                 if errors:
@@ -216,6 +300,19 @@ class AssetBulkEditView(generic.BulkEditView):
                     messages.warning(request, ' '.join(errors))
                     messages.warning(request, error_msg_protected_assets)
                     return redirect(self.get_return_url(request))
+
+                if form.is_valid() and run_in_background(len(pk_list)):
+                    post_data = {
+                        name: values
+                        for name, values in request.POST.lists()
+                        if name not in ('pk', '_all', 'csrfmiddlewaretoken')
+                    }
+                    return enqueue_background_job(
+                        request,
+                        AssetBulkEditJob,
+                        items=[int(pk) for pk in pk_list],
+                        post_data=post_data,
+                    )
         return super().post(request, **kwargs)
 
 
@@ -257,4 +354,11 @@ class AssetBulkDeleteView(generic.BulkDeleteView):
             messages.warning(request, error_msg)
             return redirect(self.get_return_url(request))
 
+        if '_confirm' in request.POST and run_in_background(len(pk_list)):
+            form = self.get_form()(request.POST)
+            if form.is_valid():
+                return enqueue_background_job(
+                    request, AssetBulkDeleteJob, items=list(pk_list)
+                )
+
         return super().post(request, *args, **kwargs)
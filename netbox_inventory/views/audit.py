@@ -0,0 +1,98 @@
+from django.http import HttpResponseBadRequest, StreamingHttpResponse
+from django.shortcuts import get_object_or_404
+from django.views.generic import View
+
+from netbox.views import generic
+from utilities.permissions import get_permission_for_model
+from utilities.query import count_related
+from utilities.views import ObjectPermissionRequiredMixin, register_model_view
+
+from .. import export, filtersets, forms, models, tables
+from ..choices import AuditResultChoices
+
+__all__ = (
+    'AuditSessionBulkDeleteView',
+    'AuditSessionDeleteView',
+    'AuditSessionEditView',
+    'AuditSessionExportView',
+    'AuditSessionListView',
+    'AuditSessionView',
+)
+
+
+@register_model_view(models.AuditSession)
+class AuditSessionView(generic.ObjectView):
+    queryset = models.AuditSession.objects.all()
+
+    def get_extra_context(self, request, instance):
+        counts = instance.get_result_counts()
+        return {
+            'scan_count': instance.scans.count(),
+            'results': [
+                (result, label, AuditResultChoices.colors.get(result), counts[result])
+                for result, label in AuditResultChoices
+            ],
+        }
+
+
+@register_model_view(models.AuditSession, 'list', path='', detail=False)
+class AuditSessionListView(generic.ObjectListView):
+    queryset = models.AuditSession.objects.annotate(
+        scan_count=count_related(models.AuditScan, 'session'),
+    )
+    table = tables.AuditSessionTable
+    filterset = filtersets.AuditSessionFilterSet
+    filterset_form = forms.AuditSessionFilterForm
+
+
+@register_model_view(models.AuditSession, 'edit')
+@register_model_view(models.AuditSession, 'add', detail=False)
+class AuditSessionEditView(generic.ObjectEditView):
+    queryset = models.AuditSession.objects.all()
+    form = forms.AuditSessionForm
+
+
+@register_model_view(models.AuditSession, 'delete')
+class AuditSessionDeleteView(generic.ObjectDeleteView):
+    queryset = models.AuditSession.objects.all()
+
+
+@register_model_view(models.AuditSession, 'bulk_delete', path='delete', detail=False)
+class AuditSessionBulkDeleteView(generic.BulkDeleteView):
+    queryset = models.AuditSession.objects.all()
+    filterset = filtersets.AuditSessionFilterSet
+    table = tables.AuditSessionTable
+
+
+@register_model_view(models.AuditSession, 'export')
+class AuditSessionExportView(ObjectPermissionRequiredMixin, View):
+    """
+    Stream assets (or scans, for unexpected result) of a reconciliation
+    result as CSV, the same way assets are exported from asset list.
+    """
+
+    queryset = models.AuditSession.objects.all()
+    chunk_size = 2000
+
+    def get_required_permission(self):
+        return get_permission_for_model(self.queryset.model, 'view')
+
+    def get(self, request, pk):
+        session = get_object_or_404(self.queryset, pk=pk)
+        result = request.GET.get('result')
+        if result not in dict(AuditResultChoices):
+            return HttpResponseBadRequest(f'Unsupported audit result: {result}')
+        queryset = session.get_result(result)
+        if result == 'unexpected':
+            stream = export.stream_scans_csv
+        else:
+            stream = export.stream_csv
+            queryset = queryset.restrict(request.user, 'view')
+        response = StreamingHttpResponse(
+            stream(queryset, chunk_size=self.chunk_size),
+            content_type='text/csv',
+        )
+        response['Content-Disposition'] = (
+            f'attachment; filename="netbox_audit_{session.pk}_{result}.csv"'
+        )
+        return response
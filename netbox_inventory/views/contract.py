@@ -19,7 +19,7 @@ __all__ = (
 
 @register_model_view(Contract)
 class ContractView(generic.ObjectView):
-    queryset = Contract.objects.all()
+    queryset = Contract.objects.with_expiry()
 
     def get_extra_context(self, request, instance):
         # Get related assets
@@ -33,7 +33,7 @@ class ContractView(generic.ObjectView):
 
 @register_model_view(Contract, 'list', path='', detail=False)
 class ContractListView(generic.ObjectListView):
-    queryset = Contract.objects.all()
+    queryset = Contract.objects.with_expiry()
     table = ContractTable
     filterset = ContractFilterSet
     filterset_form = ContractFilterForm
@@ -59,7 +59,7 @@ class ContractBulkImportView(generic.BulkImportView):
 
 @register_model_view(Contract, 'bulk_edit', path='edit', detail=False)
 class ContractBulkEditView(generic.BulkEditView):
-    queryset = Contract.objects.all()
+    queryset = Contract.objects.with_expiry()
     filterset = ContractFilterSet
     table = ContractTable
     form = ContractForm
@@ -67,6 +67,6 @@ class ContractBulkEditView(generic.BulkEditView):
 
 @register_model_view(Contract, 'bulk_delete', path='delete', detail=False)
 class ContractBulkDeleteView(generic.BulkDeleteView):
-    queryset = Contract.objects.all()
+    queryset = Contract.objects.with_expiry()
     filterset = ContractFilterSet
     table = ContractTable
\ No newline at end of file
@@ -0,0 +1,67 @@
+from django.contrib import messages
+from django.http import HttpResponseForbidden
+from django.shortcuts import get_object_or_404, redirect
+from django.views.generic import View
+
+from core.models import Job
+from netbox.views import generic
+from utilities.permissions import get_permission_for_model
+from utilities.views import ObjectPermissionRequiredMixin
+
+from ..jobs import JOB_RUNNERS, get_job_runner, is_resumable
+
+__all__ = (
+    'BulkJobResumeView',
+    'BulkJobView',
+)
+
+
+def enqueue_background_job(request, runner, **kwargs):
+    """
+    Enqueue runner as job of request user and redirect to its results page.
+    """
+    job = runner.enqueue(user=request.user, **kwargs)
+    messages.info(request, f'{job.name} is running as a background job.')
+    return redirect('plugins:netbox_inventory:bulk_job', pk=job.pk)
+
+
+class BulkJobView(generic.ObjectView):
+    """
+    Progress and results of background bulk jobs.
+    """
+
+    queryset = Job.objects.filter(name__in=JOB_RUNNERS)
+    template_name = 'netbox_inventory/bulk_job.html'
+
+    def get_extra_context(self, request, instance):
+        data = instance.data or {}
+        total = data.get('total') or 0
+        return {
+            'total': total,
+            'processed': data.get('processed', 0),
+            'progress': round(100 * data.get('processed', 0) / total) if total else 0,
+            'results': data.get('results', {}),
+            'errors': data.get('errors', []),
+            'resumed_by': data.get('resumed_by'),
+            'resumable': is_resumable(instance),
+        }
+
+
+class BulkJobResumeView(ObjectPermissionRequiredMixin, View):
+    """
+    Enqueue a new job that continues interrupted background bulk job.
+    """
+
+    queryset = Job.objects.filter(name__in=JOB_RUNNERS)
+
+    def get_required_permission(self):
+        return get_permission_for_model(self.queryset.model, 'view')
+
+    def post(self, request, pk):
+        job = get_object_or_404(self.queryset, pk=pk)
+        if job.user != request.user and not request.user.is_superuser:
+            return HttpResponseForbidden('Only user that started job can resume it')
+        if not is_resumable(job):
+            messages.error(request, f'Job {job.pk} can not be resumed.')
+            return redirect('plugins:netbox_inventory:bulk_job', pk=job.pk)
+        return enqueue_background_job(request, get_job_runner(job), resume_job=job.pk)